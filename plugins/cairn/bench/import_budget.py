@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Import-phase budget for every cairn script, measured with `-X importtime`.
+
+Agents start these scripts constantly, so what a script imports before main()
+runs is paid on every call — including `--help` and every refusal path. Each
+script is imported in a fresh interpreter under `-X importtime`; its import
+phase is the cumulative time of its own module line (everything it pulls in,
+transitively). The best of --runs is kept, so one noisy start does not fail it.
+
+Two checks, configured in import_budget.json next to this file:
+  budget_ms   the ceiling for any script's import phase (per-script overrides
+              under "scripts", keyed by skill/script.py)
+  deferred    modules no script may import at module level — rarely needed or
+              heavy (subprocess, hashlib, datetime, ...); import them on the
+              code path that uses them. This check is exact, not timed.
+
+Exits 1 on any violation; the report (JSON on stdout) names the worst offenders.
+
+  import_budget.py                       # every script, 3 runs each
+  import_budget.py --runs 5 --out imports.json
+  import_budget.py --only inquiry        # scripts under skills/inquiry
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+CAIRN = Path(__file__).resolve().parent.parent
+CONFIG = Path(__file__).resolve().parent / "import_budget.json"
+
+
+def scripts(only: str | None = None) -> list[Path]:
+    """Every script with a main() — the helper modules (store, maturity, ...) are
+    measured as part of the scripts that import them."""
+    out = []
+    for f in sorted((CAIRN / "skills").glob("*/scripts/*.py")):
+        if only and f.parent.parent.name != only:
+            continue
+        if "def main(" in f.read_text(encoding="utf-8"):
+            out.append(f)
+    return out
+
+
+def profile(script: Path) -> tuple[float, set[str]]:
+    """(import phase in ms, every module imported by it) for one fresh import."""
+    code = f"import sys; sys.path.insert(0, {str(script.parent)!r}); import {script.stem}"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          env={**os.environ, "PYTHONDONTWRITEBYTECODE": ""})
+    if proc.returncode != 0:
+        raise RuntimeError(f"{script}: import failed\n{proc.stderr[-2000:]}")
+    mine, names = None, []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            us = int(cumulative)
+        except ValueError:
+            continue  # the header line
+        names.append(name.strip())
+        if name.rstrip() == " " + script.stem:  # the top-level line: the whole import phase
+            mine = us
+    if mine is None:
+        raise RuntimeError(f"{script}: no import line for {script.stem}")
+    i = names.index(script.stem)
+    below = set(names[:i + 1])  # importtime prints children before their parent
+    return mine / 1000, below
+
+
+def run(only: str | None = None, runs: int = 3, config: dict | None = None) -> dict:
+    config = config if config is not None else json.loads(CONFIG.read_text(encoding="utf-8"))
+    budget, overrides, deferred = config["budget_ms"], config.get("scripts", {}), set(config.get("deferred", []))
+    baseline = set()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output=True, text=True)
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            baseline.add(line.rsplit("|", 1)[1].strip())
+    rows = []
+    for f in scripts(only):
+        rel = f"{f.parent.parent.name}/{f.name}"
+        profile(f)  # warm-up: bytecode written, pages cached
+        best, mods = min((profile(f) for _ in range(max(1, runs))), key=lambda r: r[0])
+        limit = overrides.get(rel, budget)
+        eager = sorted(deferred & (mods - baseline))
+        rows.append({"script": rel, "import_ms": round(best, 2), "budget_ms": limit,
+                     "over_budget": best > limit, "eager_deferred": eager})
+    rows.sort(key=lambda r: -r["import_ms"])
+    bad = [r["script"] for r in rows if r["over_budget"] or r["eager_deferred"]]
+    return {"python": sys.version.split()[0], "runs": runs, "budget_ms": budget, "deferred": sorted(deferred),
+            "scripts": rows, "violations": bad}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Fail when a cairn script's import phase exceeds its budget.")
+    ap.add_argument("--runs", type=int, default=3, help="imports per script; the fastest counts")
+    ap.add_argument("--only", default=None, help="one skill's scripts")
+    ap.add_argument("--config", default=str(CONFIG))
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+    report = run(args.only, args.runs, json.loads(Path(args.config).read_text(encoding="utf-8")))
+    for r in report["scripts"][:5]:
+        print(f"{r['script']:<42} {r['import_ms']:>7} ms  (budget {r['budget_ms']})", file=sys.stderr)
+    for r in report["scripts"]:
+        if r["over_budget"]:
+            print(f"OVER BUDGET: {r['script']} imports in {r['import_ms']} ms > {r['budget_ms']} ms", file=sys.stderr)
+        if r["eager_deferred"]:
+            print(f"EAGER: {r['script']} imports {', '.join(r['eager_deferred'])} at module level", file=sys.stderr)
+    body = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(body + "\n", encoding="utf-8")
+    else:
+        print(body)
+    return 1 if report["violations"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
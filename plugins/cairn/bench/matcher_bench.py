@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""The matcher's per-query cost with and without the token cache, as JSON.
+
+For each size, a synthetic mental-models store (store_bench's generator) is
+ranked against the same queries three ways:
+
+  legacy      the per-character _norm this replaced, every record re-tokenized per query
+  translate   retrieval.rank with no cache: str.translate _norm, every record re-tokenized
+  cached      retrieval.rank fed by tokencache.fresh: only the query is normalized
+              (the .tok sidecar is built once, by the ranking check, before timing)
+
+All three must rank identically (checked, reported as same_ranking); speedup is
+legacy / cached and translate / cached, on medians.
+
+  matcher_bench.py                      # 10k and 100k
+  matcher_bench.py --sizes 1k,10k --repeat 9 --out matcher.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from store_bench import _size, _text, _time, generate, load_port  # noqa: E402
+
+
+def _legacy_norm(s: str) -> str:
+    return "".join(c.lower() if c.isalnum() or c.isspace() else " " for c in str(s))
+
+
+def _legacy_rank(query: str, records: list[dict], fields: list[str]) -> list[tuple[float, dict]]:
+    """The matcher before the token cache, verbatim."""
+    qn = _legacy_norm(query)
+    q_long = {w for w in qn.split() if len(w) > 2}
+    q_all = {w for w in qn.split() if w}
+    scored = []
+    for rec in records:
+        hay = _legacy_norm(" ".join(str(rec.get(f, "")) for f in fields))
+        toks = {w for w in hay.split() if w}
+        score = len(q_long & {w for w in toks if len(w) > 2}) * 2.0
+        primary = _legacy_norm(str(rec.get(fields[0], ""))) if fields else ""
+        if primary and (primary in qn or qn in primary):
+            score += 3.0
+        score += len(q_all & toks)
+        if score > 0:
+            scored.append((score, rec))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored
+
+
+def run(sizes: list[int], repeat: int = 5, log=None) -> dict:
+    port = load_port("mental-models")
+    import retrieval, tokencache
+    os.environ["CAIRN_RETRIEVAL"] = "matcher"
+    results = []
+    root = Path(tempfile.mkdtemp(prefix="cairn-matcher-bench-"))
+    try:
+        for n in sizes:
+            path = root / f"mental-models-{n}.jsonl"
+            generate(path, "mental-models", n)
+            records = port.logstore.read_all(path, port.KEY)
+            rng = random.Random(n)
+            queries = [_text(rng, 3) for _ in range(repeat + 1)] + [records[n // 2]["smell"]]
+
+            def cached(q):
+                st = os.stat(path)
+                return retrieval.rank(q, records, port.FIELDS, tokens=tokencache.fresh(path, port.FIELDS, records, st))
+
+            variants = {"legacy": lambda q: _legacy_rank(q, records, port.FIELDS),
+                        "translate": lambda q: retrieval.rank(q, records, port.FIELDS),
+                        "cached": cached}
+            same = all(len({tuple((s, r[port.KEY]) for s, r in fn(q)) for fn in variants.values()}) == 1
+                       for q in queries[-2:])
+            row = {"size": n, "bytes": path.stat().st_size, "same_ranking": same}
+            for name, fn in variants.items():
+                it = iter(queries * 2)
+                row[name] = _time(lambda: fn(next(it)), repeat, warm=True)
+                if log:
+                    log(f"x{n} {name:<10} median {row[name]['median_ms']:>10.3f} ms  (first {row[name]['first_ms']:.3f} ms)")
+            row["cache_bytes"] = tokencache.cache_path(path).stat().st_size
+            med = {k: max(row[k]["median_ms"], 1e-6) for k in variants}
+            row["speedup"] = {"legacy/cached": round(med["legacy"] / med["cached"], 1),
+                              "translate/cached": round(med["translate"] / med["cached"], 1),
+                              "legacy/translate": round(med["legacy"] / med["translate"], 1)}
+            results.append(row)
+            if log:
+                log(f"x{n} speedup {row['speedup']}  same ranking: {same}")
+            path.unlink()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return {"meta": {"repeat": repeat, "python": platform.python_version(), "platform": platform.platform(),
+                     "at": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Time the matcher with and without its token cache; emits JSON.")
+    ap.add_argument("--sizes", default="10k,100k", help="comma list, k/m suffixes (default 10k,100k)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", default=None, help="write JSON here instead of stdout")
+    ap.add_argument("--quiet", action="store_true")
+    args = ap.parse_args(argv)
+    try:
+        sizes = [_size(s) for s in args.sizes.split(",")]
+    except ValueError:
+        print(f"error: bad --sizes '{args.sizes}'", file=sys.stderr)
+        return 2
+    log = None if args.quiet else (lambda msg: print(msg, file=sys.stderr))
+    body = json.dumps(run(sizes, max(1, args.repeat), log), indent=2)
+    if args.out:
+        Path(args.out).write_text(body + "\n", encoding="utf-8")
+    else:
+        print(body)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Recall and latency of every retrieval backend on a labeled query set, as JSON.
+
+The retrieval port says its backend is swapped when the ratchet fills with
+'learned-but-did-not-recall' frictions. This puts numbers on that decision. A
+labeled set (bench/retrieval_queries.json by default) holds models and smell
+phrasings, each labeled with the smell it must recall. The phrasings cover the
+exact smell, a rewording, other word forms, and no shared word at all. A
+friction the ratchet logs becomes one more labeled query.
+
+For each store size, the labeled models are planted among synthetic filler
+(store_bench's generator) and every backend in retrieval.BACKENDS answers every
+query through the real port, mental-models store.search(k=K):
+
+  recall@k    share of queries whose expected model is in the top k (k in --ks)
+  mrr         mean reciprocal rank of the expected model within the top K (0 if absent)
+  p50/p99_ms  per-query latency, cold store cache, the way a CLI call pays it
+  first_ms    the first query, which also builds the backend's sidecars
+  by_kind     recall@K per query kind (exact / reworded / word-form / unshared)
+
+  retrieval_eval.py                                   # 100, 1k, 10k; every backend
+  retrieval_eval.py --sizes 1k,100k --backends matcher,bm25 --out eval.json
+  retrieval_eval.py --store mental-models.jsonl --queries frictions.json   # the real store
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from store_bench import CAIRN, _cold, _model, _size, load_port  # noqa: E402
+sys.path.insert(0, str(CAIRN / "skills" / "mental-models" / "scripts"))
+import logstore  # noqa: E402  (store_bench put lib/ on the path)
+import metrics  # noqa: E402
+import retrieval  # noqa: E402
+
+DEFAULT_QUERIES = Path(__file__).resolve().parent / "retrieval_queries.json"
+
+
+def load_labeled(path: Path) -> tuple[list[dict], list[dict]]:
+    """(models to plant, queries). A file is {"models": [...], "queries": [...]},
+    or a bare list of queries whose expected models are already in the store."""
+    d = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(d, list):
+        d = {"models": [], "queries": d}
+    queries = [q for q in d.get("queries", []) if isinstance(q, dict) and q.get("query") and q.get("expect")]
+    if not queries:
+        raise ValueError(f"{path}: no labeled queries (each needs 'query' and 'expect')")
+    return list(d.get("models", [])), queries
+
+
+def _store(path: Path, models: list[dict], n: int) -> None:
+    """n records: the labeled models at seeded positions among synthetic filler."""
+    rng = random.Random(n)
+    recs = [_model(i, rng) for i in range(max(0, n - len(models)))]
+    for m in models:
+        recs.insert(rng.randint(0, len(recs)), dict(m, confirmed_on="2026-01-01"))
+    logstore.write_all(path, recs)
+
+
+def evaluate(port, repo: Path, queries: list[dict], ks: list[int], repeat: int) -> dict:
+    k = max(ks)
+    t = time.perf_counter()
+    port.search(repo, None, queries[0]["query"], k=k)
+    first = (time.perf_counter() - t) * 1000
+    lat, ranks, misses = [], [], []
+    for q in queries:
+        for _ in range(repeat):
+            _cold()
+            t = time.perf_counter()
+            hits = port.search(repo, None, q["query"], k=k)
+            lat.append((time.perf_counter() - t) * 1000)
+        smells = [h.get(port.KEY) for h in hits]
+        rank = smells.index(q["expect"]) + 1 if q["expect"] in smells else None
+        ranks.append(rank)
+        if rank is None:
+            misses.append(q["query"])
+    kinds: dict[str, list] = {}
+    for q, rank in zip(queries, ranks):
+        kinds.setdefault(q.get("kind", "-"), []).append(rank)
+    recall = lambda rs, at: round(sum(1 for r in rs if r is not None and r <= at) / len(rs), 3)  # noqa: E731
+    return {"recall": {f"@{at}": recall(ranks, at) for at in ks},
+            "mrr": round(sum(1.0 / r for r in ranks if r) / len(ranks), 3),
+            "p50_ms": round(metrics.percentile(lat, 50), 3), "p99_ms": round(metrics.percentile(lat, 99), 3),
+            "first_ms": round(first, 3), "queries": len(queries),
+            "by_kind": {kind: recall(rs, k) for kind, rs in sorted(kinds.items())},
+            "misses": misses}
+
+
+def run(sizes: list[int], backends: list[str], models: list[dict], queries: list[dict],
+        ks: list[int], repeat: int = 3, log=None, store: Path | None = None) -> dict:
+    """Every backend on every size; with `store`, on a copy of that real store
+    (plus the planted models, if any) instead of synthetic ones."""
+    port = load_port("mental-models")
+    results = []
+    prior = os.environ.get("CAIRN_RETRIEVAL")
+    root = Path(tempfile.mkdtemp(prefix="cairn-retrieval-eval-"))
+    try:
+        for n in sizes if store is None else [None]:
+            seed = root / f"seed-{n}.jsonl"
+            if store is None:
+                _store(seed, models, n)
+            else:
+                recs = logstore.read_all(Path(store), port.KEY) + [dict(m) for m in models]
+                logstore.write_all(seed, recs)
+                n = len(logstore.read_all(seed, port.KEY))
+            for name in backends:
+                repo = root / f"{name}-{n}"
+                repo.mkdir()
+                shutil.copyfile(seed, repo / port.JSONL_NAME)  # each backend builds its own sidecars
+                os.environ["CAIRN_RETRIEVAL"] = name
+                row = {"size": n, "backend": name, **evaluate(port, repo, queries, ks, repeat)}
+                results.append(row)
+                if log:
+                    log(f"x{n} {name:<8} recall {row['recall']}  mrr {row['mrr']:.3f}  "
+                        f"p50 {row['p50_ms']:.2f} ms  p99 {row['p99_ms']:.2f} ms  (first {row['first_ms']:.1f} ms)")
+                shutil.rmtree(repo, ignore_errors=True)
+            seed.unlink()
+    finally:
+        if prior is None:
+            os.environ.pop("CAIRN_RETRIEVAL", None)
+        else:
+            os.environ["CAIRN_RETRIEVAL"] = prior
+        shutil.rmtree(root, ignore_errors=True)
+    try:
+        import numpy  # noqa: F401
+        numpy_on = True
+    except ImportError:
+        numpy_on = False
+    return {"meta": {"ks": ks, "repeat": repeat, "planted": len(models), "numpy": numpy_on,
+                     "python": platform.python_version(), "platform": platform.platform(),
+                     "at": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Recall@k, MRR and latency of each retrieval backend; emits JSON.")
+    ap.add_argument("--queries", default=str(DEFAULT_QUERIES), help="labeled set (default bench/retrieval_queries.json)")
+    ap.add_argument("--sizes", default="100,1k,10k", help="comma list, k/m suffixes (default 100,1k,10k)")
+    ap.add_argument("--store", default=None, help="evaluate on a copy of this mental-models.jsonl instead")
+    ap.add_argument("--backends", default="all", help=f"comma list of {', '.join(retrieval.BACKENDS)} (default all)")
+    ap.add_argument("--ks", default="1,4,10", help="recall cut-offs; the largest is the k searched (default 1,4,10)")
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per query")
+    ap.add_argument("--out", default=None, help="write JSON here instead of stdout")
+    ap.add_argument("--quiet", action="store_true")
+    args = ap.parse_args(argv)
+
+    backends = list(retrieval.BACKENDS) if args.backends == "all" else [b.strip() for b in args.backends.split(",")]
+    unknown = [b for b in backends if b not in retrieval.BACKENDS]
+    if unknown:
+        print(f"error: unknown backend(s) {unknown}; choose from {list(retrieval.BACKENDS)}", file=sys.stderr)
+        return 2
+    try:
+        sizes = [_size(s) for s in args.sizes.split(",")]
+        ks = sorted({int(k) for k in args.ks.split(",")})
+    except ValueError:
+        print(f"error: bad --sizes '{args.sizes}' or --ks '{args.ks}'", file=sys.stderr)
+        return 2
+    if ks[0] < 1:
+        print("error: --ks must be positive", file=sys.stderr)
+        return 2
+    try:
+        models, queries = load_labeled(Path(args.queries))
+    except (OSError, ValueError) as e:
+        print(f"error: cannot read labeled queries: {e}", file=sys.stderr)
+        return 2
+    log = None if args.quiet else (lambda msg: print(msg, file=sys.stderr))
+    if args.store and not Path(args.store).is_file():
+        print(f"error: no store at {args.store}", file=sys.stderr)
+        return 2
+    body = json.dumps(run(sizes, backends, models, queries, ks, max(1, args.repeat), log,
+                          Path(args.store) if args.store else None), indent=2)
+    if args.out:
+        Path(args.out).write_text(body + "\n", encoding="utf-8")
+    else:
+        print(body)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
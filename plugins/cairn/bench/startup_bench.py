@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Cold start: the `cairn` zipapp against the individual scripts it replaces.
+
+Agents invoke these commands constantly, so a single entry point is only worth
+having if it costs nothing. For each command below this times, in fresh
+interpreters, `python <skill>/scripts/<script>.py --help` against
+`python cairn.pyz <skill> <command> --help` (after one warm-up run, so the
+archive's one-time extraction is not counted — it is reported as extract_ms),
+and emits the medians as JSON.
+
+It exits 1 when the zipapp's median over all commands is slower than the
+scripts' by more than --tolerance-ms (default 2 ms — within run-to-run noise).
+
+  startup_bench.py                           # build a fresh cairn.pyz, 15 runs each
+  startup_bench.py --runs 30 --out startup.json
+  startup_bench.py --pyz dist/cairn.pyz      # time an existing build
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CAIRN = Path(__file__).resolve().parent.parent
+LIB = CAIRN / "lib"
+COMMANDS = [("cap", "check"), ("inquiry", "predict"), ("lib", "lookup"), ("models", "lookup"),
+            ("tool", "check"), ("boot", "orient"), ("feature", "plan-check")]
+
+
+def _pair(a: list[str], b: list[str], runs: int, env: dict) -> tuple[float, float]:
+    """Median wall ms of `a` and `b`, interleaved so drift and noise hit both alike."""
+    ta, tb = [], []
+    for _ in range(runs):
+        for cmd, times in ((a, ta), (b, tb)):
+            t0 = time.perf_counter()
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env, check=True)
+            times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(ta), statistics.median(tb)
+
+
+def run(pyz: Path | None = None, runs: int = 15, commands=COMMANDS) -> dict:
+    sys.path.insert(0, str(LIB))
+    import cairnzip, cli
+    work = Path(tempfile.mkdtemp(prefix="cairn-startup-"))
+    env = {**os.environ, "CAIRN_CACHE": str(work / "cache")}
+    try:
+        if pyz is None:
+            pyz = work / "cairn.pyz"
+            cairnzip.build(pyz)
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, str(pyz), "--help"], stdout=subprocess.DEVNULL, env=env, check=True)
+        extract_ms = (time.perf_counter() - t0) * 1000
+        rows = []
+        for skill, command in commands:
+            d, stem = cli.resolve(skill, command)
+            script = [sys.executable, str(d / f"{stem}.py"), "--help"]
+            zipped = [sys.executable, str(pyz), skill, command, "--help"]
+            _pair(script, zipped, 1, env)  # bytecode caches written, pages warm
+            script_ms, pyz_ms = _pair(script, zipped, runs, env)
+            rows.append({"command": f"{skill} {command}", "script_ms": round(script_ms, 2), "pyz_ms": round(pyz_ms, 2)})
+        for r in rows:
+            r["overhead_ms"] = round(r["pyz_ms"] - r["script_ms"], 2)
+        return {"python": sys.version.split()[0], "runs": runs, "extract_ms": round(extract_ms, 1),
+                "commands": rows,
+                "median_script_ms": round(statistics.median(r["script_ms"] for r in rows), 2),
+                "median_pyz_ms": round(statistics.median(r["pyz_ms"] for r in rows), 2)}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Time cairn.pyz startup against the individual scripts.")
+    ap.add_argument("--pyz", default=None, help="an existing build (default: build one into a temp dir)")
+    ap.add_argument("--runs", type=int, default=15)
+    ap.add_argument("--tolerance-ms", type=float, default=2.0)
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+    report = run(Path(args.pyz).resolve() if args.pyz else None, max(1, args.runs))
+    report["tolerance_ms"] = args.tolerance_ms
+    report["ok"] = report["median_pyz_ms"] <= report["median_script_ms"] + args.tolerance_ms
+    for r in report["commands"]:
+        print(f"{r['command']:<20} script {r['script_ms']:>7} ms   pyz {r['pyz_ms']:>7} ms   "
+              f"({r['overhead_ms']:+} ms)", file=sys.stderr)
+    print(f"median: script {report['median_script_ms']} ms, pyz {report['median_pyz_ms']} ms "
+          f"(first-run extract {report['extract_ms']} ms) — {'ok' if report['ok'] else 'SLOWER'}", file=sys.stderr)
+    body = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(body + "\n", encoding="utf-8")
+    else:
+        print(body)
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""How the cairn stores scale — timed against synthetic stores, emitted as JSON.
+
+Generates each of the six stores (capability-ledger, inquiry-log, lib-knowledge,
+mental-models, specialist-profiles, workshop) at the requested sizes and times,
+through the real storage ports:
+
+  read_one_hit, read_one_miss, read_all, read_index, search, rank, upsert, update
+
+(only where the port has the operation). `--engine rewrite` instead times the
+pre-log-structured baseline — linear-scan reads and a whole-file
+atomic_write_lines rewrite per upsert/update — so any backend change (JSONL,
+log-structured, SQLite via --backend sqlite) is compared on the same data.
+
+Every timed call starts cold, the way a CLI invocation does: the in-process
+cache is cleared first (pass --warm to keep it, as a long-lived host would).
+Persistent sidecars (key index, Bloom filter) are built by the first call, which
+is reported separately as first_ms.
+
+  store_bench.py                                  # 1k and 10k, every store
+  store_bench.py --sizes 1k,10k,100k,1m --out bench.json
+  store_bench.py --stores lib-knowledge --backend sqlite
+  store_bench.py --engine rewrite --sizes 10k     # the baseline, for comparison
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CAIRN = Path(__file__).resolve().parent.parent
+LIB = CAIRN / "lib"
+if str(LIB) not in sys.path:
+    sys.path.insert(0, str(LIB))
+import logstore  # noqa: E402
+
+WORDS = ("render parse cache schema async retry token index layout query batch stream "
+         "layout-shift hydration closure memo effect reducer migration lock fsync shard "
+         "bloom latency budget throughput queue backoff idempotent invariant boundary").split()
+OPS = ("read_one_hit", "read_one_miss", "read_all", "read_index", "search", "rank", "upsert", "update")
+
+
+def _text(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _capability(i: int, rng: random.Random) -> dict:
+    return {"problem_class": f"class-{i:07d}", "maturity": rng.choice(["novice", "practiced", "proven"]),
+            "solves": [{"date": "2026-01-01", "ratio": round(rng.random(), 3), "domain": rng.choice(WORDS)}
+                       for _ in range(rng.randint(0, 3))]}
+
+
+def _inquiry(i: int, rng: random.Random) -> dict:
+    return {"id": f"{i:08x}", "claim": _text(rng, 10), "confidence": round(rng.uniform(0.05, 0.95), 2),
+            "made_at": "2026-01-01T00:00:00", "observation": None, "outcome": None, "surprise": None,
+            "reframe": None}
+
+
+def _library(i: int, rng: random.Random) -> dict:
+    return {"name": f"lib-{i:07d}", "confirmed_version": f"{rng.randint(0, 9)}.{rng.randint(0, 20)}.0",
+            "confirmed_on": "2026-01-01", "capability": _text(rng, 6),
+            "key_facts": [_text(rng, 8) for _ in range(3)]}
+
+
+def _model(i: int, rng: random.Random) -> dict:
+    return {"smell": f"{_text(rng, 4)} #{i}", "reframe": _text(rng, 12), "confirmed_on": "2026-01-01"}
+
+
+def _profile(i: int, rng: random.Random) -> dict:
+    return {"domain": f"domain-{i:07d}", "confirmed_on": "2026-01-01",
+            "principles": [_text(rng, 8) for _ in range(4)], "anti_patterns": [_text(rng, 6)],
+            "pinned_libs": {f"lib-{rng.randint(0, 999):07d}": "1"}}
+
+
+def _workshop(i: int, rng: random.Random) -> dict:
+    return {"key": f"motion:{i:08x}", "motion": _text(rng, 6), "count": rng.randint(1, 9),
+            "steps": rng.randint(2, 30)}
+
+
+# store -> (skill dir, file, key field, generator, searchable fields)
+STORES = {
+    "capability-ledger": ("capability-ledger", "capability-ledger.jsonl", "problem_class", _capability, None),
+    "inquiry-log": ("inquiry", "inquiry-log.jsonl", "id", _inquiry, None),
+    "lib-knowledge": ("library-knowledge", "lib-knowledge.jsonl", "name", _library, None),
+    "mental-models": ("mental-models", "mental-models.jsonl", "smell", _model, ["smell", "reframe"]),
+    "specialist-profiles": ("specialist-knowledge", "specialist-profiles.jsonl", "domain", _profile, None),
+    "workshop": ("toolsmith", "workshop.jsonl", "key", _workshop, None),
+}
+
+
+def load_port(skill: str):
+    """The skill's store.py under a unique module name (every port is 'store')."""
+    d = CAIRN / "skills" / skill / "scripts"
+    if str(d) not in sys.path:
+        sys.path.insert(0, str(d))  # a port imports its siblings (retrieval)
+    spec = importlib.util.spec_from_file_location(f"bench_{skill.replace('-', '_')}_store", d / "store.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _size(s: str) -> int:
+    s = s.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(s[-1:], 1)
+    return int(float(s[:-1] if mult > 1 else s) * mult)
+
+
+def generate(path: Path, name: str, n: int, seed: int = 0) -> list[dict]:
+    """Write a compacted synthetic store of n records (sorted where the port sorts)."""
+    _, _, key, make, _ = STORES[name]
+    rng = random.Random(seed)
+    recs = [make(i, rng) for i in range(n)]
+    logstore.write_all(path, recs, sorted_by=key if name == "lib-knowledge" else None)
+    return recs
+
+
+class _Rewrite:
+    """The baseline the log-structured engine replaced: every read parses the
+    file, every write rewrites all of it with atomic_write_lines."""
+
+    def __init__(self, path: Path, key: str):
+        self.path, self.key = path, key
+
+    def _all(self) -> list[dict]:
+        out = []
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict) and logstore.MARK not in rec:
+                    out.append(rec)
+        return out
+
+    def read_one(self, value: str) -> dict | None:
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict) and rec.get(self.key) == value:
+                    return rec
+        return None
+
+    def upsert(self, rec: dict) -> None:
+        def _rw():
+            recs = [r for r in self._all() if r.get(self.key) != rec[self.key]] + [rec]
+            logstore.atomic_write_lines(self.path, [json.dumps(r, ensure_ascii=False) for r in recs])
+        logstore.locked(self.path, _rw)
+
+    def update(self, value: str, fn) -> dict:
+        def _rw():
+            recs = self._all()
+            out = None
+            for i, r in enumerate(recs):
+                if r.get(self.key) == value:
+                    recs[i] = out = fn(r)
+            logstore.atomic_write_lines(self.path, [json.dumps(r, ensure_ascii=False) for r in recs])
+            return out
+        return logstore.locked(self.path, _rw)
+
+
+def _ops(name: str, engine: str, repo: Path, path: Path, recs: list[dict], rng: random.Random) -> dict:
+    """op name -> zero-arg callable (a fresh target each call where it matters)."""
+    skill, _, key, make, fields = STORES[name]
+    keys = [r[key] for r in recs]
+    st = str(path)
+    bump = lambda r: {**(r or {}), "count": (r or {}).get("count", 0) + 1}  # noqa: E731
+    if engine == "rewrite":
+        base = _Rewrite(path, key)
+        return {
+            "read_one_hit": lambda: base.read_one(rng.choice(keys)),
+            "read_one_miss": lambda: base.read_one("absent-" + str(rng.random())),
+            "read_all": base._all,
+            "upsert": lambda: base.upsert({**make(rng.randrange(len(keys)), rng), key: rng.choice(keys)}),
+            "update": lambda: base.update(rng.choice(keys), bump),
+        }
+    port = load_port(skill)
+    ops = {"read_all": lambda: port.read_all(repo, st) if hasattr(port, "read_all") else list(port.iter_records(repo, st))}
+    if hasattr(port, "read_one"):
+        ops["read_one_hit"] = lambda: port.read_one(repo, st, rng.choice(keys))
+        ops["read_one_miss"] = lambda: port.read_one(repo, st, "absent-" + str(rng.random()))
+    if hasattr(port, "read_index"):
+        ops["read_index"] = lambda: port.read_index(repo, st)
+    if name == "lib-knowledge":
+        ops["search"] = lambda: port.search(repo, st, _text(rng, 2))
+        ops["upsert"] = lambda: port.upsert(repo, st, rng.choice(keys), make(rng.randrange(len(keys)), rng))
+    else:
+        ops["upsert"] = lambda: port.upsert(repo, st, {**make(rng.randrange(len(keys)), rng), key: rng.choice(keys)})
+    if name == "mental-models":
+        import retrieval
+        loaded = port.read_all(repo, st)
+        ops["search"] = lambda: port.search(repo, st, _text(rng, 3))
+        ops["rank"] = lambda: retrieval.rank(_text(rng, 3), loaded, fields)
+    if hasattr(port, "update"):
+        ops["update"] = lambda: port.update(repo, st, rng.choice(keys), bump)
+    return ops
+
+
+def _cold() -> None:
+    cache = sys.modules.get("storecache")
+    if cache is not None:
+        cache._lru.clear()
+
+
+def _time(fn, repeat: int, warm: bool) -> dict:
+    samples = []
+    for _ in range(repeat + 1):
+        if not warm:
+            _cold()
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    first, rest = samples[0], sorted(samples[1:])
+    pick = lambda q: rest[min(len(rest) - 1, int(q * len(rest)))]  # noqa: E731
+    return {"first_ms": round(first, 3), "median_ms": round(pick(0.5), 3), "p95_ms": round(pick(0.95), 3),
+            "min_ms": round(rest[0], 3), "max_ms": round(rest[-1], 3), "runs": len(rest)}
+
+
+def run(stores: list[str], sizes: list[int], engine: str = "port", repeat: int = 5,
+        warm: bool = False, workdir: Path | None = None, log=None) -> dict:
+    results = []
+    root = Path(workdir or tempfile.mkdtemp(prefix="cairn-bench-"))
+    try:
+        for n in sizes:
+            for name in stores:
+                repo = root / f"{name}-{n}"
+                repo.mkdir(parents=True, exist_ok=True)
+                path = repo / STORES[name][1]
+                t = time.perf_counter()
+                recs = generate(path, name, n)
+                if log:
+                    log(f"{name} x{n}: generated {path.stat().st_size} bytes in {time.perf_counter() - t:.1f}s")
+                if engine == "port" and name == "lib-knowledge" and os.environ.get("CAIRN_STORE") == "sqlite":
+                    load_port("library-knowledge").migrate_to_sqlite(repo, str(path))
+                ops = _ops(name, engine, repo, path, recs, random.Random(n))
+                heavy = n >= 100_000
+                for op in OPS:  # reads before writes: writes grow the file
+                    if op not in ops:
+                        continue
+                    reps = max(1, repeat // 2) if heavy and op in ("read_all", "read_index", "search", "rank") else repeat
+                    row = {"store": name, "size": n, "op": op, **_time(ops[op], reps, warm)}
+                    results.append(row)
+                    if log:
+                        log(f"  {op:<14} median {row['median_ms']:>10.3f} ms  (first {row['first_ms']:.3f} ms)")
+                shutil.rmtree(repo, ignore_errors=True)
+    finally:
+        if workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+    return {"meta": {"engine": engine, "backend": os.environ.get("CAIRN_STORE", "jsonl"),
+                     "retrieval": os.environ.get("CAIRN_RETRIEVAL", "matcher"), "warm": warm,
+                     "repeat": repeat, "python": platform.python_version(), "platform": platform.platform(),
+                     "at": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the cairn stores on synthetic data; emits JSON.")
+    ap.add_argument("--sizes", default="1k,10k", help="comma list, k/m suffixes (default 1k,10k; try 1k,10k,100k,1m)")
+    ap.add_argument("--stores", default="all", help=f"comma list of {', '.join(STORES)} (default all)")
+    ap.add_argument("--engine", choices=["port", "rewrite"], default="port",
+                    help="port: the stores as shipped; rewrite: the whole-file-rewrite baseline")
+    ap.add_argument("--backend", choices=["jsonl", "sqlite"], default=None,
+                    help="library-knowledge backend (sets CAIRN_STORE)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--warm", action="store_true", help="keep the in-process cache between calls")
+    ap.add_argument("--out", default=None, help="write JSON here instead of stdout")
+    ap.add_argument("--quiet", action="store_true")
+    args = ap.parse_args(argv)
+
+    stores = list(STORES) if args.stores == "all" else [s.strip() for s in args.stores.split(",")]
+    unknown = [s for s in stores if s not in STORES]
+    if unknown:
+        print(f"error: unknown store(s) {unknown}; choose from {list(STORES)}", file=sys.stderr)
+        return 2
+    try:
+        sizes = [_size(s) for s in args.sizes.split(",")]
+    except ValueError:
+        print(f"error: bad --sizes '{args.sizes}'", file=sys.stderr)
+        return 2
+    if args.backend:
+        os.environ["CAIRN_STORE"] = args.backend
+    log = None if args.quiet else (lambda msg: print(msg, file=sys.stderr))
+    report = run(stores, sizes, args.engine, max(1, args.repeat), args.warm, log=log)
+    body = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(body + "\n", encoding="utf-8")
+    else:
+        print(body)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
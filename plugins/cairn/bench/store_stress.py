@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""Contention stress for store writes: N processes hammering one store at once.
+
+The store docstrings promise that concurrent upserts never drop an insert and
+concurrent updates never lose an increment. This measures it, and what the lock
+costs while doing so, so a parallel agent fleet can be sized against it:
+
+  workshop  — every op is update() +1 on one of --hot motion counters (the
+              motion_observe.py path; --via script runs the real script per op)
+  inquiry   — alternates upsert() of a fresh prediction and update() +1 on a hot one
+
+Reported (JSON on stdout, a summary on stderr):
+  ops_per_sec     completed ops / wall time across all workers
+  lock wait/hold  p50 / p99 / max, from every acquisition's CAIRN_LOCK_STATS line
+  lost_updates    increments a worker saw succeed that the final store lacks
+  lost_inserts    predictions a worker inserted that the final store lacks
+  lock_steals     exclusive holds that overlapped another hold — mutual exclusion
+                  broken (the old O_EXCL lock stole locks older than 10 s; flock
+                  cannot, so this should read 0)
+  timeouts / errors
+
+  store_stress.py --store workshop --procs 8 --ops 200
+  store_stress.py --store inquiry --procs 16 --ops 100 --out stress.json
+  store_stress.py --store workshop --via script --procs 4 --ops 20
+  store_stress.py --store inquiry --group-commit-ms 2   # inquiry upserts via group commit
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+CAIRN = HERE.parent
+SKILL = {"workshop": "toolsmith", "inquiry": "inquiry"}
+
+
+def _motion_key(k: int) -> tuple[str, str]:
+    motion = f"stress hot motion {k}"
+    return motion, "motion:" + hashlib.sha1(motion.lower().encode()).hexdigest()[:8]
+
+
+def _hot_key(store: str, k: int) -> str:
+    return _motion_key(k)[1] if store == "workshop" else f"hot-{k}"
+
+
+def _inc(store: str, k: int):
+    keyfield, field = ("key", "count") if store == "workshop" else ("id", "observations")
+    def fn(rec):
+        rec = dict(rec or {keyfield: _hot_key(store, k)})
+        rec[field] = int(rec.get(field) or 0) + 1
+        return rec
+    return fn
+
+
+def worker(cfg: dict) -> dict:
+    """One hammering process. Returns what it saw succeed, for the audit."""
+    os.environ["CAIRN_LOCK_STATS"] = cfg["sink"]
+    repo, store, hot = Path(cfg["repo"]), cfg["store"], cfg["hot"]
+    tallies, inserted, errors, timeouts = [0] * hot, [], 0, 0
+    port = None
+    if cfg["via"] == "port":
+        sys.path.insert(0, str(HERE))
+        import store_bench
+        port = store_bench.load_port(SKILL[store])
+    while time.time() < cfg["start_at"]:
+        time.sleep(0.001)
+    t0 = time.time()
+    for i in range(cfg["ops"]):
+        k = (i + cfg["wid"]) % hot
+        try:
+            if cfg["via"] == "script":
+                motion, _ = _motion_key(k)
+                proc = subprocess.run(
+                    [sys.executable, str(CAIRN / "skills" / "toolsmith" / "scripts" / "motion_observe.py"),
+                     "--repo", str(repo), "--motion", motion, "--steps", "3"],
+                    capture_output=True, text=True, env=os.environ)
+                if proc.returncode != 0:
+                    raise RuntimeError(proc.stderr.strip())
+                tallies[k] += 1
+            elif store == "workshop":
+                port.update(repo, None, _hot_key(store, k), _inc(store, k))
+                tallies[k] += 1
+            elif i % 2 == 0:
+                pid = f"w{cfg['wid']}-{i}"
+                port.upsert(repo, None, {"id": pid, "claim": "stress", "confidence": 0.5,
+                                         "observation": None, "outcome": None})
+                inserted.append(pid)
+            else:
+                port.update(repo, None, _hot_key(store, k), _inc(store, k))
+                tallies[k] += 1
+        except TimeoutError:
+            timeouts += 1
+        except Exception:  # noqa: BLE001 — counted, not fatal: the audit reports it
+            errors += 1
+    return {"wid": cfg["wid"], "ops": cfg["ops"] - errors - timeouts, "errors": errors, "timeouts": timeouts,
+            "tallies": tallies, "inserted": inserted, "started": t0, "ended": time.time()}
+
+
+def _pct(xs: list[float], q: float) -> float | None:
+    if not xs:
+        return None
+    xs = sorted(xs)
+    return round(xs[min(len(xs) - 1, int(q * len(xs)))], 3)
+
+
+def _steals(spans: list[tuple[float, float, str]]) -> int:
+    """Holds that overlapped an exclusive hold (exclusive vs exclusive, or shared
+    inside exclusive). Spans are wall-clock and strictly inside each hold."""
+    ex = sorted((a, b) for a, b, m in spans if m == "ex")
+    n, reach = 0, float("-inf")
+    for a, b in ex:
+        if a < reach:
+            n += 1
+        reach = max(reach, b)
+    starts = [a for a, _ in ex]
+    for a, b, m in spans:
+        if m != "sh":
+            continue
+        j = bisect.bisect_right(starts, b) - 1  # last exclusive hold starting before this ends
+        if j >= 0 and ex[j][1] > a:
+            n += 1
+    return n
+
+
+def audit(repo: Path, store: str, hot: int, results: list[dict], sink: Path) -> dict:
+    sys.path.insert(0, str(HERE))
+    import store_bench
+    port = store_bench.load_port(SKILL[store])
+    final = {r.get("key" if store == "workshop" else "id"): r for r in port.read_all(repo, None)}
+    field = "count" if store == "workshop" else "observations"
+    lost_updates = 0
+    for k in range(hot):
+        want = sum(r["tallies"][k] for r in results)
+        got = int((final.get(_hot_key(store, k)) or {}).get(field) or 0)
+        lost_updates += max(0, want - got)
+    lost_inserts = sum(1 for r in results for pid in r["inserted"] if pid not in final)
+
+    waits, holds, spans, lock_timeouts = [], [], [], 0
+    if sink.exists():
+        for line in sink.read_text(encoding="utf-8").splitlines():
+            try:
+                ev = json.loads(line)
+            except ValueError:
+                continue
+            if ev.get("hold_ms") is None:
+                lock_timeouts += 1
+                continue
+            waits.append(ev["wait_ms"]); holds.append(ev["hold_ms"])
+            if ev.get("held"):
+                spans.append((ev["held"][0], ev["held"][1], ev.get("mode", "ex")))
+    ops = sum(r["ops"] for r in results)
+    wall = max((r["ended"] for r in results), default=0) - min((r["started"] for r in results), default=0)
+    return {
+        "ops": ops, "elapsed_s": round(wall, 3), "ops_per_sec": round(ops / wall, 1) if wall > 0 else None,
+        "lock": {"acquisitions": len(waits), "timeouts": lock_timeouts,
+                 "wait_ms": {"p50": _pct(waits, 0.5), "p99": _pct(waits, 0.99), "max": _pct(waits, 1.0)},
+                 "hold_ms": {"p50": _pct(holds, 0.5), "p99": _pct(holds, 0.99), "max": _pct(holds, 1.0)}},
+        "lost_updates": lost_updates, "lost_inserts": lost_inserts, "lock_steals": _steals(spans),
+        "timeouts": sum(r["timeouts"] for r in results), "errors": sum(r["errors"] for r in results),
+    }
+
+
+def run(store: str, procs: int, ops: int, hot: int = 4, via: str = "port", repo: Path | None = None,
+        group_commit_ms: float | None = None) -> dict:
+    own = repo is None
+    repo = Path(repo or tempfile.mkdtemp(prefix="cairn-stress-"))
+    sink = repo / ".lock-stats.jsonl"
+    sink.unlink(missing_ok=True)
+    start_at = time.time() + 0.3 + 0.05 * procs  # every worker imported before the gun
+    env = dict(os.environ)
+    if group_commit_ms is not None:
+        env["CAIRN_GROUP_COMMIT_MS"] = str(group_commit_ms)
+    workers = []
+    for wid in range(procs):
+        cfg = {"repo": str(repo), "store": store, "hot": hot, "ops": ops, "via": via, "wid": wid,
+               "sink": str(sink), "start_at": start_at}
+        workers.append(subprocess.Popen([sys.executable, __file__, "--worker", json.dumps(cfg)],
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env))
+    results, crashed = [], 0
+    for w in workers:
+        out, err = w.communicate()
+        try:
+            results.append(json.loads(out))
+        except ValueError:
+            crashed += 1
+            print(err, file=sys.stderr)
+    report = {"config": {"store": store, "procs": procs, "ops_per_proc": ops, "hot_keys": hot, "via": via,
+                         "group_commit_ms": group_commit_ms},
+              **audit(repo, store, hot, results, sink), "crashed_workers": crashed}
+    if own:
+        import shutil
+        shutil.rmtree(repo, ignore_errors=True)
+    return report
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Hammer a cairn store from N processes; audit what survived.")
+    ap.add_argument("--store", choices=sorted(SKILL), default="workshop")
+    ap.add_argument("--procs", type=int, default=8)
+    ap.add_argument("--ops", type=int, default=100, help="ops per process")
+    ap.add_argument("--hot", type=int, default=4, help="hot keys the updates contend on")
+    ap.add_argument("--via", choices=["port", "script"], default="port",
+                    help="port: call the store in-process; script: run motion_observe.py per op (workshop)")
+    ap.add_argument("--repo", default=None, help="run against this dir instead of a scratch one")
+    ap.add_argument("--group-commit-ms", type=float, default=None,
+                    help="set CAIRN_GROUP_COMMIT_MS for the workers (inquiry upserts)")
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    if args.worker:
+        print(json.dumps(worker(json.loads(args.worker))))
+        return 0
+    if args.via == "script" and args.store != "workshop":
+        print("error: --via script drives motion_observe.py, so it needs --store workshop", file=sys.stderr)
+        return 2
+    report = run(args.store, max(1, args.procs), max(1, args.ops), max(1, args.hot), args.via,
+                 Path(args.repo).resolve() if args.repo else None, args.group_commit_ms)
+    lk = report["lock"]
+    print(f"{report['config']['store']}: {report['ops']} ops in {report['elapsed_s']}s "
+          f"({report['ops_per_sec']} ops/s) — lock wait p50 {lk['wait_ms']['p50']} ms, p99 {lk['wait_ms']['p99']} ms; "
+          f"lost updates {report['lost_updates']}, lost inserts {report['lost_inserts']}, "
+          f"lock steals {report['lock_steals']}, timeouts {report['timeouts']}, errors {report['errors']}",
+          file=sys.stderr)
+    body = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(body + "\n", encoding="utf-8")
+    else:
+        print(body)
+    bad = report["lost_updates"] or report["lost_inserts"] or report["lock_steals"] or report["crashed_workers"]
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Per-store Bloom filter: definite misses without touching the store or its index.
+
+The hot lookups are mostly misses — a novice class, an uncached library, an
+unseen motion. `<store>.bloom` holds a bit array over every key in the log
+(BITS_PER_KEY bits and HASHES probes per key, ~1% false positives when full), so
+"definitely absent" is a stat, a small read and HASHES bit tests. "Maybe present"
+falls through to the real lookup, which has the final word.
+
+Validity follows keyindex.py: the filter records the inode, covered size and mtime
+of the store. Same file and size -> use it; same inode, grown -> add the appended
+tail's keys; compacted, shrunk, rewritten or past capacity -> rebuild from a scan.
+Writers never touch it (an append stays O(record)); the next reader catches it up.
+
+stats() reports the filter's shape and its estimated false-positive rate, from
+the fraction of bits set: (set / m) ** k.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+BITS_PER_KEY = 10
+HASHES = 7
+MIN_CAPACITY = 1024
+
+
+def bloom_path(p: Path) -> Path:
+    return p.with_suffix(p.suffix + ".bloom")
+
+
+def _probes(value: str, m: int, k: int):
+    d = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+    h1, h2 = int.from_bytes(d[:8], "little"), int.from_bytes(d[8:], "little") | 1
+    return [(h1 + i * h2) % m for i in range(k)]
+
+
+def _add(bits: bytearray, meta: dict, value: str) -> None:
+    for b in _probes(value, meta["m"], meta["k"]):
+        bits[b >> 3] |= 1 << (b & 7)
+    meta["n"] += 1
+
+
+def _load(p: Path, key: str) -> tuple[dict, bytearray] | None:
+    try:
+        with open(bloom_path(p), "rb") as f:
+            meta = json.loads(f.readline())
+            bits = bytearray(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict) or meta.get("key") != key or len(bits) * 8 < meta.get("m", 1 << 62):
+        return None
+    return meta, bits
+
+
+def _scan(p: Path, key: str, start: int, meta: dict, bits: bytearray) -> tuple[int, os.stat_result]:
+    """Add the keys of complete lines from `start`; return the end offset and stat."""
+    pos = start
+    with open(p, "rb") as f:
+        f.seek(start)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            pos += len(raw)
+            try:
+                rec = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(rec, dict) and isinstance(rec.get(key), str):
+                _add(bits, meta, rec[key])
+        return pos, os.fstat(f.fileno())
+
+
+def _empty(key: str, st: os.stat_result, expect: int) -> tuple[dict, bytearray]:
+    cap = max(MIN_CAPACITY, 2 * expect)
+    m = cap * BITS_PER_KEY
+    return {"key": key, "inode": st.st_ino, "size": 0, "m": m, "k": HASHES, "n": 0, "capacity": cap}, bytearray((m + 7) // 8)
+
+
+def _save(p: Path, meta: dict, bits: bytearray) -> None:
+    """Best effort, like the key index: a lost filter only costs a rescan."""
+    import tempfile
+    try:
+        fd, tmp = tempfile.mkstemp(dir=str(p.parent), prefix=".tmp-", suffix=".bloom")
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps(meta, separators=(",", ":")).encode() + b"\n")
+            f.write(bits)
+        os.replace(tmp, bloom_path(p))
+    except OSError:
+        pass
+
+
+def fresh(p: Path, key: str, st: os.stat_result | None = None) -> tuple[dict, bytearray]:
+    """The filter for `p`, caught up with the data file (and persisted if it moved)."""
+    st = st or os.stat(p)
+    got = _load(p, key)
+    if got is not None:
+        meta, bits = got
+        covered = meta.get("size", -1)
+        if meta.get("inode") == st.st_ino and covered == st.st_size and meta.get("mtime_ns") == st.st_mtime_ns:
+            return meta, bits
+        if not (meta.get("inode") == st.st_ino and isinstance(covered, int) and covered < st.st_size
+                and meta["n"] < meta["capacity"]):
+            got = None
+    if got is None:
+        # size the rebuild from the file: ~one key per 100 bytes is a generous guess
+        meta, bits = _empty(key, st, st.st_size // 100)
+    meta["size"], after = _scan(p, key, meta["size"], meta, bits)
+    if after.st_ino != meta["inode"] or meta["n"] > meta["capacity"]:
+        meta, bits = _empty(key, after, meta["n"])
+        meta["size"], after = _scan(p, key, 0, meta, bits)
+        meta["inode"] = after.st_ino
+    meta["mtime_ns"] = after.st_mtime_ns
+    _save(p, meta, bits)
+    return meta, bits
+
+
+def may_contain(p: Path, key: str, value: str) -> bool:
+    """False means `value` is definitely not a key in the store."""
+    try:
+        st = os.stat(p)
+    except FileNotFoundError:
+        return False
+    meta, bits = fresh(p, key, st)
+    return all(bits[b >> 3] >> (b & 7) & 1 for b in _probes(value, meta["m"], meta["k"]))
+
+
+def stats(p: Path, key: str) -> dict | None:
+    """Shape and estimated false-positive rate of the (freshened) filter."""
+    if not p.exists():
+        return None
+    meta, bits = fresh(p, key)
+    set_bits = sum(bin(b).count("1") for b in bits)
+    return {"keys_added": meta["n"], "capacity": meta["capacity"], "bits": meta["m"], "hashes": meta["k"],
+            "bytes": len(bits), "fill": round(set_bits / meta["m"], 4),
+            "est_false_positive_rate": round((set_bits / meta["m"]) ** meta["k"], 6)}
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Build `cairn.pyz`: every skill script + lib/ as ONE runnable file.
+
+    python lib/cairnzip.py --out cairn.pyz
+    python cairn.pyz cap check --class render-perf       # = cli.py cap check ...
+
+The archive holds a launcher plus ONE member with the .harness mirror layout
+(<skill>/*.py + _lib/*.py). On its first run the launcher extracts that into
+$CAIRN_CACHE (default ~/.cache/cairn) under the build id, byte-compiles it, and
+runs cli.py from there; later runs only stat the directory.
+
+Extracting rather than importing from the zip is deliberate: zipimport cannot
+cache bytecode (every run would recompile), and the scripts find their siblings
+and lib/ by file path (store.py's bootstrap, _find_models_record), which a zip
+member does not have. What a zipapp start still costs over a plain script —
+runpy, and zipimport parsing the archive's directory — is kept small by shipping
+the launcher pre-compiled and the payload as one member; bench/startup_bench.py
+holds the result to "no slower than the individual scripts".
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import sys
+import zipfile
+from pathlib import Path
+
+CAIRN = Path(__file__).resolve().parent.parent
+
+BOOT = '''\
+import os, sys
+BUILD = {build!r}
+def _root():
+    base = os.environ.get("CAIRN_CACHE") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "cairn")
+    root = os.path.join(base, BUILD)
+    if not os.path.isfile(os.path.join(root, ".complete")):
+        import compileall, shutil, tempfile, zipfile
+        os.makedirs(base, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=base, prefix=".extract-")
+        with zipfile.ZipFile(os.path.dirname(os.path.abspath(__file__))) as z, \
+                zipfile.ZipFile(z.open("payload.zip")) as payload:
+            payload.extractall(tmp)
+        compileall.compile_dir(tmp, ddir=root, quiet=2)  # bytecode now, even under PYTHONDONTWRITEBYTECODE
+        open(os.path.join(tmp, ".complete"), "w").close()
+        try:
+            os.rename(tmp, root)
+        except OSError:  # another run extracted it first
+            shutil.rmtree(tmp, ignore_errors=True)
+    return root
+sys.path.insert(0, os.path.join(_root(), "_lib"))
+import cli
+raise SystemExit(cli.main())
+'''
+
+
+def members() -> list[tuple[str, Path]]:
+    """(archive name, source) for every module the commands need."""
+    out = [(f"_lib/{f.name}", f) for f in sorted((CAIRN / "lib").glob("*.py"))]
+    for scripts in sorted((CAIRN / "skills").glob("*/scripts")):
+        out += [(f"{scripts.parent.name}/{f.name}", f) for f in sorted(scripts.glob("*.py"))]
+    return out
+
+
+def build(out: Path) -> str:
+    """Write the archive; returns its build id (a hash of every member)."""
+    import io, py_compile, tempfile
+    files = members()
+    h = hashlib.sha256()
+    for name, src in files:
+        h.update(name.encode() + b"\0" + src.read_bytes() + b"\0")
+    build_id = h.hexdigest()[:16]
+    payload = io.BytesIO()
+    with zipfile.ZipFile(payload, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, src in files:
+            z.write(src, name)
+    boot = BOOT.format(build=build_id)
+    with tempfile.TemporaryDirectory() as td:  # the launcher ships compiled: nothing to compile per run
+        src = Path(td) / "__main__.py"
+        src.write_text(boot, encoding="utf-8")
+        pyc = py_compile.compile(str(src), cfile=str(Path(td) / "__main__.pyc"), dfile="__main__.py",
+                                 doraise=True, invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        boot_pyc = Path(pyc).read_bytes()
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    # Three members, not one per module: zipimport parses the whole directory on every start.
+    with zipfile.ZipFile(tmp, "w") as z:
+        z.writestr("__main__.pyc", boot_pyc)  # used when the running interpreter's magic matches
+        z.writestr("__main__.py", boot)
+        z.writestr("payload.zip", payload.getvalue())
+    tmp.write_bytes(b"#!/usr/bin/env python3\n" + tmp.read_bytes())  # zip offsets tolerate a prefix
+    tmp.chmod(0o755)
+    tmp.replace(out)
+    return build_id
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Build the single-file cairn zipapp.")
+    ap.add_argument("--out", default="cairn.pyz")
+    args = ap.parse_args(argv)
+    out = Path(args.out).resolve()
+    build_id = build(out)
+    print(f"built {out} ({len(members())} modules, build {build_id})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""One entry point for every cairn script: `cairn <skill> <command> [args]`.
+
+    cairn cap check --class render-perf        # capability-ledger/cap_check.py
+    cairn inquiry predict --claim ... --confidence 0.8
+    cairn lib lookup react
+    cairn --help                               # the command table
+    cairn metrics --repo .                     # latency percentiles per command (metrics.py)
+
+Each command is the same script main(argv) it always was; the table below only
+names it. Dispatch is deliberately cheap: no argparse here, no scan of the skill
+dirs — the one script named is imported (its own imports are its business) and
+nothing else, so `cairn x y` costs what `python x/y.py` does.
+
+Runs from any layout a script already runs from:
+  plugin tree   plugins/cairn/lib/cli.py        -> skills/<skill>/scripts/
+  mirror        .harness/_lib/cli.py             -> .harness/<skill>/
+  zipapp        cairn.pyz (cairnzip.py builds it; extracts to that mirror layout)
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# alias -> (skill dir, {command -> script stem})
+COMMANDS: dict[str, tuple[str, dict[str, str]]] = {
+    "boundary": ("boundary-discipline", {"scan": "scan"}),
+    "cap": ("capability-ledger", {"check": "cap_check", "record": "cap_record", "close-loop": "close_loop"}),
+    "boot": ("entity-boot", {"orient": "orient", "reflect": "reflect"}),
+    "feature": ("feature-workflow", {
+        "change-check": "change_check", "change-new": "change_new", "design-system": "design_system",
+        "plan-check": "plan_check", "plan-new": "plan_new", "promote": "promote",
+        "shelf-index": "shelf_index", "skeleton": "skeleton", "verify": "verify"}),
+    "harness": ("harness-setup", {"agents-init": "agents_init", "config-check": "config_check",
+                                  "config-init": "config_init"}),
+    "inquiry": ("inquiry", {"calibration": "calibration", "observe": "observe", "predict": "predict"}),
+    "ratchet": ("knowledge-ratchet", {"ratchet": "ratchet"}),
+    "lib": ("library-knowledge", {"lookup": "lib_lookup", "migrate": "lib_migrate",
+                                  "outcome": "lib_outcome", "refresh": "lib_refresh"}),
+    "models": ("mental-models", {"lookup": "models_lookup", "record": "models_record"}),
+    "specialist": ("specialist-knowledge", {"lookup": "specialist_lookup", "refresh": "specialist_refresh"}),
+    "tool": ("toolsmith", {"check": "tool_check", "forge": "tool_forge", "motion-observe": "motion_observe"}),
+}
+_BY_SKILL = {skill: alias for alias, (skill, _) in COMMANDS.items()}
+
+
+def scripts_dir(skill: str) -> Path | None:
+    here = Path(__file__).resolve().parent
+    for d in (here.parent / skill, here.parent / "skills" / skill / "scripts"):
+        if d.is_dir():
+            return d
+    return None
+
+
+def usage() -> str:
+    lines = ["usage: cairn <skill> <command> [args]   (cairn <skill> <command> --help for its flags)", ""]
+    for alias, (skill, cmds) in COMMANDS.items():
+        lines.append(f"  {alias:<11} {skill:<21} {' | '.join(cmds)}")
+    lines.append(f"  {'metrics':<11} {'(lib/metrics.py)':<21} latency percentiles per command")
+    return "\n".join(lines)
+
+
+def resolve(skill: str, command: str) -> tuple[Path, str]:
+    """(scripts dir, module name) for `skill command`; LookupError if unknown."""
+    alias = skill if skill in COMMANDS else _BY_SKILL.get(skill)
+    if alias is None:
+        raise LookupError(f"unknown skill '{skill}'")
+    name, cmds = COMMANDS[alias]
+    stem = cmds.get(command) or cmds.get(command.replace("_", "-"))
+    if stem is None:
+        raise LookupError(f"unknown command '{command}' for {name} (have: {', '.join(cmds)})")
+    d = scripts_dir(name)
+    if d is None or not (d / f"{stem}.py").is_file():
+        raise LookupError(f"{name}/{stem}.py is not installed next to {Path(__file__).resolve().parent}")
+    return d, stem
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["metrics"]:
+        import metrics
+        return metrics.main(argv[1:])
+    if len(argv) < 2 or argv[0] in ("-h", "--help"):
+        print(usage(), file=sys.stdout if argv[:1] in (["-h"], ["--help"]) else sys.stderr)
+        return 0 if argv[:1] in (["-h"], ["--help"]) else 2
+    try:
+        d, stem = resolve(argv[0], argv[1])
+    except LookupError as e:
+        print(f"cairn: {e}\n\n{usage()}", file=sys.stderr)
+        return 2
+    import metrics
+    metrics.begin(f"{d.parent.name if d.name == 'scripts' else d.name}/{stem}")
+    sys.path.insert(0, str(d))  # the script's own siblings (store, maturity, ...) resolve as before
+    sys.argv = [f"cairn {argv[0]} {argv[1]}", *argv[2:]]  # argparse prog / usage lines
+    import importlib
+    return importlib.import_module(stem).main(argv[2:]) or 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
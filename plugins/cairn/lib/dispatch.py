@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Run a sibling skill's script in THIS interpreter instead of a child one.
+
+Closing a loop chains scripts across skills (close_loop -> cap_record,
+models_record, cap_check; observe / lib_outcome -> models_record). A child
+interpreter per hop costs a startup plus re-importing everything, and passing a
+model meant a temp file. run() instead loads the script's module once per
+process and calls its main(argv) with stdout/stderr captured, so the caller
+handles the result exactly as it handled subprocess.run's:
+
+    proc = dispatch.run(models_record, ["--repo", ".", "--smell", s, "--from-json", "-"],
+                        stdin=json.dumps(model), model=model)
+    proc.returncode, proc.stdout, proc.stderr
+
+Keyword arguments go to main() in-process only (models_record takes the model
+dict directly); `stdin` is what a child reads instead. A child interpreter is
+still used when the script defines no main() — a bare script does its work at
+import, so it is never imported here — or when CAIRN_DISPATCH=subprocess.
+
+Every skill's scripts dir has its own `store` (and other same-named siblings),
+so while a script runs its directory's modules are swapped into sys.modules and
+the caller's are put back afterwards; each dir keeps its own copies between
+calls. An exception escaping the import or main() is a failed run (returncode
+1, traceback in stderr), not a reason to run the script a second time in a child:
+it may already have written.
+"""
+from __future__ import annotations
+
+import importlib.util
+import io
+import os
+import subprocess
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+_scripts: dict[str, object] = {}                 # script path -> loaded module
+_siblings: dict[str, dict[str, object]] = {}     # scripts dir -> its own sibling modules
+
+
+def _child(script: Path, argv: list[str], stdin: str | None) -> subprocess.CompletedProcess:
+    import tracing
+    with tracing.span("spawn", "dispatch", script=script.name) as s:
+        proc = subprocess.run([sys.executable, str(script), *argv], input=stdin,
+                              capture_output=True, text=True)
+        s.set(returncode=proc.returncode)
+    return proc
+
+
+def _names(d: Path) -> set[str]:
+    return {f.stem for f in d.glob("*.py")}
+
+
+def _from(m, d: Path) -> bool:
+    f = getattr(m, "__file__", None)
+    return bool(f) and Path(f).resolve().parent == d
+
+
+def _swap_in(d: Path) -> tuple[dict, set[str], bool]:
+    """Put `d`'s own modules in sys.modules; return the caller's it displaced and
+    the names to clear afterwards (those the caller did not already share)."""
+    names = _names(d)
+    theirs = {n: sys.modules.pop(n) for n in names if n in sys.modules and not _from(sys.modules[n], d)}
+    shared = {n for n in names if n in sys.modules}  # the caller lives in `d` too
+    sys.modules.update(_siblings.get(str(d), {}))
+    added = str(d) not in sys.path
+    if added:
+        sys.path.insert(0, str(d))
+    return theirs, names - shared, added
+
+
+def _swap_out(d: Path, theirs: dict, clear: set[str], added: bool) -> None:
+    mine = _siblings.setdefault(str(d), {})
+    for n in clear:
+        m = sys.modules.pop(n, None)
+        if m is not None and _from(m, d):
+            mine[n] = m
+    sys.modules.update(theirs)
+    if added:
+        try: sys.path.remove(str(d))
+        except ValueError: pass
+
+
+def _load(script: Path):
+    mod = _scripts.get(str(script))
+    if mod is None:
+        spec = importlib.util.spec_from_file_location(
+            f"_cairn_{script.parent.name}_{script.stem}".replace("-", "_"), script)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        _scripts[str(script)] = mod
+    return mod
+
+
+def run(script: Path, argv: list[str], stdin: str | None = None, **kwargs) -> subprocess.CompletedProcess:
+    """`script`'s main(argv, **kwargs) with output captured; see the module docstring."""
+    script = Path(script).resolve()
+    argv = [str(a) for a in argv]
+    if os.environ.get("CAIRN_DISPATCH") == "subprocess":
+        return _child(script, argv, stdin)
+    try:
+        source = script.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        source = ""
+    if "def main(" not in source:  # a bare script runs at import: give it its own interpreter
+        return _child(script, argv, stdin)
+    import tracing
+    with tracing.span("dispatch", "dispatch", script=script.name) as s:
+        proc = _in_process(script, argv, stdin, **kwargs)
+        s.set(returncode=proc.returncode)
+    return proc
+
+
+def _in_process(script: Path, argv: list[str], stdin: str | None, **kwargs) -> subprocess.CompletedProcess:
+    d = script.parent
+    swapped = _swap_in(d)
+    out, err = io.StringIO(), io.StringIO()
+    old_stdin, sys.stdin = sys.stdin, io.StringIO(stdin or "")
+    try:
+        with redirect_stdout(out), redirect_stderr(err):
+            try:
+                rc = _load(script).main(argv, **kwargs)
+            except SystemExit as e:  # argparse errors, sys.exit()
+                rc = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                if not isinstance(e.code, (int, type(None))):
+                    print(e.code, file=sys.stderr)
+            except Exception:  # noqa: BLE001 — what a child would have printed and exited 1 on
+                traceback.print_exc()
+                rc = 1
+    finally:
+        sys.stdin = old_stdin
+        _swap_out(d, *swapped)
+    return subprocess.CompletedProcess([str(script), *argv], rc or 0, out.getvalue(), err.getvalue())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Group commit for append-heavy stores: many writers, one append per batch.
+
+A direct upsert pays a lock round-trip and an fsync per record, so a session
+logging hundreds of predictions is dominated by fsync latency. Here a writer:
+
+  1. spools its line(s) into `<store>.queue/<ns>-<pid>-<nonce>.rec` (tmp + rename,
+     so a flusher never reads half a spool file);
+  2. lingers up to `max_delay` WITHOUT the lock, so the writers arriving meanwhile
+     spool too and readers are never held up by the wait;
+  3. takes the store's writer lock. If its spool file is gone by then, another
+     writer already flushed it — a flusher claims a spool file by renaming it to
+     `.taken` and deletes that only once its batch is durable — so the record is
+     durable: return.
+  4. Otherwise it is the flusher: it claims every spool file, appends their lines
+     in arrival order with ONE write + fsync, deletes the claimed files and
+     releases.
+
+So upsert() still returns only once the record is on disk: a caller that reports
+an id after it returns has reported a durable record. A writer that crashes
+before step 3 leaves a spool file the next flusher commits.
+
+A flusher that crashes after claiming must not have its claims committed twice:
+an update to one of those keys may have landed since, and a replayed stale line
+would be the newest and silently undo it. So the batch is appended through the
+log engine's journal, which names the claims it settles; the next lock holder's
+recovery (logstore._recover) rolls back a batch cut short and leaves its claims
+for the next flusher, or deletes the claims of a batch that landed. A `.taken`
+file a flusher still finds under the lock was therefore never committed. That
+costs one journal fsync per batch on top of the append's.
+
+A writer whose lock wait fails (a timeout) withdraws its record by unlinking its
+own spool file, and reports the failure only if that unlink wins. Once a flusher
+has claimed the file the record is on its way in, so the writer waits on the
+lock until the claim is resolved and returns normally: the flusher committed it,
+or it died and this writer commits what it left.
+"""
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+
+def queue_dir(p: Path) -> Path:
+    return p.with_suffix(p.suffix + ".queue")
+
+
+def _spool(p: Path, lines: list[str]) -> Path:
+    q = queue_dir(p)
+    q.mkdir(parents=True, exist_ok=True)
+    name = f"{time.time_ns():020d}-{os.getpid()}-{os.urandom(4).hex()}"
+    tmp = q / (name + ".tmp")
+    tmp.write_text("".join(line + "\n" for line in lines), encoding="utf-8")  # no fsync: the flush is the commit
+    final = q / (name + ".rec")
+    os.replace(tmp, final)
+    return final
+
+
+def _taken(spool: Path) -> Path:
+    return spool.with_suffix(".taken")
+
+
+def _drain(p: Path) -> int:
+    """Claim every spool file and append their records with one fsync; the journal
+    drops the claims once that is durable. The caller holds the writer lock, so a
+    `.taken` file found here is a dead flusher's uncommitted batch: committed now.
+    Returns the number of lines committed."""
+    import logstore
+    q = queue_dir(p)
+    try:
+        batch = sorted(list(q.glob("*.rec")) + list(q.glob("*.taken")), key=lambda f: f.stem)
+    except OSError:
+        return 0
+    lines: list[str] = []
+    taken: list[Path] = []
+    for f in batch:
+        claim = _taken(f)
+        try:
+            if f != claim:
+                os.rename(f, claim)  # atomic: from here its writer can no longer withdraw it
+            lines.extend(line for line in claim.read_text(encoding="utf-8").splitlines() if line.strip())
+        except OSError:
+            continue
+        taken.append(claim)
+    if lines:
+        logstore.append_lines(p, lines, settles=taken)
+    else:
+        for f in taken:
+            try: f.unlink()
+            except OSError: pass
+    return len(lines)
+
+
+def append(p: Path, lines: list[str], max_delay: float, after=None) -> None:
+    """Append `lines` durably via the group commit; see the module docstring.
+    `after` runs in the flusher, under the lock, after a batch is written
+    (the log engine's compaction check)."""
+    import logstore
+    mine = _spool(p, lines)
+    def _flush():
+        if not mine.exists() and not _taken(mine).exists():
+            return  # a flusher ahead of us committed it
+        if _drain(p) and after is not None:
+            after()
+    try:
+        if max_delay > 0:
+            time.sleep(max_delay)
+        logstore.locked(p, _flush)
+    except BaseException as e:
+        try:
+            mine.unlink()  # still unclaimed: withdrawn, so no later flusher commits what we report failed
+        except FileNotFoundError:
+            if isinstance(e, Exception):
+                _settle(p, mine, after)
+                return
+        raise
+
+
+def _settle(p: Path, mine: Path, after) -> None:
+    """Our spool was claimed: wait for the lock until that claim is resolved. Under
+    the lock (after recovery) a claim still present was never committed, so it is
+    committed here; a vanished one is durable."""
+    import logstore
+    def _resolve():
+        if _taken(mine).exists() and _drain(p) and after is not None:
+            after()
+    while True:
+        try:
+            return logstore.locked(p, _resolve)
+        except TimeoutError:
+            continue
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Persistent key -> (offset, length) index beside a log-structured JSONL store.
+
+read_one used to parse every line until the key turned up, and a miss parsed the
+whole file. With `<store>.idx` a hit seeks straight to its line and parses ONE
+record; a miss is answered from the index without opening the data file.
+
+The index records the store's inode, the byte length it covers and the mtime at
+that length. The log only grows by appends and is only rewritten by compaction
+(a new inode via os.replace), so:
+  same inode, same size, same mtime -> fresh, use as is;
+  same inode, larger                -> fresh for its prefix; index the appended tail;
+  anything else                     -> rebuilt from the start.
+A hit is still checked (the line at the offset must carry the key) so an in-place
+edit that fooled the stat check costs a rebuild, never a wrong answer. Writers
+never touch the index — an append stays O(record) — readers catch it up.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+
+def index_path(p: Path) -> Path:
+    return p.with_suffix(p.suffix + ".idx")
+
+
+def _load(p: Path, key: str) -> dict | None:
+    try:
+        idx = json.loads(index_path(p).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(idx, dict) or idx.get("key") != key or not isinstance(idx.get("offsets"), dict):
+        return None
+    return idx
+
+
+def _scan(p: Path, key: str, start: int, offsets: dict) -> tuple[int, os.stat_result]:
+    """Index complete lines from `start`; return the offset after the last one and
+    the file's stat at that point. A torn final line (no newline yet) is left for
+    a later pass."""
+    pos = start
+    with open(p, "rb") as f:
+        f.seek(start)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            line = raw.strip()
+            if line:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    rec = None
+                if isinstance(rec, dict) and isinstance(rec.get(key), str):
+                    offsets[rec[key]] = [pos, len(raw)]
+            pos += len(raw)
+        return pos, os.fstat(f.fileno())
+
+
+def _save(p: Path, idx: dict) -> None:
+    """Best effort: an unwritable index only costs the next reader a rescan."""
+    import tempfile
+    try:
+        fd, tmp = tempfile.mkstemp(dir=str(p.parent), prefix=".tmp-", suffix=".idx")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(idx, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, index_path(p))
+    except OSError:
+        pass
+
+
+def fresh(p: Path, key: str, st: os.stat_result | None = None, rebuild: bool = False) -> dict:
+    """The index for `p`, caught up with the data file (and persisted if it moved)."""
+    st = st or os.stat(p)
+    idx = None if rebuild else _load(p, key)
+    if idx is not None and idx.get("inode") == st.st_ino:
+        covered = idx.get("size", -1)
+        if covered == st.st_size and idx.get("mtime_ns") == st.st_mtime_ns:
+            return idx
+        if not isinstance(covered, int) or covered > st.st_size or covered == st.st_size:
+            idx = None  # shrank, or rewritten in place at the same length
+    else:
+        idx = None
+    if idx is None:
+        idx = {"key": key, "inode": st.st_ino, "size": 0, "offsets": {}}
+    idx["size"], after = _scan(p, key, idx["size"], idx["offsets"])
+    if after.st_ino != idx["inode"]:  # compacted between our stat and open
+        idx = {"key": key, "inode": after.st_ino, "size": 0, "offsets": {}}
+        idx["size"], after = _scan(p, key, 0, idx["offsets"])
+        idx["inode"] = after.st_ino
+    idx["mtime_ns"] = after.st_mtime_ns
+    _save(p, idx)
+    return idx
+
+
+def _read_at(p: Path, loc) -> dict | None:
+    try:
+        off, length = int(loc[0]), int(loc[1])
+        with open(p, "rb") as f:
+            f.seek(off)
+            rec = json.loads(f.read(length))
+    except (OSError, ValueError, TypeError, IndexError):
+        return None
+    return rec if isinstance(rec, dict) else None
+
+
+def read_one(p: Path, key: str, value: str) -> dict | None:
+    """Newest record for `value` via the index: one seek on a hit, no data read on
+    a miss against a fresh index."""
+    try:
+        st = os.stat(p)
+    except FileNotFoundError:
+        return None
+    idx = fresh(p, key, st)
+    loc = idx["offsets"].get(value)
+    if loc is None:
+        return None
+    rec = _read_at(p, loc)
+    if rec is not None and rec.get(key) == value:
+        return rec
+    # the file changed under the index without moving its stat: start over once
+    loc = fresh(p, key, os.stat(p), rebuild=True)["offsets"].get(value)
+    rec = _read_at(p, loc) if loc is not None else None
+    return rec if rec is not None and rec.get(key) == value else None
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""Log-structured JSONL engine shared by every cairn store port.
+
+A store is a JSONL file of self-describing records, each keyed by one field
+(problem_class, id, name, smell, domain, key). A write APPENDS one line instead of
+re-reading and rewriting the whole file, so an upsert costs O(record), not
+O(store). The last line for a key wins; reads resolve the newest version.
+
+Superseded lines are dead weight. Compaction is threshold-triggered: after an
+append, once the file has doubled since it was last checked, the writer counts
+dead lines and — if they are at least DEAD_RATIO of a store past MIN_LINES —
+rewrites it (atomically, inside the same lock) holding only live records. The
+size check is one stat(), so the scan it guards is amortized over the appends
+that grew the file. compact() forces the same rewrite on demand.
+
+read_one goes through keyindex.py (a key -> offset sidecar) instead of scanning,
+behind a Bloom filter (bloom.py) so a definite miss costs a few bit tests. A
+store compacted sorted by its key (order="name") is bisected instead
+(sortedlog.py). Writers hold storelock.py's exclusive flock; read_all / read_one
+hold it shared. Parsed stores are memoized per process by file identity
+(storecache.py) and dropped on this process's own writes; when a store daemon
+runs (storedaemon.py), a process with no parse of its own asks it instead.
+batch() stages several upserts under one lock and commits them as one journaled
+append, so multi-record changes are atomic and cost one fsync.
+
+The format is still plain JSONL: a reader that keeps the last line per key (which
+is what a dict-building reader does) sees the same store. A torn final line from
+a crashed append is skipped on read and fenced off by the next append.
+
+The store ports (skills/*/scripts/store.py) keep their signatures and delegate
+here; no consumer changes.
+"""
+from __future__ import annotations
+
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from collections.abc import Callable, Iterable, Iterator  # not typing: ~4 ms at every start
+
+import metrics  # a cairn script that reaches this records its latency at exit
+
+DEAD_RATIO = 0.5  # compact once half the lines are superseded versions
+MIN_LINES = 64    # below this a rewrite costs more than the dead lines do
+MARK = "_logstore"  # a store's own header line (sortedlog.py), never a record
+
+Order = "str | Callable[[dict], object] | None"  # a field to bisect on, or a sort key fn
+
+
+def _key(rec: dict, key: str) -> str | None:
+    k = rec.get(key)
+    return k if isinstance(k, str) else None
+
+
+def _parse(line: str) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        rec = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return rec if isinstance(rec, dict) and MARK not in rec else None
+
+
+def scan(p: Path) -> Iterator[dict]:
+    """Every well-formed record line, oldest first, superseded versions included."""
+    if not p.exists():
+        return
+    import tracing
+    if tracing.on():  # read, then parse, so a trace shows which of the two a scan is
+        with tracing.span("store.read", "io", store=p.name) as s:
+            lines = p.read_text(encoding="utf-8").splitlines()
+            s.set(lines=len(lines))
+        with tracing.span("store.parse", "parse", store=p.name, lines=len(lines)):
+            recs = [r for r in map(_parse, lines) if r is not None]
+        yield from recs
+        return
+    with p.open(encoding="utf-8") as f:
+        for line in f:
+            rec = _parse(line)
+            if rec is not None:
+                yield rec
+
+
+def resolve(p: Path, key: str) -> dict[str | None, dict]:
+    """Newest version per key, in first-seen order (the order the old rewrite kept)."""
+    live: dict[str | None, dict] = {}
+    for rec in scan(p):
+        live[_key(rec, key)] = rec
+    return live
+
+
+def _daemon(p: Path, key: str, op: str, **args):
+    """The store daemon's answer, or storedaemon.UNAVAILABLE: there is none, this
+    process already parsed the current file, or it holds the store's lock itself
+    (the daemon's shared lock would queue behind ours)."""
+    import storecache, storedaemon, storelock, tracing
+    if storelock.holding(p) or storecache.peek(p, key) is not None:
+        return storedaemon.UNAVAILABLE
+    if not tracing.on():
+        return storedaemon.call(p, op, key=key, **args)
+    with tracing.span("daemon.call", "read", store=p.name, op=op) as s:
+        got = storedaemon.call(p, op, key=key, **args)
+        s.set(served=got is not storedaemon.UNAVAILABLE)
+    return got
+
+
+def read_all(p: Path, key: str) -> list[dict]:
+    """Every live record. The parse is memoized per file identity (storecache)."""
+    import storecache, storedaemon
+    metrics.touch(p)
+    got = _daemon(p, key, "read_all")
+    if got is not storedaemon.UNAVAILABLE:
+        return got
+    def _read():
+        live = storecache.resolved(p, key, lambda: resolve(p, key))
+        return [storecache.thaw(r) for r in live.values()]
+    return _shared(p, _read)
+
+
+def read_one(p: Path, key: str, value: str) -> dict | None:
+    """The newest record for `value`. A store compacted sorted by `key` is bisected
+    in place (sortedlog); any other asks the Bloom filter (bloom) — a definite
+    miss ends there — then the key -> offset sidecar (keyindex): a hit seeks to
+    one line, a miss does not read the data file."""
+    import bloom, keyindex, sortedlog, storecache, storedaemon, tracing
+    metrics.touch(p)
+    got = _daemon(p, key, "read_one", value=value)
+    if got is not storedaemon.UNAVAILABLE:
+        return got
+    def _read():
+        live = storecache.peek(p, key)
+        if live is not None:  # this process already parsed the current file
+            return storecache.thaw(live.get(value))
+        with tracing.span("store.bisect", "read", store=p.name):
+            rec = sortedlog.read_one(p, key, value)
+        if rec is not sortedlog.UNSORTED:
+            return rec
+        with tracing.span("bloom.check", "read", store=p.name) as s:
+            maybe = bloom.may_contain(p, key, value)
+            s.set(maybe=maybe)
+        if not maybe:
+            return None
+        with tracing.span("index.seek", "read", store=p.name):
+            return keyindex.read_one(p, key, value)
+    return _shared(p, _read)
+
+
+def stats(p: Path, key: str) -> dict:
+    """What a --stats view shows: size, live vs superseded lines, whether the file
+    is bisectable, and the Bloom filter's shape and estimated false-positive rate."""
+    import bloom, sortedlog
+    def _stats():
+        if not p.exists():
+            return {"path": str(p), "exists": False}
+        total, live = 0, set()
+        for rec in scan(p):
+            total += 1
+            live.add(_key(rec, key))
+        with open(p, "rb") as f:
+            region = sortedlog.sorted_region(f, key)
+        return {"path": str(p), "exists": True, "bytes": p.stat().st_size, "lines": total,
+                "live": len(live), "dead": total - len(live), "sorted": region is not None,
+                "bloom": bloom.stats(p, key)}
+    return _shared(p, _stats)
+
+
+def locked(p: Path, fn):
+    """Hold the store's exclusive (writer) lock across the WHOLE read-modify-write."""
+    import storelock
+    with storelock.hold(p):
+        _recover(p)
+        return fn()
+
+
+def _shared(p: Path, fn):
+    """Readers take the shared lock so they never interleave with a compaction's
+    scan-and-replace; a store that does not exist yet has nothing to guard."""
+    if not p.exists():
+        return fn()
+    if _journal_path(p).exists():  # a writer died mid-batch: roll it back first
+        locked(p, lambda: None)
+    import storelock
+    with storelock.hold(p, shared=True):
+        return fn()
+
+
+def atomic_write_lines(p: Path, lines: Iterable[str]) -> None:
+    """Temp-file + rename so a crash or concurrent read never sees a half-written store."""
+    import os, tempfile, tracing
+    metrics.touch(p)
+    with tracing.span("store.write", "write", store=p.name):
+        fd, tmp = tempfile.mkstemp(dir=str(p.parent), prefix=".tmp-", suffix=".jsonl")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines)); f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, p)
+    _written(p)
+
+
+def _written(p: Path) -> None:
+    """This process changed `p`: its cached parse is gone, whatever the stat says.
+    (The orientation digest needs no word: orientdigest.py revalidates by stat.)"""
+    import storecache
+    storecache.invalidate(p)
+
+
+def _dump(rec: dict) -> str:
+    return json.dumps(rec, ensure_ascii=False)
+
+
+def _journal_path(p: Path) -> Path:
+    return p.with_suffix(p.suffix + ".pending")
+
+
+def _recover(p: Path) -> None:
+    """Undo a journaled append that a crash cut short: the journal names the size
+    before the batch and the size it commits at; anything in between is truncated.
+    A batch that did land has its `settles` files (group commit's claimed spools)
+    removed, which its writer died before doing. The caller holds the writer lock,
+    so nothing has been appended since the crash."""
+    import os
+    j = _journal_path(p)
+    try:
+        span = json.loads(j.read_text(encoding="utf-8"))
+        start, end = int(span["from"]), int(span["to"])
+        settles = [str(f) for f in span.get("settles", [])]
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError, KeyError, TypeError):
+        start = end = None
+        settles = []
+    try:
+        if start is not None and start <= p.stat().st_size < end:
+            os.truncate(p, start)
+            _written(p)
+        elif start is not None:
+            _unlink_all(settles)
+    except OSError:
+        pass
+    try: j.unlink()
+    except OSError: pass
+
+
+def _unlink_all(paths) -> None:
+    import os
+    for f in paths:
+        try: os.unlink(f)
+        except OSError: pass
+
+
+def append_lines(p: Path, lines: list[str], journal: bool = True,
+                 settles: list[Path] | None = None) -> None:
+    """Append whole lines with one write + fsync. If a crashed writer left a torn
+    last line, start on a fresh line so the new record is not glued onto it. More
+    than one line is journaled (<store>.pending) so a crash mid-write rolls the
+    whole batch back rather than leaving half of it live (journal=False skips it).
+    `settles` are files the batch makes obsolete: they are journaled too, even for
+    one line, and removed once it is durable — after a crash, by _recover if and
+    only if the batch landed. The caller holds the lock."""
+    import os, tracing
+    metrics.touch(p)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with tracing.span("store.append", "write", store=p.name, lines=len(lines)), open(p, "ab+") as f:
+        start = f.tell()
+        if start > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                lines = [""] + lines
+        data = "".join(line + "\n" for line in lines).encode("utf-8")
+        j = _journal_path(p) if settles or (journal and len(lines) > 1) else None
+        if j is not None:
+            span = {"from": start, "to": start + len(data)}
+            if settles:
+                span["settles"] = [str(f) for f in settles]
+            with open(j, "w", encoding="utf-8") as jf:
+                jf.write(json.dumps(span)); jf.flush(); os.fsync(jf.fileno())
+        f.write(data)
+        f.flush(); os.fsync(f.fileno())
+    _written(p)
+    _unlink_all(settles or [])
+    if j is not None:
+        j.unlink()
+
+
+def write_all(p: Path, records: Iterable[dict], sorted_by: str | None = None) -> None:
+    """Replace the store with exactly `records` (used for migration and compaction).
+    With `sorted_by`, the file is laid out sorted on that field behind a header
+    marking it binary-searchable (sortedlog.py)."""
+    if sorted_by is None:
+        atomic_write_lines(p, [_dump(r) for r in records])
+    else:
+        import sortedlog
+        atomic_write_lines(p, sortedlog.layout(records, sorted_by))
+    _save_checked(p)
+
+
+def _meta_path(p: Path) -> Path:
+    return p.with_suffix(p.suffix + ".meta")
+
+
+def _checked_size(p: Path) -> int | None:
+    try:
+        return int(json.loads(_meta_path(p).read_text(encoding="utf-8"))["checked_size"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_checked(p: Path) -> None:
+    try:
+        size = p.stat().st_size
+    except OSError:
+        return
+    _meta_path(p).write_text(json.dumps({"checked_size": size}) + "\n", encoding="utf-8")
+
+
+def compact(p: Path, key: str, order: Order = None) -> int:
+    """Rewrite the store holding only live records. Returns dead lines dropped.
+    `order` is a sort key function, or a field name to sort by AND mark the file
+    sorted (bisectable). The caller holds the lock."""
+    total, live = 0, {}
+    for rec in scan(p):
+        total += 1
+        live[_key(rec, key)] = rec
+    if isinstance(order, str):
+        write_all(p, live.values(), sorted_by=order)
+    else:
+        write_all(p, sorted(live.values(), key=order) if order else live.values())
+    return total - len(live)
+
+
+def _maybe_compact(p: Path, key: str, order) -> None:
+    size = p.stat().st_size
+    checked = _checked_size(p)
+    if checked is None:
+        _save_checked(p)
+        return
+    if size < 2 * max(checked, 1):
+        return
+    total, live = 0, set()
+    for rec in scan(p):
+        total += 1
+        live.add(_key(rec, key))
+    if total >= MIN_LINES and (total - len(live)) / total >= DEAD_RATIO:
+        compact(p, key, order)
+    else:
+        _save_checked(p)
+
+
+def upsert(p: Path, key: str, rec: dict, order: Order = None) -> None:
+    """Append `rec` as the newest version of its key (last writer wins)."""
+    def _append():
+        append_lines(p, [_dump(rec)])
+        _maybe_compact(p, key, order)
+    locked(p, _append)
+
+
+class Batch:
+    """Mutations staged in memory under one writer lock; see batch()."""
+
+    def __init__(self, p: Path, key: str):
+        self._p, self._key = p, key
+        self._staged: dict[str, dict] = {}
+
+    def read_one(self, value: str) -> dict | None:
+        """The newest version of `value`, this batch's staged writes included."""
+        if value in self._staged:
+            return self._staged[value]
+        return read_one(self._p, self._key, value)
+
+    def upsert(self, rec: dict) -> None:
+        k = _key(rec, self._key)
+        if k is None:
+            raise ValueError(f"record has no string '{self._key}'")
+        self._staged.pop(k, None)
+        self._staged[k] = rec
+
+    def update(self, value: str, updater) -> dict:
+        rec = updater(self.read_one(value))
+        self.upsert(rec)
+        return rec
+
+
+@contextmanager
+def batch(p: Path, key: str, order: Order = None) -> Iterator[Batch]:
+    """`with batch(p, key) as tx: tx.upsert(a); tx.upsert(b)` — one lock for the
+    whole block and one journaled append at the end, so the records land together
+    or not at all. Nothing is written if the block raises."""
+    import storelock
+    with storelock.hold(p):
+        _recover(p)
+        tx = Batch(p, key)
+        yield tx
+        if tx._staged:
+            append_lines(p, [_dump(r) for r in tx._staged.values()])
+            _maybe_compact(p, key, order)
+
+
+def upsert_grouped(p: Path, key: str, rec: dict, max_delay: float, order: Order = None) -> None:
+    """upsert() through a group commit (groupcommit.py): concurrent writers share
+    one append + fsync per batch. Returns once `rec` is durable."""
+    import groupcommit
+    groupcommit.append(p, [_dump(rec)], max_delay, after=lambda: _maybe_compact(p, key, order))
+
+
+def update(p: Path, key: str, value: str, updater,
+           order: Order = None) -> dict:
+    """Read the newest version of `value`, apply updater, append the result. The read
+    is inside the lock so a concurrent update cannot be lost."""
+    def _rmw():
+        rec = updater(read_one(p, key, value))
+        append_lines(p, [_dump(rec)])
+        _maybe_compact(p, key, order)
+        return rec
+    return locked(p, _rmw)
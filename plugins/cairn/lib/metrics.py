@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Always-on per-command metrics, and the `cairn metrics` report over them.
+
+Every cairn command that reaches lib/ (each store-backed script, orient, and any
+`cairn <skill> <command>`) appends ONE line at exit to `<repo>/.cairn/metrics.jsonl`:
+
+  {"ts": 1760000000.1, "cmd": "capability-ledger/cap_check", "ms": 18.4,
+   "out_bytes": 412, "out_tokens": 103, "stores": {"capability-ledger.jsonl": 48213}}
+
+`ms` is wall time from the first lib import to exit (the interpreter's own
+start is not visible from inside it); `stores` is the size of every store the
+command read or wrote; `out_bytes` is what it wrote to stdout and `out_tokens`
+the estimate of what that costs an agent's context (outmeter.py, which also
+notes what a --max-tokens budget dropped). The file rotates
+to metrics.1.jsonl at ROTATE_BYTES, so it never holds more than two generations.
+
+This is the promote-on-evidence trigger the store and retrieval docstrings talk
+about, made visible: a command whose p95 climbs with the size of the store it
+touches has earned compaction, an index, or a new backend.
+
+  cairn metrics --repo .                 # p50/p95/p99 per command, per day
+  cairn metrics --repo . --by all --json
+
+Recording is one stat per touched store and one O_APPEND write; it never fails
+the command. CAIRN_METRICS=off turns it off. Only a process started as a cairn
+script records — importing lib/ from a test or a bench does not.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+ROTATE_BYTES = 1 << 20
+NAME = "metrics.jsonl"
+
+_t0 = time.perf_counter()
+_touched: dict[str, None] = {}  # store paths, first-touched order
+_state = {"cmd": None, "repo": None, "out": None}
+_notes: dict = {}
+
+
+class _Counting:
+    """sys.stdout, counting the bytes written through it."""
+
+    def __init__(self, stream):
+        self._stream, self.n = stream, 0
+
+    def write(self, s):
+        self.n += len(s) if s.isascii() else len(s.encode("utf-8", "replace"))
+        return self._stream.write(s)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _command() -> str | None:
+    """skill/stem of the script this process was started as, or None if it is
+    not a cairn script (pytest, a bench, the store daemon)."""
+    argv0 = sys.argv[0] if sys.argv else ""
+    if argv0.startswith("cairn "):  # cli.py names it; see begin()
+        return None
+    p = os.path.abspath(argv0)
+    if not p.endswith(".py"):
+        return None
+    d = os.path.dirname(p)
+    if os.path.basename(d) == "scripts" and os.path.basename(os.path.dirname(os.path.dirname(d))) == "skills":
+        skill = os.path.basename(os.path.dirname(d))
+    elif os.path.basename(os.path.dirname(d)) == ".harness" and os.path.basename(d) != "_lib":
+        skill = os.path.basename(d)
+    else:
+        return None
+    return f"{skill}/{os.path.basename(p)[:-3]}"
+
+
+def begin(cmd: str) -> None:
+    """Record this process as `cmd` (idempotent; the first name given wins)."""
+    if _state["cmd"] is not None or os.environ.get("CAIRN_METRICS") == "off":
+        return
+    _state["cmd"] = cmd
+    _state["out"] = sys.stdout = _Counting(sys.stdout)
+    import atexit
+    atexit.register(_record)
+
+
+def touch(p) -> None:
+    """Note that this command read or wrote the store at `p`."""
+    if _state["cmd"] is not None:
+        _touched.setdefault(str(p))
+
+
+def note(**fields) -> None:
+    """Extra fields for this command's line (e.g. what a token budget dropped)."""
+    if _state["cmd"] is not None:
+        _notes.update(fields)
+
+
+def _repo() -> str | None:
+    if _state["repo"]:
+        return _state["repo"]
+    for p in _touched:  # stores live at the repo root
+        return os.path.dirname(p)
+    argv = sys.argv
+    for i, a in enumerate(argv):
+        if a == "--repo" and i + 1 < len(argv):
+            return os.path.abspath(argv[i + 1])
+        if a.startswith("--repo="):
+            return os.path.abspath(a[len("--repo="):])
+    return None
+
+
+def _record() -> None:
+    ms = (time.perf_counter() - _t0) * 1000
+    repo = _repo()
+    if not repo or not os.path.isdir(repo):
+        return
+    stores = {}
+    for p in _touched:
+        try:
+            stores[os.path.basename(p)] = os.stat(p).st_size
+        except OSError:
+            stores[os.path.basename(p)] = 0
+    out_bytes = _state["out"].n if _state["out"] is not None else 0
+    import json, outmeter
+    line = json.dumps({"ts": round(time.time(), 3), "cmd": _state["cmd"], "ms": round(ms, 2),
+                       "out_bytes": out_bytes, "out_tokens": outmeter.tokens(out_bytes), "stores": stores,
+                       **_notes}) + "\n"
+    try:
+        d = os.path.join(repo, ".cairn")
+        os.makedirs(d, exist_ok=True)
+        path = os.path.join(d, NAME)
+        try:
+            if os.stat(path).st_size >= ROTATE_BYTES:
+                os.replace(path, os.path.join(d, "metrics.1.jsonl"))
+        except FileNotFoundError:
+            pass
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # metrics never fail the command they measure
+
+
+def _auto() -> None:
+    cmd = _command()
+    if cmd is not None:
+        begin(cmd)
+
+
+_auto()
+
+
+# --- the report ---------------------------------------------------------------
+
+def load(repo) -> list[dict]:
+    """Every recorded invocation, oldest first (the rotated generation included)."""
+    import json
+    out = []
+    for name in ("metrics.1.jsonl", NAME):
+        p = os.path.join(str(repo), ".cairn", name)
+        try:
+            with open(p, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # a line torn by a full disk
+                    if isinstance(rec, dict) and isinstance(rec.get("ms"), (int, float)) and rec.get("cmd"):
+                        out.append(rec)
+        except OSError:
+            continue
+    out.sort(key=lambda r: r.get("ts", 0))
+    return out
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of `values` (q in 0..100)."""
+    s = sorted(values)
+    if not s:
+        return 0.0
+    import math
+    return s[max(0, min(len(s) - 1, math.ceil(q / 100 * len(s)) - 1))]
+
+
+def _period(ts: float, by: str) -> str:
+    if by == "all":
+        return "all"
+    import datetime as dt
+    d = dt.datetime.fromtimestamp(ts, dt.timezone.utc).date()
+    if by == "week":
+        y, w, _ = d.isocalendar()
+        return f"{y}-W{w:02d}"
+    return d.isoformat()
+
+
+def report(records: list[dict], by: str = "day", command: str | None = None) -> list[dict]:
+    """One row per (command, period): count, p50/p95/p99/max ms, the largest
+    total store size it touched, and its median output."""
+    groups: dict[tuple[str, str], list[dict]] = {}
+    for r in records:
+        if command and command not in r["cmd"]:
+            continue
+        groups.setdefault((r["cmd"], _period(r.get("ts", 0), by)), []).append(r)
+    rows = []
+    for (cmd, period), rs in sorted(groups.items()):
+        ms = [r["ms"] for r in rs]
+        rows.append({"cmd": cmd, "period": period, "n": len(rs),
+                     "p50_ms": round(percentile(ms, 50), 2), "p95_ms": round(percentile(ms, 95), 2),
+                     "p99_ms": round(percentile(ms, 99), 2), "max_ms": round(max(ms), 2),
+                     "store_bytes": max(sum((r.get("stores") or {}).values()) for r in rs),
+                     "out_bytes_p50": round(percentile([r.get("out_bytes", 0) for r in rs], 50)),
+                     "out_tokens_p95": round(percentile([r.get("out_tokens", 0) for r in rs], 95)),
+                     "truncated": sum(1 for r in rs if r.get("max_tokens"))})
+    return rows
+
+
+def main(argv=None) -> int:
+    import argparse, json
+    ap = argparse.ArgumentParser(prog="cairn metrics",
+                                 description="Latency percentiles per cairn command, from .cairn/metrics.jsonl.")
+    ap.add_argument("--repo", default=".")
+    ap.add_argument("--by", choices=("day", "week", "all"), default="day")
+    ap.add_argument("--command", default=None, help="only commands containing this (e.g. cap_check)")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+    _state["repo"] = os.path.abspath(args.repo)
+    rows = report(load(args.repo), args.by, args.command)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    if not rows:
+        print(f"no metrics recorded under {os.path.join(os.path.abspath(args.repo), '.cairn')} yet")
+        return 0
+    print(f"{'command':<38} {'period':<10} {'n':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'store KB':>9} {'out B':>7} {'tok p95':>8}")
+    for r in rows:
+        print(f"{r['cmd']:<38} {r['period']:<10} {r['n']:>5} {r['p50_ms']:>8} {r['p95_ms']:>8} "
+              f"{r['p99_ms']:>8} {r['store_bytes'] // 1024:>9} {r['out_bytes_p50']:>7} {r['out_tokens_p95']:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""The orientation digest: what orient.py / reflect.py print, kept current.
+
+Session start used to read five stores whole and re-derive every count. The
+digest, `<repo>/.cairn/orient-digest.json`, holds the finished summary (counts,
+the classes per maturity, open frictions, store sizes) and the stat of each
+store it was built from. Beside it, orient-digest.keys.json keeps per store what
+it takes to update that summary — the live keys, and for the ledger each class's
+maturity, for the ratchet each friction's status. Per store:
+
+  same inode, same size, same mtime -> fresh: nothing is read;
+  same inode, larger (append-only)  -> fold in only the appended tail;
+  anything else                     -> rescan that one store.
+
+So a session start with nothing changed costs five stats and one small JSON
+parse; the key sidecar is only read when something moved. Writers never touch
+the digest — an append stays O(record) however large the other stores are —
+and the next session start folds in what they appended. The stat check is the
+only invalidation there is: an append grows the file, a rewrite replaces its
+inode, so a hand edit or a writer without lib/ costs a tail fold or a rescan,
+never a wrong count. The ratchet is rewritten, never appended, so a change to
+it is always a rescan (it is small by design).
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+VERSION = 2
+NAME = "orient-digest.json"       # the summary + the store stats it is valid for
+KEYS = "orient-digest.keys.json"  # the live keys, read only to fold in a change
+
+# store file -> (key field, the one field per record the reports need, append-only)
+TRACKED: dict[str, tuple[str, str | None, bool]] = {
+    "capability-ledger.jsonl": ("problem_class", "maturity", True),
+    "lib-knowledge.jsonl": ("name", None, True),
+    "mental-models.jsonl": ("smell", None, True),
+    "specialist-profiles.jsonl": ("domain", None, True),
+    "ratchet.jsonl": ("key", "status", False),
+}
+
+
+def digest_path(repo: Path) -> Path:
+    return Path(repo) / ".cairn" / NAME
+
+
+def keys_path(repo: Path) -> Path:
+    return Path(repo) / ".cairn" / KEYS
+
+
+def _scan(p: Path, start: int, entry: dict) -> None:
+    """Fold complete lines from `start` into entry["live"] and record the stat the
+    entry now covers. One streaming pass: a line is parsed, its key and the one
+    field kept, and the record dropped, so memory follows the number of live keys,
+    never the size of the file. A torn final line is left for a later pass."""
+    import tracing
+    key, field, _ = TRACKED[p.name]
+    live = entry["live"]
+    pos = start
+    with tracing.span("digest.scan", "io", store=p.name, start=start) as s, open(p, "rb") as f:
+        f.seek(start)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            pos += len(raw)
+            try:
+                rec = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(rec, dict) and isinstance(rec.get(key), str):  # a sorted store's header has none
+                live[rec[key]] = rec.get(field) if field else None
+        st = os.fstat(f.fileno())
+        s.set(bytes=pos - start)
+    entry.update(inode=st.st_ino, size=pos, mtime_ns=st.st_mtime_ns)
+
+
+def _fresh_entry(p: Path, entry: dict | None) -> tuple[dict, bool]:
+    """(entry caught up with `p`, whether it changed)."""
+    try:
+        st = os.stat(p)
+    except FileNotFoundError:
+        return {"live": {}}, True
+    if entry and entry.get("inode") == st.st_ino and entry.get("size") == st.st_size \
+            and entry.get("mtime_ns") == st.st_mtime_ns:
+        return entry, False
+    append_only = TRACKED[p.name][2]
+    if entry and append_only and entry.get("inode") == st.st_ino and isinstance(entry.get("size"), int) \
+            and entry["size"] < st.st_size:
+        _scan(p, entry["size"], entry)
+        return entry, True
+    entry = {"live": {}}
+    _scan(p, 0, entry)
+    return entry, True
+
+
+def _load(path: Path) -> dict:
+    try:
+        d = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return d if isinstance(d, dict) and d.get("v") == VERSION else {}
+
+
+def _save(path: Path, d: dict) -> None:
+    """Best effort: an unwritable .cairn costs a rescan next time, nothing else."""
+    import tempfile
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(d, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _stat(p: Path) -> list | None:
+    try:
+        st = os.stat(p)
+    except FileNotFoundError:
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+def _catch_up(repo: Path, names) -> dict:
+    """Fold `names` into the live-key sidecar, then rewrite both files."""
+    keys = _load(keys_path(repo)).get("stores") or {}
+    for name in names:
+        keys[name], _ = _fresh_entry(repo / name, keys.get(name))
+    d = {"v": VERSION, "stat": {}, "summary": _summarize(keys)}
+    for name in TRACKED:
+        e = keys.get(name) or {}
+        d["stat"][name] = [e["inode"], e["size"], e["mtime_ns"]] if "inode" in e else None
+    _save(keys_path(repo), {"v": VERSION, "stores": keys})
+    _save(digest_path(repo), d)
+    return d
+
+
+def summary(repo: Path, persist: bool = True) -> dict:
+    """What orient.py and reflect.py print, current for `repo`. When every tracked
+    store still has the stat the digest was built at, that is one small file read.
+    persist=False ignores and leaves the digest alone: one streaming pass per store."""
+    repo = Path(repo)
+    if not persist:
+        return _summarize({name: _fresh_entry(repo / name, None)[0] for name in TRACKED})
+    d = _load(digest_path(repo))
+    stat = d.get("stat") or {}
+    moved = [name for name in TRACKED if stat.get(name) != _stat(repo / name)]
+    if moved or "summary" not in d:
+        d = _catch_up(repo, moved or list(TRACKED))
+    return d["summary"]
+
+
+def _summarize(stores: dict) -> dict:
+    """What orient.py and reflect.py print."""
+    live = {name: (stores.get(name) or {}).get("live") or {} for name in TRACKED}
+    by = {"proven": [], "practiced": [], "novice": []}
+    for cls, maturity in live["capability-ledger.jsonl"].items():
+        by[maturity if maturity in ("proven", "practiced") else "novice"].append(cls)
+    return {"proven": by["proven"], "practiced": by["practiced"], "novice": by["novice"],
+            "caps": len(live["capability-ledger.jsonl"]),
+            "libs": len(live["lib-knowledge.jsonl"]),
+            "models": len(live["mental-models.jsonl"]),
+            "profs": len(live["specialist-profiles.jsonl"]),
+            "ratchet_open": sum(1 for status in live["ratchet.jsonl"].values() if status != "promoted"),
+            "store_bytes": {name: (stores.get(name) or {}).get("size", 0) for name in TRACKED}}
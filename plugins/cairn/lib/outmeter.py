@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""What a read path puts into the agent's context, measured and bounded.
+
+The lookups (lib_lookup, specialist_lookup, models_lookup, cap_check --index,
+orient) are token-cheap by construction; this keeps them so as the stores grow.
+A command builds its output as blocks, each with a priority, and emits them
+through a Meter:
+
+    out = outmeter.Meter(args.max_tokens)
+    out.add("'render-perf': proven")          # priority 0: always kept (the verdict)
+    for hit in ranked:
+        out.add(line(hit), 1)                 # kept best-first while they fit
+    out.add(trailing_facts, 3)                # the first to go
+    out.emit()
+
+Under --max-tokens N the meter keeps every priority-0 block, then the rest in
+(priority, position) order until the next one would not fit, and prints the
+survivors in their original order with one line saying what was dropped. It
+stops at the first block that does not fit rather than skipping to a smaller
+one, so the output is always a prefix of each ranking, never a ranking with holes.
+
+Tokens are estimated, not counted: ~4 bytes per token (TOKEN_BYTES), the usual
+figure for English and code, and no tokenizer import at every start.
+Every command's bytes and tokens land in .cairn/metrics.jsonl (metrics.py);
+a truncation adds what was dropped.
+"""
+from __future__ import annotations
+
+import sys
+
+TOKEN_BYTES = 4
+MARK_TOKENS = 16  # held back for the "[... dropped ...]" line
+
+
+def tokens(text_or_bytes) -> int:
+    """Approximate tokens in a string, or in a byte count."""
+    n = text_or_bytes if isinstance(text_or_bytes, int) else len(text_or_bytes.encode("utf-8", "replace"))
+    return -(-n // TOKEN_BYTES)
+
+
+def add_argument(ap) -> None:
+    """The shared --max-tokens flag."""
+    ap.add_argument("--max-tokens", type=int, default=None,
+                    help="Bound the output to ~N tokens: the verdict stays, lower-priority lines go first.")
+
+
+def fit_list(items: list, max_tokens: int | None) -> list:
+    """The longest prefix of `items` (already ranked) whose JSON fits — for --json,
+    where a marker line would break the document."""
+    if not max_tokens or max_tokens <= 0:
+        return items
+    import json
+    used, out = 2, []
+    for item in items:
+        used += tokens(json.dumps(item, indent=2)) + 1
+        if used > max_tokens and out:
+            break
+        out.append(item)
+    if len(out) < len(items):
+        import metrics
+        metrics.note(max_tokens=max_tokens, dropped_items=len(items) - len(out))
+    return out
+
+
+class Meter:
+    def __init__(self, max_tokens: int | None = None):
+        self.max_tokens = max_tokens if max_tokens and max_tokens > 0 else None
+        self.blocks: list[tuple[int, str]] = []
+
+    def add(self, text: str, priority: int = 0) -> None:
+        """One block (one or more lines); lower priority numbers are kept first."""
+        self.blocks.append((priority, text))
+
+    def _fit(self) -> tuple[list[str], int]:
+        """(kept blocks in order, number of lines dropped)."""
+        if self.max_tokens is None:
+            return [t for _, t in self.blocks], 0
+        cost = [tokens(t + "\n") for _, t in self.blocks]
+        keep = {i for i, (p, _) in enumerate(self.blocks) if p <= 0}
+        used = sum(cost[i] for i in keep) + MARK_TOKENS
+        for i in sorted((i for i in range(len(self.blocks)) if i not in keep), key=lambda i: (self.blocks[i][0], i)):
+            if used + cost[i] > self.max_tokens:
+                break
+            keep.add(i)
+            used += cost[i]
+        dropped = sum(t.count("\n") + 1 for i, (_, t) in enumerate(self.blocks) if i not in keep)
+        return [t for i, (_, t) in enumerate(self.blocks) if i in keep], dropped
+
+    def render(self) -> str:
+        kept, dropped = self._fit()
+        if dropped:
+            kept.append(f"[... {dropped} line(s) dropped to fit --max-tokens {self.max_tokens}]")
+            import metrics
+            metrics.note(max_tokens=self.max_tokens, dropped_lines=dropped)
+        return "\n".join(kept)
+
+    def emit(self, file=None) -> None:
+        print(self.render(), file=file or sys.stdout)
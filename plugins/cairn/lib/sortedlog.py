@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Binary search over a key-sorted log-structured store — no sidecar needed.
+
+A store compacted with a string `order` (library-knowledge: order="name") is
+written sorted, one line per key, behind a fixed-width header line:
+
+    {"_logstore": {"sorted_by": "name", "end": 48213               }}
+
+`end` is the byte offset where the sorted region stops; appends after the last
+compaction (and keyless junk lines) live past it. A lookup bisects the sorted
+region by byte offset — each probe reads one line and decodes only its leading
+"name" value, never the whole record — so a hit costs O(log n) small reads.
+
+The header IS the marker. A file without it (legacy, hand-edited, written before
+this module, or compacted without an order) is not trusted to be sorted: read_one
+returns UNSORTED and the caller falls back to the key index / linear scan. So does
+a store whose unsorted tail has grown past TAIL_SCAN bytes (the index is cheaper
+there), and a sorted region whose probed line does not lead with the key.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+from collections.abc import Iterable
+
+import logstore
+
+UNSORTED = object()         # "this file cannot answer by bisection; ask the index"
+TAIL_SCAN = 64 * 1024       # past this many appended bytes, the index wins
+_WIDTH = 20
+_decoder = json.JSONDecoder()
+
+
+def _header(key: str, end: int) -> str:
+    return '{"%s": {"sorted_by": %s, "end": %-*d}}' % (logstore.MARK, json.dumps(key), _WIDTH, end)
+
+
+def layout(records: Iterable[dict], key: str) -> list[str]:
+    """Lines for a sorted store: header, keyed records by key (key field first),
+    then keyless records (kept, but outside the searchable region)."""
+    keyed, loose = [], []
+    for r in records:
+        k = r.get(key)
+        if isinstance(k, str):
+            keyed.append({key: k, **r})
+        else:
+            loose.append(r)
+    keyed.sort(key=lambda r: r[key])
+    lines = [json.dumps(r, ensure_ascii=False) for r in keyed]
+    end = len(_header(key, 0).encode("utf-8")) + 1 + sum(len(s.encode("utf-8")) + 1 for s in lines)
+    return [_header(key, end), *lines, *(json.dumps(r, ensure_ascii=False) for r in loose)]
+
+
+def sorted_region(f, key: str) -> tuple[int, int] | None:
+    """(start, end) of the sorted region if the open file carries a header for `key`."""
+    f.seek(0)
+    first = f.readline()
+    if not first.startswith(b'{"%s"' % logstore.MARK.encode()):
+        return None
+    try:
+        meta = json.loads(first)[logstore.MARK]
+        end = int(meta["end"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    if meta.get("sorted_by") != key or end < len(first):
+        return None
+    return len(first), end
+
+
+def _lead(raw: bytes, prefix: re.Pattern) -> str | None:
+    """The key value at the very start of a line, decoded without parsing the rest."""
+    text = raw.decode("utf-8", "replace")
+    m = prefix.match(text)
+    if not m:
+        return None
+    try:
+        value, _ = _decoder.raw_decode(text, m.end())
+    except ValueError:
+        return None
+    return value if isinstance(value, str) else None
+
+
+def _record(raw: bytes) -> dict | None:
+    try:
+        rec = json.loads(raw)
+    except ValueError:
+        return None
+    return rec if isinstance(rec, dict) else None
+
+
+def read_one(p: Path, key: str, value: str):
+    """The newest record for `value`, None on a miss, or UNSORTED when the file
+    cannot be bisected. The caller holds the shared lock."""
+    try:
+        f = open(p, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        region = sorted_region(f, key)
+        size = os.fstat(f.fileno()).st_size
+        if region is None or region[1] > size or size - region[1] > TAIL_SCAN:
+            return UNSORTED
+        lo, hi = region
+        prefix = re.compile(r'\{\s*%s\s*:\s*' % re.escape(json.dumps(key)))
+
+        # the tail holds versions newer than the sorted region: the last one wins
+        newest = None
+        f.seek(hi)
+        for raw in f:
+            if raw.endswith(b"\n") and _lead(raw, prefix) == value:
+                newest = raw
+        if newest is not None:
+            return _record(newest)
+
+        base = lo
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(mid - 1 if mid > base else base)
+            if mid > base:
+                f.readline()        # finish the line straddling mid
+            start = f.tell()
+            if start >= hi:
+                hi = mid
+                continue
+            raw = f.readline()
+            name = _lead(raw, prefix)
+            if name is None:
+                return UNSORTED     # not a keyed line: do not trust the order
+            if name == value:
+                return _record(raw)
+            if name < value:
+                lo = start + len(raw)
+            else:
+                hi = mid
+        return None
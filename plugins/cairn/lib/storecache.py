@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Process-local cache of resolved stores, keyed by file identity.
+
+One script run (or a long-lived host serving many requests) often parses the same
+store more than once — an index render, then a lookup, then a cross-store join.
+The resolved {key: record} view is kept here against the file's identity
+(path, inode, size, mtime_ns): if a stat still matches, the parse is skipped.
+Any other writer moves at least one of the four (appends grow the file, compaction
+replaces the inode), so a stale entry is never served across processes.
+
+Bounded: at most MAX_STORES stores, least recently used evicted first, and a
+store larger than MAX_BYTES is never cached (it would pin its whole parse).
+Writes made by THIS process call invalidate() explicitly, so a write within the
+same mtime tick cannot hide behind an unchanged stat.
+
+Callers mutate what they read (rec["uses"] += 1), so every record handed out is
+a fresh copy; the cached originals are never exposed.
+"""
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+from collections.abc import Callable
+
+MAX_STORES = 8
+MAX_BYTES = 32 * 1024 * 1024
+
+_lru: "OrderedDict[tuple[str, str], tuple[tuple, dict]]" = OrderedDict()
+
+
+def identity(p: Path) -> tuple | None:
+    try:
+        st = os.stat(p)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def thaw(v):
+    """A private copy of a parsed JSON value (much cheaper than copy.deepcopy)."""
+    if type(v) is dict:
+        return {k: thaw(x) for k, x in v.items()}
+    if type(v) is list:
+        return [thaw(x) for x in v]
+    return v
+
+
+def peek(p: Path, key: str) -> dict | None:
+    """The cached {key: record} view of `p` if it is still current, else None."""
+    slot = (str(p), key)
+    hit = _lru.get(slot)
+    if hit is None:
+        return None
+    if hit[0] != identity(p):
+        del _lru[slot]
+        return None
+    _lru.move_to_end(slot)
+    return hit[1]
+
+
+def resolved(p: Path, key: str, build: Callable[[], dict]) -> dict:
+    """The {key: record} view of `p`, parsed at most once per file identity."""
+    live = peek(p, key)
+    if live is not None:
+        return live
+    ident = identity(p)
+    live = build()
+    if ident is not None and ident == identity(p) and ident[1] <= MAX_BYTES:
+        _lru[(str(p), key)] = (ident, live)
+        while len(_lru) > MAX_STORES:
+            _lru.popitem(last=False)
+    return live
+
+
+def invalidate(p: Path) -> None:
+    """Drop every cached view of `p` (this process just wrote it)."""
+    for slot in [s for s in _lru if s[0] == str(p)]:
+        del _lru[slot]
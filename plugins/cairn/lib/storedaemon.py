@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Optional long-lived store daemon: every repo store parsed once, served over a
+Unix socket.
+
+Each skill call starts an interpreter and re-parses its JSONL from scratch; at
+high call rates that startup + parse dominates. Run one daemon per repo:
+
+    python lib/storedaemon.py --repo .          # (.harness/_lib/ once installed)
+
+It listens on `<repo>/.cairn/storeport.sock` (mode 0600) and keeps each store it
+is asked about resolved in memory — {key: newest record}, so read_one is a dict
+lookup. Every request re-stats the file: unchanged -> served from memory; grown
+on the same inode -> only the appended tail is parsed; compacted or rewritten ->
+reloaded (under the shared lock, so a batch is never seen half-written).
+
+Writes do NOT go through the daemon: writers keep taking the store's flock and
+appending directly, and the daemon catches up on its next read. So a dead or
+stale daemon can never lose a write, and nothing changes for a repo without one.
+
+Protocol: one JSON object per line each way.
+    -> {"op": "read_one", "path": "/abs/store.jsonl", "key": "id", "value": "ab12"}
+    <- {"ok": true, "result": {...} | null}
+    -> {"op": "read_all", "path": ..., "key": ...}     <- {"ok": true, "result": [...]}
+    -> {"op": "ping"}                                   <- {"ok": true, "result": {"stores": 3}}
+Paths outside the repo are refused.
+
+Clients (logstore.read_all / read_one) call call(): it returns UNAVAILABLE when
+there is no socket, nothing listens on it, or the daemon errs — and the caller
+reads the file directly. CAIRN_STORE_SOCKET=<path> points at a daemon elsewhere;
+CAIRN_STORE_SOCKET=off disables the lookup.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+SOCKET_NAME = Path(".cairn") / "storeport.sock"
+TIMEOUT = 2.0
+UNAVAILABLE = object()
+
+
+# ---- client -------------------------------------------------------------------
+
+_conns: dict[str, tuple[object, object]] = {}  # socket path -> (socket, its read file)
+
+
+def socket_for(p: Path) -> Path | None:
+    env = os.environ.get("CAIRN_STORE_SOCKET")
+    if env == "off":
+        return None
+    return Path(env) if env else p.parent / SOCKET_NAME
+
+
+def _drop(where: str) -> None:
+    conn = _conns.pop(where, None)
+    if conn:
+        try: conn[0].close()
+        except OSError: pass
+
+
+def call(p: Path, op: str, **args):
+    """The daemon's answer for `op` on store `p`, or UNAVAILABLE."""
+    sock = socket_for(p)
+    if sock is None or not sock.exists():
+        return UNAVAILABLE  # the common case: decided before importing socket
+    import socket
+    where = str(sock)
+    req = (json.dumps({"op": op, "path": str(Path(p).resolve()), **args}) + "\n").encode("utf-8")
+    for _ in range(2):  # a daemon restart leaves a dead cached connection: retry once
+        conn = _conns.get(where)
+        try:
+            if conn is None:
+                s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                s.settimeout(TIMEOUT)
+                s.connect(where)
+                conn = _conns[where] = (s, s.makefile("rb"))
+            conn[0].sendall(req)
+            line = conn[1].readline()
+            if not line:
+                raise ConnectionError("daemon closed the connection")
+            resp = json.loads(line)
+        except (OSError, ValueError):
+            _drop(where)
+            continue
+        return resp["result"] if resp.get("ok") else UNAVAILABLE
+    return UNAVAILABLE
+
+
+# ---- server -------------------------------------------------------------------
+
+class _View:
+    __slots__ = ("ino", "size", "mtime_ns", "covered", "live")
+
+    def __init__(self):
+        self.ino, self.size, self.mtime_ns, self.covered, self.live = None, -1, None, 0, {}
+
+
+class Stores:
+    """In-memory resolved views of the repo's stores, caught up on every read."""
+
+    def __init__(self, root: Path):
+        import threading
+        self.root = root.resolve()
+        self._views: dict[tuple[str, str], _View] = {}
+        self._new_lock = threading.Lock
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock(self, path: str):
+        with self._guard:
+            return self._locks.setdefault(path, self._new_lock())
+
+    def view(self, p: Path, key: str, answer):
+        """answer(live) for store `p` resolved by `key`, computed while the store's
+        refresh lock is held: a catch-up on another thread folds the tail into the
+        same dict, so a response built after release could see it mid-change."""
+        import logstore
+        slot = (str(p), key)
+        with self._lock(str(p)):  # one refresher per store: storelock is per process, not per thread
+            try:
+                st = os.stat(p)
+            except FileNotFoundError:
+                self._views.pop(slot, None)
+                return answer({})
+            v = self._views.get(slot)
+            if v and (v.ino, v.size, v.mtime_ns) == (st.st_ino, st.st_size, st.st_mtime_ns):
+                return answer(v.live)
+            if not (v and v.ino == st.st_ino and v.covered <= st.st_size and v.size < st.st_size):
+                v = _View()  # compacted, shrunk or rewritten in place: reload
+            logstore._shared(p, lambda: self._catch_up(p, key, v))
+            self._views[slot] = v
+            return answer(v.live)
+
+    @staticmethod
+    def _catch_up(p: Path, key: str, v: _View) -> None:
+        import logstore
+        with open(p, "rb") as f:
+            f.seek(v.covered)
+            pos = v.covered
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # a torn tail: picked up once it is complete
+                pos += len(raw)
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict) and logstore.MARK not in rec:
+                    v.live[logstore._key(rec, key)] = rec
+            st = os.fstat(f.fileno())
+        v.ino, v.size, v.mtime_ns, v.covered = st.st_ino, st.st_size, st.st_mtime_ns, pos
+
+    def handle(self, req: dict):
+        op = req.get("op")
+        if op == "ping":
+            return {"stores": len(self._views)}
+        p = Path(str(req.get("path", ""))).resolve()
+        if self.root != p and self.root not in p.parents:
+            raise PermissionError(f"{p} is outside {self.root}")
+        key = req.get("key")
+        if not isinstance(key, str):
+            raise ValueError("key required")
+        if op == "read_all":
+            return self.view(p, key, lambda live: list(live.values()))
+        if op == "read_one":
+            value = req.get("value")
+            return self.view(p, key, lambda live: live.get(value))
+        raise ValueError(f"unknown op {op!r}")
+
+
+def serve(repo: Path, sock: Path | None = None, ready=None) -> None:
+    """Serve `repo`'s stores on `sock` until interrupted."""
+    import socket, socketserver
+    repo = repo.resolve()
+    sock = sock or repo / SOCKET_NAME
+    sock.parent.mkdir(parents=True, exist_ok=True)
+    if sock.exists():
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(sock))
+            raise SystemExit(f"a daemon is already listening on {sock}")
+        except OSError:
+            sock.unlink()  # stale socket from a daemon that died
+        finally:
+            probe.close()
+    stores = Stores(repo)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    resp = {"ok": True, "result": stores.handle(json.loads(line))}
+                except Exception as e:  # noqa: BLE001 — reported to the client, who falls back
+                    resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                self.wfile.write((json.dumps(resp, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    old = os.umask(0o177)  # the socket is created 0600: only this user may ask
+    try:
+        server = Server(str(sock), Handler)
+    finally:
+        os.umask(old)
+    try:
+        if ready:
+            ready()
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try: sock.unlink()
+        except OSError: pass
+
+
+def main(argv=None) -> int:
+    import argparse, signal
+    ap = argparse.ArgumentParser(description="Serve a repo's cairn stores from memory over a Unix socket.")
+    ap.add_argument("--repo", default=".")
+    ap.add_argument("--socket", default=None, help=f"default: <repo>/{SOCKET_NAME}")
+    args = ap.parse_args(argv)
+    repo = Path(args.repo).resolve()
+    sock = Path(args.socket) if args.socket else repo / SOCKET_NAME
+    signal.signal(signal.SIGTERM, lambda *_: (_ for _ in ()).throw(KeyboardInterrupt))
+    try:
+        serve(repo, sock, ready=lambda: print(f"serving {repo} stores on {sock}", flush=True))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
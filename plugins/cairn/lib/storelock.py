@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Reader/writer locking for cairn stores, on the kernel's flock(2).
+
+The old `_locked` helper polled an O_EXCL lock file (500 x 10 ms) and stole
+locks older than 10 s: writers burned up to 5 s spinning, a slow writer could
+have its lock stolen mid-write, and readers were not coordinated at all. Here:
+
+- writers take LOCK_EX, readers LOCK_SH on `<store>.lock` (a file that is never
+  unlinked — unlinking a flock file is what makes stealing racy);
+- a contended acquire BLOCKS in the kernel, bounded by a timeout (SIGALRM on the
+  main thread; off it, exponential back-off between non-blocking tries);
+- the kernel drops the lock when the holder's fd closes — including when the
+  process dies — so there is nothing stale to steal.
+
+Locks are re-entrant per process: an update() that holds LOCK_EX and then calls
+read_one() does not deadlock against itself. Upgrading a held LOCK_SH to LOCK_EX
+is refused (two upgrading readers would deadlock).
+
+Contention metrics: stats() reports per-lock acquisitions, timeouts, and total /
+max wait and hold time for this process. CAIRN_LOCK_STATS=<file> additionally
+appends one JSON line per release (path, mode, wait_ms, hold_ms, pid, and the
+wall-clock span held) so a run across many processes can be aggregated —
+bench/store_stress.py does. Under CAIRN_TRACE each acquisition is also a
+lock.wait + lock.hold span (tracing.py). Without fcntl (Windows)
+writers fall back to the O_EXCL lock file and readers go unlocked.
+"""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+LOCK_TIMEOUT = float(os.environ.get("CAIRN_LOCK_TIMEOUT", "10"))
+
+_held: dict[str, list] = {}   # lock path -> [mode, depth]; this process's held locks
+_stats: dict[str, dict] = {}
+
+
+def lock_path(p: Path) -> Path:
+    return p.with_suffix(p.suffix + ".lock")
+
+
+def holding(p: Path) -> bool:
+    """Whether this process already holds `p`'s lock, in either mode."""
+    return str(lock_path(p)) in _held
+
+
+def stats() -> dict[str, dict]:
+    """Per-lock contention for this process: acquired, timeouts, wait_s, max_wait_s,
+    hold_s, max_hold_s."""
+    return {k: dict(v) for k, v in _stats.items()}
+
+
+def _record(lock: str, mode: str, wait: float, hold: float | None,
+            span: tuple[float, float] | None = None) -> None:
+    s = _stats.setdefault(lock, {"acquired": 0, "timeouts": 0, "wait_s": 0.0, "max_wait_s": 0.0,
+                                 "hold_s": 0.0, "max_hold_s": 0.0})
+    s["wait_s"] += wait
+    s["max_wait_s"] = max(s["max_wait_s"], wait)
+    if hold is None:
+        s["timeouts"] += 1
+    else:
+        s["acquired"] += 1
+        s["hold_s"] += hold
+        s["max_hold_s"] = max(s["max_hold_s"], hold)
+    import tracing
+    if tracing.on():
+        at = span[0] if span else time.time()
+        tracing.complete("lock.wait", "lock", at - wait, wait, lock=os.path.basename(lock), mode=mode,
+                         timed_out=hold is None)
+        if span:
+            tracing.complete("lock.hold", "lock", span[0], span[1] - span[0], lock=os.path.basename(lock), mode=mode)
+    sink = os.environ.get("CAIRN_LOCK_STATS")
+    if sink:
+        import json
+        line = json.dumps({"lock": lock, "mode": mode, "wait_ms": round(wait * 1000, 3),
+                           "hold_ms": None if hold is None else round(hold * 1000, 3),
+                           "pid": os.getpid(), "at": time.time(),
+                           # wall-clock span strictly inside the hold: two exclusive
+                           # spans that overlap mean mutual exclusion was broken
+                           "held": list(span) if span else None})
+        try:
+            with open(sink, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError:
+            pass
+
+
+def _flock(fd: int, op: int, timeout: float) -> None:
+    import fcntl, signal, threading
+    try:
+        fcntl.flock(fd, op | fcntl.LOCK_NB)  # uncontended: no timer, no syscall storm
+        return
+    except BlockingIOError:
+        pass
+    if threading.current_thread() is threading.main_thread() and hasattr(signal, "setitimer"):
+        def _expire(_signum, _frame):
+            raise TimeoutError
+        previous = signal.signal(signal.SIGALRM, _expire)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            fcntl.flock(fd, op)  # sleeps in the kernel until released or the timer fires
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+        return
+    deadline, delay = time.monotonic() + timeout, 0.001
+    while True:
+        try:
+            fcntl.flock(fd, op | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                raise TimeoutError
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+
+@contextmanager
+def _excl_file(lock: Path, timeout: float):
+    """No fcntl: the O_EXCL lock file, exclusive only, never stolen."""
+    deadline = time.monotonic() + timeout
+    x = lock.with_suffix(".xlock")
+    while True:
+        try:
+            os.close(os.open(str(x), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            if time.monotonic() >= deadline:
+                raise TimeoutError
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        try: os.unlink(x)
+        except OSError: pass
+
+
+@contextmanager
+def hold(p: Path, shared: bool = False, timeout: float | None = None):
+    """Hold `p`'s lock for the block: shared for readers, exclusive for writers."""
+    lock = lock_path(p)
+    key, mode = str(lock), "sh" if shared else "ex"
+    mine = _held.get(key)
+    if mine:
+        if mine[0] == "sh" and not shared:
+            raise RuntimeError(f"cannot upgrade a shared lock to exclusive: {lock}")
+        mine[1] += 1
+        try:
+            yield
+        finally:
+            mine[1] -= 1
+        return
+    timeout = LOCK_TIMEOUT if timeout is None else timeout
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    start = time.monotonic()
+    if fcntl is None:
+        if shared:
+            yield
+            return
+        p.parent.mkdir(parents=True, exist_ok=True)
+        cm = _excl_file(lock, timeout)
+        try:
+            cm.__enter__()
+        except TimeoutError:
+            _record(key, mode, time.monotonic() - start, None)
+            raise TimeoutError(f"timed out after {timeout:g}s waiting for lock {lock}") from None
+        fd = None
+    else:
+        try:
+            if not shared:
+                p.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(str(lock), os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError:
+            if not shared:
+                raise
+            yield  # unwritable dir (read-only checkout): a reader proceeds unlocked
+            return
+        try:
+            _flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX, timeout)
+        except TimeoutError:
+            os.close(fd)
+            _record(key, mode, time.monotonic() - start, None)
+            raise TimeoutError(f"timed out after {timeout:g}s waiting for lock {lock}") from None
+        except BaseException:
+            os.close(fd)
+            raise
+    acquired, held_at = time.monotonic(), time.time()
+    _held[key] = [mode, 1]
+    try:
+        yield
+    finally:
+        del _held[key]
+        released_at = time.time()
+        if fd is None:
+            cm.__exit__(None, None, None)
+        else:
+            os.close(fd)  # closing the fd is the release
+        _record(key, mode, acquired - start, time.monotonic() - acquired, (held_at, released_at))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Opt-in spans in Chrome trace-event format: CAIRN_TRACE=/path/trace.json.
+
+    CAIRN_TRACE=/tmp/loop.json python close_loop.py --class ... --floor-ratio 1.4 ...
+    # open /tmp/loop.json in chrome://tracing or ui.perfetto.dev
+
+Every process that imports this appends its events to the one file, so a
+close_loop run — in-process dispatches and any child interpreters alike — lands
+on a single timeline, one row per process. Spans recorded:
+
+  run           the whole process (from first import to exit)
+  lock.wait / lock.hold   storelock.py, per acquisition (args: lock, mode)
+  store.read / store.parse    a full-store scan: the file read, then the JSON parse
+  store.bisect / bloom.check / index.seek   the read_one paths, sidecar catch-up included
+  daemon.call                        a read served (or refused) by storedaemon.py
+  digest.fresh / digest.scan         orient's digest check, and any tail or store it re-read
+  store.append / store.write         journaled appends and atomic rewrites (fsync included)
+  retrieval.rank                     the ranking in mental-models / library-knowledge
+  dispatch / spawn                   a sibling script run in-process, or a child process
+                                     (close_loop, verify.py's checks, plan_new's shelf_index)
+
+Unset, span() returns one shared no-op object: the cost is an attribute check.
+Set, events are buffered in memory and written once at exit. The file is a JSON
+array that is never closed — the trace-event format allows the missing `]`, and
+it is what lets processes append to it concurrently (one O_APPEND write each).
+"""
+from __future__ import annotations
+
+import os
+import time
+
+PATH = os.environ.get("CAIRN_TRACE") or None
+
+_events: list[dict] = []
+_wall0 = time.time()
+_perf0 = time.perf_counter()
+
+
+def on() -> bool:
+    return PATH is not None
+
+
+def _now_us() -> float:
+    return (_wall0 + (time.perf_counter() - _perf0)) * 1e6
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "t0")
+
+    def __init__(self, name: str, cat: str, args: dict):
+        self.name, self.cat, self.args = name, cat, args
+
+    def set(self, **args) -> None:
+        """Attach what was learned inside the span (bytes read, hits, ...)."""
+        self.args.update(args)
+
+    def __enter__(self):
+        self.t0 = _now_us()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _emit(self.name, self.cat, self.t0, _now_us() - self.t0, self.args)
+
+
+class _Off:
+    __slots__ = ()
+
+    def set(self, **args) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_OFF = _Off()
+
+
+def span(name: str, cat: str = "cairn", **args):
+    """`with span("store.read", "io", path=p.name) as s: ...; s.set(bytes=n)`."""
+    return _Span(name, cat, args) if PATH else _OFF
+
+
+def complete(name: str, cat: str, start: float, seconds: float, **args) -> None:
+    """A span measured elsewhere: `start` is wall-clock seconds (time.time())."""
+    if PATH:
+        _emit(name, cat, start * 1e6, seconds * 1e6, args)
+
+
+def _emit(name: str, cat: str, ts: float, dur: float, args: dict) -> None:
+    if not _events:
+        import atexit
+        atexit.register(flush)
+    import _thread
+    _events.append({"name": name, "cat": cat, "ph": "X", "ts": round(ts, 1), "dur": round(dur, 1),
+                    "pid": os.getpid(), "tid": _thread.get_ident(), "args": args})
+
+
+def flush() -> None:
+    """Append this process's events (plus its name and a `run` span) to PATH."""
+    if not PATH or not _events:
+        return
+    import _thread, json, sys
+    pid = os.getpid()
+    label = " ".join([os.path.basename(sys.argv[0] or "python"), *sys.argv[1:3]])
+    events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"{label} ({pid})"}},
+              {"name": "run", "cat": "process", "ph": "X", "ts": round(_wall0 * 1e6, 1),
+               "dur": round(_now_us() - _wall0 * 1e6, 1), "pid": pid, "tid": _thread.get_ident(),
+               "args": {"argv": sys.argv}}]
+    events += _events
+    _events.clear()
+    body = "".join(json.dumps(e, default=str) + ",\n" for e in events).encode("utf-8")
+    try:
+        if not os.path.exists(PATH):  # open the array: created WITH its "[" (link is atomic)
+            tmp = f"{PATH}.{pid}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(b"[\n")
+            try:
+                os.link(tmp, PATH)
+            except FileExistsError:
+                pass  # another process opened it first
+            finally:
+                os.unlink(tmp)
+        fd = os.open(PATH, os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(fd, body)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # tracing never fails the command it observes
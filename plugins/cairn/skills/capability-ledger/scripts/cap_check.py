@@ -4,11 +4,14 @@ never write their own license here).
 
   cap_check.py --class render-perf
   cap_check.py --index
+  cap_check.py --index --max-tokens 200   # proven, then practiced, then novice rows
+  cap_check.py --stats     # store shape + Bloom filter false-positive rate
 """
 from __future__ import annotations
 import argparse
 from pathlib import Path
 import store
+import outmeter
 from maturity import compute_maturity, effective_maturity, licenses, credited
 
 def main(argv=None):
@@ -16,19 +19,29 @@ def main(argv=None):
     ap.add_argument("--repo", default="."); ap.add_argument("--store", default=None)
     ap.add_argument("--class", dest="cls", default=None)
     ap.add_argument("--index", action="store_true")
+    ap.add_argument("--stats", action="store_true", help="store shape + Bloom filter false-positive rate")
+    outmeter.add_argument(ap)
     args = ap.parse_args(argv)
     repo = Path(args.repo).resolve()
 
+    if args.stats:
+        import json
+        print(json.dumps(store.stats(repo, args.store), indent=2)); return 0
+
     if args.index or not args.cls:
         rows = store.read_all(repo, args.store)
         if not rows:
             print("capability ledger empty — every class is novice (full gates)."); return 0
-        print("Capability ledger:")
+        out = outmeter.Meter(args.max_tokens)
+        out.add("Capability ledger:")
         for r in rows:
             m = effective_maturity(r)
             c = len(credited(r.get("solves", [])))
             dom = len({s.get("domain") for s in credited(r.get("solves", [])) if s.get("domain")})
-            print(f"  {r['problem_class']:<32} {m:<10} ({c} credited solve(s), {dom} domain(s))")
+            # an earned license is what the agent acts on; novice rows are the default anyway
+            out.add(f"  {r['problem_class']:<32} {m:<10} ({c} credited solve(s), {dom} domain(s))",
+                    {"proven": 1, "practiced": 2}.get(m, 3))
+        out.emit()
         return 0
 
     entry = store.read_one(repo, args.store, args.cls)
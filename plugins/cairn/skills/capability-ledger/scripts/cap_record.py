@@ -8,7 +8,7 @@ A solve with no --benchmark is REFUSED: no measurement, no credit. A --miss drop
 the class one rung immediately (asymmetric: grant slow, revoke fast).
 """
 from __future__ import annotations
-import argparse, datetime as dt, sys
+import argparse, sys
 from pathlib import Path
 import store
 from maturity import compute_maturity, effective_maturity, licenses, demote, credited
@@ -31,6 +31,7 @@ def main(argv=None):
     entry = store.read_one(repo, args.store, args.cls) or {
         "problem_class": args.cls, "solves": [], "maturity": "novice", "playbook": None, "last_demotion": None}
 
+    import datetime as dt
     if args.miss:
         before = entry.get("maturity", "novice")
         entry["maturity"] = demote(before)
@@ -10,7 +10,8 @@ spike's result, this single call:
   3. reports the resulting maturity change so the loop can surface it (consent).
 
 It writes through the existing ports (cap_record, models_record) — it does not
-touch stores directly. It NEVER fabricates: a solve with no benchmark is refused
+touch stores directly — calling their main() in this process (lib/dispatch.py)
+rather than paying an interpreter per step. It NEVER fabricates: a solve with no benchmark is refused
 upstream; a model with no taught_by_gap warns upstream. The circuit only carries
 what was actually measured.
 
@@ -22,8 +23,9 @@ Usage:
   close_loop.py --class render-perf --domain scheduler --floor-ratio 40 --miss
 """
 from __future__ import annotations
-import argparse, subprocess, sys
+import argparse
 from pathlib import Path
+import store  # noqa: F401 — puts lib/ (dispatch) on sys.path
 
 HERE = Path(__file__).resolve().parent
 
@@ -50,7 +52,9 @@ def _find_models_record(repo: Path) -> Path | None:
 
 
 def _run(args):
-    p = subprocess.run([sys.executable] + args, capture_output=True, text=True)
+    """Run a ledger / mental-models script in this process (lib/dispatch.py)."""
+    import dispatch
+    p = dispatch.run(Path(args[0]), args[1:])
     return p.returncode, (p.stdout + p.stderr).strip()
 
 
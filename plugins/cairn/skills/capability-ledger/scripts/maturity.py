@@ -19,7 +19,6 @@ hardening notes drive the design below:
   holds (we do not treat an unparseable solve as post-demotion evidence).
 """
 from __future__ import annotations
-import datetime as _dt
 
 # A SEED, not law. "Near-floor" within 2x is a starting parameter Cairn can evolve
 # from its own history (like inquiry's calibration thresholds): a problem class may
@@ -30,6 +29,7 @@ NEAR_FLOOR_SEED = 2.0
 
 
 def _parse_date(s) -> _dt.date | None:
+    import datetime as _dt
     try:
         return _dt.date.fromisoformat(str(s))
     except (ValueError, TypeError):
@@ -2,98 +2,103 @@
 """Session-start honest self-report. Reads the stores and says, plainly, what the
 entity knows, is proven at, and does NOT — so knowledge informs behavior and no
 file creates an illusion of competence. A new repo is novice everywhere; that is
-stated, not hidden.
+stated, not hidden. The counts come from the orientation digest, which folds in
+only what was appended since, so a session start does not re-read the stores.
 
   orient.py --repo .
+  orient.py --repo . --no-digest         # scan the stores; the digest is neither read nor written
+  orient.py --repo . --max-tokens 250    # the licenses stay; standing advice is dropped first
 """
 from __future__ import annotations
-import argparse, json
+import argparse, sys
 from pathlib import Path
 
+_HERE = Path(__file__).resolve().parent
+for _lib in (_HERE.parent.parent.parent / "lib", _HERE.parent / "_lib"):
+    if (_lib / "tracing.py").is_file():
+        if str(_lib) not in sys.path:
+            sys.path.insert(0, str(_lib))
+        break
+import metrics, orientdigest, outmeter, tracing
 
-def _jsonl(p: Path):
-    if not p.exists(): return []
-    out = []
-    for line in p.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line: continue
-        try:
-            rec = json.loads(line)
-        except json.JSONDecodeError: continue
-        if isinstance(rec, dict):
-            out.append(rec)
-    return out
+
+def _summary(repo: Path, digest: bool = True) -> dict:
+    """Everything the report prints, from the orientation digest (lib/orientdigest.py):
+    five stats when nothing changed, a tail fold or one store's rescan when it did.
+    Without it, one streaming pass per store, memory bounded by the live keys."""
+    for name in orientdigest.TRACKED:
+        if (repo / name).exists():
+            metrics.touch(repo / name)
+    with tracing.span("digest.fresh", "read", digest=digest):
+        return orientdigest.summary(repo, persist=digest)
 
 
 def main(argv=None):
     ap = argparse.ArgumentParser(description="Honest entity self-report at session start.")
     ap.add_argument("--repo", default=".")
+    ap.add_argument("--no-digest", action="store_true",
+                    help="Scan the stores (streamed) instead of using or updating .cairn/orient-digest.json.")
+    outmeter.add_argument(ap)
     args = ap.parse_args(argv)
     repo = Path(args.repo).resolve()
 
-    caps = _jsonl(repo / "capability-ledger.jsonl")
-    libs = _jsonl(repo / "lib-knowledge.jsonl")
-    models = _jsonl(repo / "mental-models.jsonl")
-    profs = _jsonl(repo / "specialist-profiles.jsonl")
-    ratchet = _jsonl(repo / "ratchet.jsonl")
+    s = _summary(repo, digest=not args.no_digest)
 
-    print("# Orientation — what I honestly know in this repo\n")
-    print("Before I work: the reflex — when I am about to do something by hand")
-    print("(explore, check, trace, detect, judge), I pause and ask whether I already")
-    print("have a faculty for it, and look at myself before I reinvent.")
-    print("(references/reflex.md) I don't yet know which faculty fits which moment —")
-    print("that recognition I earn with use; the pause is what I start with.\n")
+    out = outmeter.Meter(args.max_tokens)
+    out.add("# Orientation — what I honestly know in this repo\n")
+    out.add("Before I work: the reflex — when I am about to do something by hand\n"
+            "(explore, check, trace, detect, judge), I pause and ask whether I already\n"
+            "have a faculty for it, and look at myself before I reinvent.\n"
+            "(references/reflex.md) I don't yet know which faculty fits which moment —\n"
+            "that recognition I earn with use; the pause is what I start with.\n", 3)
 
-    if not any([caps, libs, models, profs]):
-        print("I am newly hatched here. I know nothing yet about this codebase, am")
-        print("PROVEN at nothing, and every problem class gets full gates. That is")
-        print("correct for a new repo — I earn competence by demonstrating it, not by")
-        print("claiming it. Let's solve the first problem; the curve bends after.")
+    if not (s["caps"] or s["libs"] or s["models"] or s["profs"]):
+        out.add("I am newly hatched here. I know nothing yet about this codebase, am\n"
+                "PROVEN at nothing, and every problem class gets full gates. That is\n"
+                "correct for a new repo — I earn competence by demonstrating it, not by\n"
+                "claiming it. Let's solve the first problem; the curve bends after.")
+        out.emit()
         return 0
 
-    # capability
-    valid_caps = [c for c in caps if isinstance(c.get("problem_class"), str)]
-    proven = [c["problem_class"] for c in valid_caps if c.get("maturity") == "proven"]
-    practiced = [c["problem_class"] for c in valid_caps if c.get("maturity") == "practiced"]
-    novice = [c["problem_class"] for c in valid_caps if c.get("maturity") not in ("proven", "practiced")]
-    print("## Capability (demonstrated, not claimed)")
-    print(f"- proven (may delegate / larger blast radius): {', '.join(proven) or 'none yet'}")
-    print(f"- practiced (plan gate may auto-pass): {', '.join(practiced) or 'none yet'}")
-    print(f"- novice / untested (full gates): {', '.join(novice) or 'none'}")
-    print(f"  -> I will surface before acting on any earned license.\n")
+    # capability: the licenses are the verdict, never dropped
+    proven, practiced, novice = s["proven"], s["practiced"], s["novice"]
+    out.add("## Capability (demonstrated, not claimed)\n"
+            f"- proven (may delegate / larger blast radius): {', '.join(proven) or 'none yet'}\n"
+            f"- practiced (plan gate may auto-pass): {', '.join(practiced) or 'none yet'}")
+    out.add(f"- novice / untested (full gates): {', '.join(novice) or 'none'}", 2)
+    out.add(f"  -> I will surface before acting on any earned license.\n")
 
     # knowledge + honesty about staleness
-    print("## Knowledge")
-    print(f"- library facts: {len(libs)} cached; specialist profiles: {len(profs)}; "
-          f"mental models: {len(models)}")
-    print(f"- open friction in the ratchet: {sum(1 for r in ratchet if 'PROMOTED' not in json.dumps(r))}")
-    print("  (run the per-skill --check / --stale gates for exact staleness; I flag, I don't assume)\n")
+    out.add("## Knowledge\n"
+            f"- library facts: {s['libs']} cached; specialist profiles: {s['profs']}; "
+            f"mental models: {s['models']}\n"
+            f"- open friction in the ratchet: {s['ratchet_open']}\n"
+            "  (run the per-skill --check / --stale gates for exact staleness; I flag, I don't assume)\n", 1)
 
-    print("## Honest gaps")
-    print("- Anything not listed above, I have NOT demonstrated. I will say so when it comes up,")
-    print("  keep the gate, and earn it rather than pretend.")
-    print()
-    print("## Where to start when I don't know the terrain")
-    print("- I don't know this repo yet, and neither would anyone on day one. Rather than")
-    print("  guess, I use `inquiry`: state a prediction about the terrain WITH a confidence,")
-    print("  make the cheapest observation that would prove me wrong, and record the surprise.")
-    print("  A confident prediction that turns out wrong is how I learn the shape of a new")
-    print("  codebase — and over time, how I build my own judgment about it.")
-    print()
-    print("## When I catch myself doing the same thing by hand")
-    print("- The third time I do a manual motion — a check, a trace, a scaffold — I forge a")
-    print("  tool for it (`toolsmith`), so the fourth time is free. Tools live in .cairn/tools/,")
-    print("  may take real actions (the outer harness bounds the blast radius, and a rejected")
-    print("  tool is a lesson), and must never touch my own gates, ledger, or stores.")
-    print()
-    print("## What I still need from you (nurture — see references/nurture.md)")
+    out.add("## Honest gaps\n"
+            "- Anything not listed above, I have NOT demonstrated. I will say so when it comes up,\n"
+            "  keep the gate, and earn it rather than pretend.\n", 1)
+    out.add("## Where to start when I don't know the terrain\n"
+            "- I don't know this repo yet, and neither would anyone on day one. Rather than\n"
+            "  guess, I use `inquiry`: state a prediction about the terrain WITH a confidence,\n"
+            "  make the cheapest observation that would prove me wrong, and record the surprise.\n"
+            "  A confident prediction that turns out wrong is how I learn the shape of a new\n"
+            "  codebase — and over time, how I build my own judgment about it.\n", 4)
+    out.add("## When I catch myself doing the same thing by hand\n"
+            "- The third time I do a manual motion — a check, a trace, a scaffold — I forge a\n"
+            "  tool for it (`toolsmith`), so the fourth time is free. Tools live in .cairn/tools/,\n"
+            "  may take real actions (the outer harness bounds the blast radius, and a rejected\n"
+            "  tool is a lesson), and must never touch my own gates, ledger, or stores.\n", 4)
+    nurture = ["## What I still need from you (nurture — see references/nurture.md)"]
     if proven:
-        print(f"- For proven classes ({', '.join(proven)}), you can step back; I have earned them.")
-    print("- For everything not yet proven: please judge my declared FLOORS for honesty and")
-    print("  spot-check that my 'near-floor' solves really are. The gates check form; only you")
-    print("  (or a real run) check truth. These asks shrink as classes prove out.")
-    print("- Watch the ratchet for 'learned-but-did-not-recall' frictions: that is the signal")
-    print("  my retrieval matcher has hit its ceiling and the semantic backend has been earned.")
+        nurture.append(f"- For proven classes ({', '.join(proven)}), you can step back; I have earned them.")
+    nurture += ["- For everything not yet proven: please judge my declared FLOORS for honesty and",
+                "  spot-check that my 'near-floor' solves really are. The gates check form; only you",
+                "  (or a real run) check truth. These asks shrink as classes prove out.",
+                "- Watch the ratchet for 'learned-but-did-not-recall' frictions: that is the signal",
+                "  my retrieval matcher has hit its ceiling and the semantic backend has been earned."]
+    out.add("\n".join(nurture), 2)
+    out.emit()
     return 0
 
 
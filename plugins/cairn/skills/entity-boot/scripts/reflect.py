@@ -5,23 +5,16 @@ human better off" — and the entity is empowered to recommend LESS of itself.
   reflect.py --repo .
 """
 from __future__ import annotations
-import argparse, json
+import argparse, sys
 from pathlib import Path
 
-
-def _jsonl(p: Path):
-    if not p.exists(): return []
-    out = []
-    for line in p.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if line:
-            try:
-                rec = json.loads(line)
-            except json.JSONDecodeError: pass
-            else:
-                if isinstance(rec, dict):
-                    out.append(rec)
-    return out
+_HERE = Path(__file__).resolve().parent
+for _lib in (_HERE.parent.parent.parent / "lib", _HERE.parent / "_lib"):
+    if (_lib / "orientdigest.py").is_file():
+        if str(_lib) not in sys.path:
+            sys.path.insert(0, str(_lib))
+        break
+import orientdigest
 
 
 def main(argv=None):
@@ -29,9 +22,7 @@ def main(argv=None):
     ap.add_argument("--repo", default=".")
     args = ap.parse_args(argv)
     repo = Path(args.repo).resolve()
-    caps = _jsonl(repo / "capability-ledger.jsonl")
-    proven = [c["problem_class"] for c in caps
-              if isinstance(c.get("problem_class"), str) and c.get("maturity") == "proven"]
+    proven = orientdigest.summary(repo)["proven"]  # kept current by the ledger's writes
 
     print("# Purpose reflection — is the builder better off?\n")
     print("The metric is yours, not mine. I ask, honestly:")
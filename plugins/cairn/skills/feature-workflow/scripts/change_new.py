@@ -20,7 +20,6 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import datetime as dt
 import sys
 from pathlib import Path
 
@@ -154,6 +153,7 @@ def main(argv: list[str] | None = None) -> int:
                 file=sys.stderr,
             )
             return 2
+    import datetime as dt
     out.parent.mkdir(parents=True, exist_ok=True)
     out.write_text(head + body + f"\n<!-- scaffolded {dt.date.today().isoformat()} -->\n", encoding="utf-8")
     print(f"wrote {out} — fill the (({'(...)'} )) sentinels, then run change_check.py --kind {args.kind} {out}")
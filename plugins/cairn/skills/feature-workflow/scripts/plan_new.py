@@ -17,13 +17,17 @@ shelf-check is grounded rather than recalled. See PREFILL_HOOK below.
 from __future__ import annotations
 
 import argparse
-import datetime as _dt
 import json
-import subprocess
 import sys
 from pathlib import Path
 
 HERE = Path(__file__).resolve().parent
+for _lib in (HERE.parent.parent.parent / "lib", HERE.parent / "_lib"):
+    if (_lib / "tracing.py").is_file():
+        if str(_lib) not in sys.path:
+            sys.path.insert(0, str(_lib))
+        break
+import tracing
 TEMPLATE = HERE.parent / "assets" / "PLAN.template.md"
 PLANS_DIR = Path("docs") / "plans"
 
@@ -62,11 +66,13 @@ def shelf_inventory_block(repo: Path) -> str | None:
     shelf = HERE / "shelf_index.py"
     if not shelf.exists():
         return None
+    import subprocess
     try:
-        proc = subprocess.run(
-            [sys.executable, str(shelf), "--repo", str(repo), "--json"],
-            capture_output=True, text=True, timeout=30,
-        )
+        with tracing.span("spawn", "plan", script=shelf.name):
+            proc = subprocess.run(
+                [sys.executable, str(shelf), "--repo", str(repo), "--json"],
+                capture_output=True, text=True, timeout=30,
+            )
         if proc.returncode != 0:
             return None
         data = json.loads(proc.stdout)
@@ -123,6 +129,7 @@ def scaffold(title: str, out: Path, repo: Path) -> int:
         anchor = "## 3. Shelf check (REUSE / EXTEND / BUILD)\n"
         text = text.replace(anchor, anchor + block + "\n", 1)
 
+    import datetime as _dt
     stamp = _dt.date.today().isoformat()
     header = f"<!-- scaffolded {stamp} by feature-workflow/plan_new.py -->\n"
 
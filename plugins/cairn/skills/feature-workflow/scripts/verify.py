@@ -34,11 +34,18 @@ from __future__ import annotations
 
 import argparse
 import json
-import subprocess
 import sys
 import time
 from pathlib import Path
 
+_HERE = Path(__file__).resolve().parent
+for _lib in (_HERE.parent.parent.parent / "lib", _HERE.parent / "_lib"):
+    if (_lib / "tracing.py").is_file():
+        if str(_lib) not in sys.path:
+            sys.path.insert(0, str(_lib))
+        break
+import tracing
+
 DEFAULT_CHECKS = [
     {"name": "typecheck", "cmd": "npx --no-install tsc --noEmit", "must_pass": True},
     {"name": "tests", "cmd": "npm test --silent", "must_pass": True},
@@ -73,10 +80,13 @@ def run_check(check: dict, repo: Path) -> dict:
         return {"name": name, "status": "ERROR", "must_pass": must_pass,
                 "detail": "check has no 'cmd'", "output": "", "seconds": 0.0}
 
+    import subprocess
     start = time.monotonic()
     try:
-        proc = subprocess.run(cmd, shell=True, cwd=str(repo), capture_output=True,
-                              text=True, timeout=timeout)
+        with tracing.span("spawn", "verify", check=name) as s:
+            proc = subprocess.run(cmd, shell=True, cwd=str(repo), capture_output=True,
+                                  text=True, timeout=timeout)
+            s.set(returncode=proc.returncode)
         secs = round(time.monotonic() - start, 1)
         output = (proc.stdout or "") + (proc.stderr or "")
         if proc.returncode == 0:
@@ -83,6 +83,15 @@ def mirror_scripts(repo: Path, skills_root: str | None) -> str | None:
         for src in sorted(scripts.glob("*.py")):
             shutil.copy2(src, out / src.name)
             count += 1
+    # the shared engine the store ports import (plugins/cairn/lib) rides along as
+    # .harness/_lib, where a mirrored store.py looks for it
+    lib = root.parent / "lib"
+    if lib.is_dir():
+        out = repo / ".harness" / "_lib"
+        out.mkdir(parents=True, exist_ok=True)
+        for src in sorted(lib.glob("*.py")):
+            shutil.copy2(src, out / src.name)
+            count += 1
     return f"mirrored {count} script(s) into {repo / '.harness'}"
 
 
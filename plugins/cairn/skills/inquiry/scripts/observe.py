@@ -10,7 +10,7 @@ surprise = confidence * wrongness, where wrongness = {right:0, partial:0.5, wron
 A surprise >= --threshold (default 0.5) is significant and teaches a model.
 """
 from __future__ import annotations
-import argparse, datetime as dt, os, subprocess, sys, tempfile, json
+import argparse, sys
 from pathlib import Path
 import store
 
@@ -41,6 +41,7 @@ def main(argv=None):
     ap.add_argument("--threshold", type=float, default=0.5)
     args = ap.parse_args(argv)
     repo = Path(args.repo).resolve()
+    import datetime as dt  # here, not in observe_once: that runs under the store lock
     def observe_once(existing):
         if not existing:
             raise KeyError(args.id)
@@ -64,27 +65,19 @@ def main(argv=None):
     if sig and args.reframe:
         mm = _find_models_record(repo)
         if mm:
-            j = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
-            try:
-                json.dump({"reframe": args.reframe, "solution_classes": [],
-                           "taught_by_gap": f"confident prediction ({rec['confidence']}) was wrong: {rec['claim']}"}, j)
-                j.close()
-                proc = subprocess.run([sys.executable, str(mm), "--repo", str(repo),
-                                "--smell", rec["claim"][:60], "--from-json", j.name],
-                                      text=True, capture_output=True)
-                if proc.returncode != 0:
-                    if proc.stderr:
-                        print(proc.stderr.strip(), file=sys.stderr)
-                    if proc.stdout:
-                        print(proc.stdout.strip(), file=sys.stderr)
-                    print("  -> mental-model teaching FAILED; observation was recorded.", file=sys.stderr)
-                    return proc.returncode
-                print("  -> taught mental-models (authority: a confident prediction was wrong).")
-            finally:
-                try:
-                    os.unlink(j.name)
-                except OSError:
-                    pass
+            import dispatch, json  # dispatch: lib/, on sys.path via store
+            model = {"reframe": args.reframe, "solution_classes": [],
+                     "taught_by_gap": f"confident prediction ({rec['confidence']}) was wrong: {rec['claim']}"}
+            proc = dispatch.run(mm, ["--repo", str(repo), "--smell", rec["claim"][:60], "--from-json", "-"],
+                                stdin=json.dumps(model), model=model)
+            if proc.returncode != 0:
+                if proc.stderr:
+                    print(proc.stderr.strip(), file=sys.stderr)
+                if proc.stdout:
+                    print(proc.stdout.strip(), file=sys.stderr)
+                print("  -> mental-model teaching FAILED; observation was recorded.", file=sys.stderr)
+                return proc.returncode
+            print("  -> taught mental-models (authority: a confident prediction was wrong).")
     elif sig and not args.reframe:
         print("  -> significant surprise but no --reframe given; the lesson is unrecorded. "
               "What would have predicted correctly?")
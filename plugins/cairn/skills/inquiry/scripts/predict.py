@@ -9,7 +9,7 @@ confidence outside (0,1), is refused — an unfalsifiable or unscored prediction
 not a prediction.
 """
 from __future__ import annotations
-import argparse, datetime as dt, hashlib, sys
+import argparse, sys
 from pathlib import Path
 import store
 
@@ -23,6 +23,7 @@ def main(argv=None):
     if not (0.0 < args.confidence < 1.0):
         print("REFUSED: confidence must be in (0,1). 0 or 1 is certainty, not a prediction.", file=sys.stderr)
         return 2
+    import datetime as dt, hashlib
     repo = Path(args.repo).resolve()
     now = dt.datetime.now().isoformat(timespec="seconds")
     pid = hashlib.sha1((args.claim + now).encode()).hexdigest()[:8]
@@ -2,88 +2,67 @@
 """Prediction-log port for inquiry (JSONL). One prediction per line. The confidence
 and made_at are stamped at prediction time; observation/outcome/surprise are filled
 later — so a backfilled prediction (confidence written after the look) is visible as
-an entry whose observed_at precedes or equals nothing, i.e. is structurally suspect."""
+an entry whose observed_at precedes or equals nothing, i.e. is structurally suspect.
+
+Log-structured (lib/logstore.py): a prediction appends one line and an observation
+appends the updated version; the newest line per id wins. Logging hundreds of
+predictions no longer rewrites the whole log each time, and with
+CAIRN_GROUP_COMMIT_MS set, concurrent predictions share one fsync per batch."""
 from __future__ import annotations
-import json
+import sys
 from pathlib import Path
-from typing import Iterator
+
+_HERE = Path(__file__).resolve().parent
+for _lib in (_HERE.parent.parent.parent / "lib", _HERE.parent / "_lib"):
+    if (_lib / "logstore.py").is_file():
+        if str(_lib) not in sys.path: sys.path.insert(0, str(_lib))
+        break
+import logstore
 
 JSONL_NAME = "inquiry-log.jsonl"
+KEY = "id"
 
 
 def jsonl_path(repo: Path, store: str | None) -> Path:
     return Path(store) if store else repo / JSONL_NAME
 
 
-def _records(repo: Path, store: str | None) -> Iterator[dict]:
-    p = jsonl_path(repo, store)
-    if not p.exists():
-        return
-    with p.open(encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                try: rec = json.loads(line)
-                except json.JSONDecodeError: pass
-                else:
-                    if isinstance(rec, dict):
-                        yield rec
-
-
 def read_all(repo: Path, store: str | None) -> list[dict]:
-    return list(_records(repo, store))
+    return logstore.read_all(jsonl_path(repo, store), KEY)
 
 
 def read_one(repo: Path, store: str | None, pid: str) -> dict | None:
-    for r in _records(repo, store):
-        if r.get("id") == pid:
-            return r
-    return None
-
-
-def _locked(p, fn):
-    import os, time
-    lock = p.with_suffix(p.suffix + ".lock"); p.parent.mkdir(parents=True, exist_ok=True)
-    acquired = False
-    for _ in range(500):
-        try: os.close(os.open(str(lock), os.O_CREAT | os.O_EXCL | os.O_WRONLY)); acquired = True; break
-        except FileExistsError:
-            try:
-                if time.time() - os.path.getmtime(lock) > 10: os.unlink(lock); continue
-            except OSError: pass
-            time.sleep(0.01)
-    if not acquired:
-        raise TimeoutError(f"timed out waiting for lock {lock}")
-    try: return fn()
-    finally:
-        if acquired:
-            try: os.unlink(lock)
-            except OSError: pass
-
-
-def _atomic_write_lines(p, lines):
-    import os, tempfile
-    fd, tmp = tempfile.mkstemp(dir=str(p.parent), prefix=".tmp-", suffix=".jsonl")
-    with os.fdopen(fd, "w", encoding="utf-8") as f:
-        f.write("".join(l + "\n" for l in lines)); f.flush(); os.fsync(f.fileno())
-    os.replace(tmp, p)
+    return logstore.read_one(jsonl_path(repo, store), KEY, pid)
+
+
+def group_commit_delay() -> float | None:
+    """CAIRN_GROUP_COMMIT_MS=<ms> turns on group commit for upserts: writers in
+    flight together share one append + fsync, the flusher lingering at most <ms>
+    to gather them. Unset (default): every upsert commits on its own."""
+    import os
+    raw = os.environ.get("CAIRN_GROUP_COMMIT_MS")
+    if raw is None or raw.strip() == "":
+        return None
+    try:
+        return max(0.0, float(raw)) / 1000.0
+    except ValueError:
+        return None
 
 
 def upsert(repo: Path, store: str | None, rec: dict) -> None:
-    p = jsonl_path(repo, store)
-    def _rmw():
-        ex = {r.get("id"): r for r in _records(repo, store)}
-        ex[rec["id"]] = rec
-        _atomic_write_lines(p, [json.dumps(r, ensure_ascii=False) for r in ex.values()])
-    _locked(p, _rmw)
+    """Durable on return, either way — predict.py reports the id only after it."""
+    delay = group_commit_delay()
+    if delay is None:
+        logstore.upsert(jsonl_path(repo, store), KEY, rec)
+    else:
+        logstore.upsert_grouped(jsonl_path(repo, store), KEY, rec, delay)
 
 
 def update(repo: Path, store: str | None, pid: str, updater) -> dict:
-    p = jsonl_path(repo, store)
-    def _rmw():
-        ex = {r.get("id"): r for r in _records(repo, store)}
-        rec = updater(ex.get(pid))
-        ex[pid] = rec
-        _atomic_write_lines(p, [json.dumps(r, ensure_ascii=False) for r in ex.values()])
-        return rec
-    return _locked(p, _rmw)
+    return logstore.update(jsonl_path(repo, store), KEY, pid, updater)
+
+
+def batch(repo: Path, store: str | None):
+    """`with batch(repo, store) as tx:` — tx.upsert / tx.update / tx.read_one under
+    one lock, committed as one atomic append."""
+    return logstore.batch(jsonl_path(repo, store), KEY)
@@ -27,7 +27,6 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import datetime as _dt
 import json
 from pathlib import Path
 
@@ -76,6 +75,7 @@ def do_observe(repo: Path, friction: str, key: str, kind: str, where: str | None
                           "occurrences": [], "status": "open"}
     r["friction"] = friction or r["friction"]
     r["kind"] = kind or r.get("kind", "abstraction")
+    import datetime as _dt
     stamp = where or _dt.datetime.now().isoformat(timespec="microseconds")
     if where is None or stamp not in r["occurrences"]:
         r["occurrences"].append(stamp)
@@ -134,6 +134,7 @@ def do_promote(repo: Path, key: str, sink: str, landed: str) -> int:
     r["status"] = "promoted"
     r["resolution_sink"] = sink
     r["landed_in"] = landed
+    import datetime as _dt
     r["promoted_on"] = _dt.date.today().isoformat()
     recs[key] = r
     save(repo, recs)
@@ -4,16 +4,22 @@
 Token-efficient by construction: a name returns ONE record (streamed via the
 storage port, never the whole store); no name returns the compact index
 (name + version + date); --search returns ranked names + one-line capabilities,
-not full entries. The agent's context only ever holds what it asked for.
+not full entries. The agent's context only ever holds what it asked for, and
+--max-tokens bounds even that (lib/outmeter.py): the staleness verdict stays,
+trailing facts and low-ranked hits go first.
 
-Storage lives behind store.py (JSONL today, swappable to SQLite/FTS later with
-no change here). Staleness compares each entry to the repo's package.json.
+Storage lives behind store.py (JSONL by default, SQLite/FTS under
+CAIRN_STORE=sqlite — no change here either way). Staleness compares each entry
+to the repo's package.json.
 
 Usage:
     python lib_lookup.py                      # index (cheap)
     python lib_lookup.py nativewind           # one entry + staleness
     python lib_lookup.py --search "validation runtime"   # capability search
     python lib_lookup.py zod --json
+    python lib_lookup.py --search "forms" --max-tokens 200
+    python lib_lookup.py --search "forms" --top 5        # the 5 best matches only
+    python lib_lookup.py --stats              # store shape + Bloom filter false-positive rate
 """
 from __future__ import annotations
 
@@ -22,25 +28,33 @@ import json
 import sys
 from pathlib import Path
 
+_HERE = Path(__file__).resolve().parent
+for _lib in (_HERE.parent.parent.parent / "lib", _HERE.parent / "_lib"):
+    if (_lib / "outmeter.py").is_file():
+        if str(_lib) not in sys.path:
+            sys.path.insert(0, str(_lib))
+        break
+import outmeter
 import store
 
 
-def render_index(repo: Path, st: str | None) -> str:
+def render_index(repo: Path, st: str | None, out: outmeter.Meter) -> None:
     rows = store.read_index(repo, st)
     if not rows:
-        return "library-knowledge store is empty. Seed it with lib_refresh.py."
-    out = ["library-knowledge index (consult one with: lib_lookup.py <name>):"]
+        out.add("library-knowledge store is empty. Seed it with lib_refresh.py.")
+        return
+    out.add("library-knowledge index (consult one with: lib_lookup.py <name>):")
     for r in sorted(rows, key=lambda x: x.get("name") or ""):
         name = r.get("name")
         inst = store.installed_version(repo, name)
         sv = store.staleness(r, inst)
-        out.append(f"  {name:<18} confirmed {str(r.get('confirmed_version')):<12} "
-                   f"on {r.get('confirmed_on')}  [{sv}]"
-                   + (f"  installed {inst}" if inst and sv == 'STALE' else ""))
-    return "\n".join(out)
+        # a STALE row is the one the agent must act on: it outlives the fresh ones
+        out.add(f"  {name:<18} confirmed {str(r.get('confirmed_version')):<12} "
+                f"on {r.get('confirmed_on')}  [{sv}]"
+                + (f"  installed {inst}" if inst and sv == 'STALE' else ""), 1 if sv == "STALE" else 2)
 
 
-def render_entry(repo: Path, name: str, e: dict) -> str:
+def render_entry(repo: Path, name: str, e: dict, meter: outmeter.Meter) -> None:
     import freshness
     inst = store.installed_version(repo, name)
     sv = store.staleness(e, inst)
@@ -59,52 +73,66 @@ def render_entry(repo: Path, name: str, e: dict) -> str:
         out.append(f"  ⚠ installed {inst} drifted past the confirmed version — REFRESH before trusting.")
     if sv == "UNKNOWN":
         out.append("  (not a declared dependency here, or version unreadable.)")
+    meter.add("\n".join(out))  # the verdict: never dropped
     if e.get("capability"):
-        out.append(f"  capability: {e['capability']}")
+        meter.add(f"  capability: {e['capability']}", 1)
     for f in e.get("key_facts", []):
-        out.append(f"  - {f}")
+        meter.add(f"  - {f}", 2)
     if e.get("delta_from_prior"):
-        out.append(f"  delta from prior: {e['delta_from_prior']}")
+        meter.add(f"  delta from prior: {e['delta_from_prior']}", 3)
     if e.get("source_url"):
-        out.append(f"  source: {e['source_url']}")
-    return "\n".join(out)
+        meter.add(f"  source: {e['source_url']}", 3)
 
 
-def render_search(repo: Path, st: str | None, terms: str) -> str:
-    hits = store.search(repo, st, terms)
+def render_search(repo: Path, st: str | None, terms: str, out: outmeter.Meter, k: int | None = None) -> None:
+    hits = store.search(repo, st, terms, k)
     if not hits:
-        return f"no library matches '{terms}'. If nothing on the shelf solves it, confirm a candidate against docs and record it."
-    out = [f"capability matches for '{terms}' (best first):"]
+        out.add(f"no library matches '{terms}'. If nothing on the shelf solves it, confirm a candidate against docs and record it.")
+        return
+    out.add(f"capability matches for '{terms}' (best first):")
     for score, r in hits:
-        out.append(f"  [{score}] {r.get('name')} — {r.get('capability','(no capability recorded)')}")
-    out.append("consult one with: lib_lookup.py <name>")
-    return "\n".join(out)
+        out.add(f"  [{score}] {r.get('name')} — {r.get('capability','(no capability recorded)')}", 1)
+    out.add("consult one with: lib_lookup.py <name>")
 
 
 def main(argv: list[str] | None = None) -> int:
     p = argparse.ArgumentParser(description="Consult the library-knowledge store (cheap read path).")
     p.add_argument("name", nargs="?", default=None, help="Library name. Omit for the index.")
     p.add_argument("--search", default=None, help="Capability query (ranked names, not full entries).")
+    p.add_argument("--top", type=int, default=None, help="With --search: only the best N matches.")
     p.add_argument("--repo", default=".", help="Repo root (default: .).")
     p.add_argument("--store", default=None, help="Path to the store file.")
     p.add_argument("--json", action="store_true")
+    p.add_argument("--stats", action="store_true", help="Store shape + Bloom filter false-positive rate.")
+    outmeter.add_argument(p)
     args = p.parse_args(argv)
+    if args.top is not None and args.top < 1:
+        p.error("--top must be at least 1")
     repo = Path(args.repo).resolve()
+    out = outmeter.Meter(args.max_tokens)
+
+    if args.stats:
+        print(json.dumps(store.stats(repo, args.store), indent=2))
+        return 0
 
     if args.search:
         if args.json:
-            print(json.dumps([{"name": r.get("name"), "capability": r.get("capability"), "score": s}
-                              for s, r in store.search(repo, args.store, args.search)], indent=2))
+            print(json.dumps(outmeter.fit_list([{"name": r.get("name"), "capability": r.get("capability"), "score": s}
+                                                for s, r in store.search(repo, args.store, args.search, args.top)],
+                                               args.max_tokens), indent=2))
         else:
-            print(render_search(repo, args.store, args.search))
+            render_search(repo, args.store, args.search, out, args.top)
+            out.emit()
         return 0
 
     if args.name is None:
         if args.json:
-            print(json.dumps([{**r, "staleness": store.staleness(r, store.installed_version(repo, r.get("name")))}
-                              for r in store.read_index(repo, args.store)], indent=2))
+            print(json.dumps(outmeter.fit_list(
+                [{**r, "staleness": store.staleness(r, store.installed_version(repo, r.get("name")))}
+                 for r in store.read_index(repo, args.store)], args.max_tokens), indent=2))
         else:
-            print(render_index(repo, args.store))
+            render_index(repo, args.store, out)
+            out.emit()
         return 0
 
     e = store.read_one(repo, args.store, args.name)
@@ -115,7 +143,8 @@ def main(argv: list[str] | None = None) -> int:
     if args.json:
         print(json.dumps({**e, "staleness": store.staleness(e, store.installed_version(repo, args.name))}, indent=2))
     else:
-        print(render_entry(repo, args.name, e))
+        render_entry(repo, args.name, e, out)
+        out.emit()
     return 0
 
 
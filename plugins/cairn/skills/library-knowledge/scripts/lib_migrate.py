@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Move the library-knowledge store onto the SQLite / FTS5 backend, in one shot.
+
+Streams lib-knowledge.jsonl (or a legacy lib-knowledge.json) into
+lib-knowledge.db through the storage port. The JSONL keeps serving while the bulk
+copy runs; lines appended meanwhile are replayed under the writer lock before the
+finished db is renamed into place, so the move needs no downtime. Afterwards, set
+CAIRN_STORE=sqlite for every caller to serve from the db (FTS5-ranked --search).
+
+Usage:
+    python lib_migrate.py [--repo .] [--store lib-knowledge.jsonl]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import store
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="Migrate library-knowledge to the SQLite/FTS5 backend.")
+    p.add_argument("--repo", default=".", help="Repo root (default: .).")
+    p.add_argument("--store", default=None, help="Path to the JSONL store file.")
+    args = p.parse_args(argv)
+    repo = Path(args.repo).resolve()
+    if not store.jsonl_path(repo, args.store).exists() and not store._legacy(repo).exists():
+        print("error: no library-knowledge store to migrate.", file=sys.stderr)
+        return 2
+    n = store.migrate_to_sqlite(repo, args.store)
+    print(f"migrated {n} librar{'y' if n == 1 else 'ies'} into {store.db_path(repo, args.store)}. "
+          f"Serve from it with CAIRN_STORE=sqlite.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
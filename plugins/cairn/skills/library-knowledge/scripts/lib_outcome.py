@@ -15,9 +15,9 @@ path now surfaces) and intuitive (the model, which the reflex surfaces next time
       --reframe "in this repo, file locations churn; re-derive the path, don't trust the cache"
 """
 from __future__ import annotations
-import argparse, os, subprocess, sys, tempfile, json
+import argparse, sys
 from pathlib import Path
-import store, freshness
+import store
 
 
 def _find_models_record(repo: Path):
@@ -48,6 +48,7 @@ def main(argv=None):
         print(f"no cached fact '{args.name}'. (record it first, or it was never cached.)", file=sys.stderr)
         return 2
 
+    import freshness
     before = freshness.verdict(entry)["policy"]
     freshness.record_outcome(entry, fresh=args.fresh)
     after = freshness.verdict(entry)
@@ -68,30 +69,22 @@ def main(argv=None):
                   "and re-derive for this problem.")
         mm = _find_models_record(repo)
         if mm:
+            import dispatch, json  # dispatch: lib/, on sys.path via store
             smell = args.situation or f"relying on cached '{args.name}'"
-            j = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
-            try:
-                json.dump({"reframe": args.reframe, "solution_classes": [],
-                           "taught_by_gap": f"cached fact '{args.name}' was stale {entry.get('stale_hits')}/"
-                                            f"{entry.get('uses')} recalls — caching it is a losing bet (re-derive)"}, j)
-                j.close()
-                proc = subprocess.run([sys.executable, str(mm), "--repo", str(repo),
-                                "--smell", smell[:60], "--from-json", j.name],
-                                      text=True, capture_output=True)
-                if proc.returncode != 0:
-                    if proc.stderr:
-                        print(proc.stderr.strip(), file=sys.stderr)
-                    if proc.stdout:
-                        print(proc.stdout.strip(), file=sys.stderr)
-                    print("  -> mental-model teaching FAILED; stale outcome was recorded.", file=sys.stderr)
-                    return proc.returncode
-                print("  -> taught mental-models (authority: a cached fact proved volatile in practice); "
-                      "the reflex will catch it next time.")
-            finally:
-                try:
-                    os.unlink(j.name)
-                except OSError:
-                    pass
+            model = {"reframe": args.reframe, "solution_classes": [],
+                     "taught_by_gap": f"cached fact '{args.name}' was stale {entry.get('stale_hits')}/"
+                                      f"{entry.get('uses')} recalls — caching it is a losing bet (re-derive)"}
+            proc = dispatch.run(mm, ["--repo", str(repo), "--smell", smell[:60], "--from-json", "-"],
+                                stdin=json.dumps(model), model=model)
+            if proc.returncode != 0:
+                if proc.stderr:
+                    print(proc.stderr.strip(), file=sys.stderr)
+                if proc.stdout:
+                    print(proc.stdout.strip(), file=sys.stderr)
+                print("  -> mental-model teaching FAILED; stale outcome was recorded.", file=sys.stderr)
+                return proc.returncode
+            print("  -> taught mental-models (authority: a cached fact proved volatile in practice); "
+                  "the reflex will catch it next time.")
         else:
             print("  -> (could not resolve mental-models recorder; record the reframe by hand.)")
     elif args.stale and after["policy"] == "re-derive" and not args.reframe:
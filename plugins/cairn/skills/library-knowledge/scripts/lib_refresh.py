@@ -9,12 +9,11 @@ against package.json — is this script.
   --set <name> --from-json <file>   merge a confirmed entry, stamp confirmed_on
   --check                           FRESH/STALE/UNKNOWN per entry; exit 1 if any STALE
 
-Storage is behind store.py (JSONL today). The write keeps one line per name.
+Storage is behind store.py (JSONL, or SQLite under CAIRN_STORE=sqlite).
 """
 from __future__ import annotations
 
 import argparse
-import datetime as _dt
 import json
 import sys
 from pathlib import Path
@@ -31,6 +30,7 @@ def do_set(repo: Path, st: str | None, name: str, from_json: str) -> int:
     if "confirmed_version" not in entry:
         print("error: entry must include confirmed_version (the version you actually confirmed).", file=sys.stderr)
         return 2
+    import datetime as _dt
     entry["confirmed_on"] = _dt.date.today().isoformat()
     _src = str(entry.get("source_url", ""))
     if not _src or "nowhere" in _src or "example" in _src or "made up" in str(entry).lower():
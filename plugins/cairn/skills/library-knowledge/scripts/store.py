@@ -1,31 +1,50 @@
 #!/usr/bin/env python3
 """Storage port for library-knowledge. The ONLY module that touches the store.
 
-Backend today: JSONL — one self-describing record per line. Reads STREAM the
-file, so a name lookup parses lines until it matches and returns ONE record; the
-caller (and the agent's context) never receives the whole store, no matter how
-many libraries it holds. The index returns three fields per line; search scans
-records (cheap at this scale).
+Backend today: JSONL — one self-describing record per line, log-structured
+(lib/logstore.py): an upsert appends the new version and the newest line per name
+wins, so a write costs one line, not a rewrite of every library. Compaction
+rewrites the file sorted by name behind a header marker, and a name lookup
+bisects that sorted region, decoding only the "name" of each probed line
+(lib/sortedlog.py, O(log n), no sidecar); a legacy or unsorted file — no marker,
+or a long unsorted tail — is served through the key -> offset sidecar instead.
+Either way the lookup returns ONE record; the caller (and the agent's context)
+never receives the whole store, no matter how many libraries it holds. The
+index returns three fields per line. Search streams the records; asked for the
+top k, it keeps the k best in a bounded heap instead of sorting every hit. Under
+CAIRN_STORE=sqlite it is an FTS5 BM25 query with LIMIT k instead.
 
 This is a PORT. lib_lookup and lib_refresh call these functions and never touch
-the file directly. Swapping the backend to SQLite / FTS5 — the move that earns
-its place only when capability-search across a large store becomes hot — changes
-ONLY this module; every caller is unaffected. JSONL makes that migration trivial
-(one row per line).
+the file directly. CAIRN_STORE=sqlite swaps the backend to SQLite / FTS5 — the
+move that earns its place once capability-search across a large store is hot —
+inside this module only; every caller is unaffected. JSONL makes that migration
+trivial (one row per line; see migrate_to_sqlite / lib_migrate.py).
 
 Back-compat: if lib-knowledge.jsonl is absent but a legacy lib-knowledge.json
 (single {"libraries": {name: entry}} object) exists, reads fall back to it and
-the next upsert writes JSONL. upsert keeps one line per name (no duplicates), so
-read_one can stop at the first match.
+the next upsert writes JSONL. Compaction rewrites the file sorted by name, one
+line per name, once superseded versions pile up.
 """
 from __future__ import annotations
 
 import json
+import os
+import re as _re
+import sys
 from pathlib import Path
-from typing import Iterator
+from collections.abc import Iterator
+
+_HERE = Path(__file__).resolve().parent
+for _lib in (_HERE.parent.parent.parent / "lib", _HERE.parent / "_lib"):
+    if (_lib / "logstore.py").is_file():
+        if str(_lib) not in sys.path:
+            sys.path.insert(0, str(_lib))
+        break
+import logstore
 
 JSONL_NAME = "lib-knowledge.jsonl"
 LEGACY_NAME = "lib-knowledge.json"
+KEY = "name"
 
 
 def jsonl_path(repo: Path, store: str | None) -> Path:
@@ -49,24 +68,14 @@ def _legacy_records(repo: Path) -> Iterator[dict]:
 
 
 def read_one(repo: Path, store: str | None, name: str) -> dict | None:
-    """Stream the store and return the record for `name` (early exit), or None.
-    Only the matching record is materialized — the token-cheap path."""
+    """Return the newest record for `name`, or None. Bisects the name-sorted file
+    (lib/sortedlog.py); an unmarked file goes through the key -> offset sidecar
+    (lib/keyindex.py). Either way ONE record is parsed — the token-cheap path."""
+    if _serving_sqlite(repo, store):
+        return _sql_read_one(repo, store, name)
     p = jsonl_path(repo, store)
     if p.exists():
-        with p.open(encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    rec = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                if not isinstance(rec, dict):
-                    continue
-                if rec.get("name") == name:
-                    return rec
-        return None
+        return logstore.read_one(p, KEY, name)
     # legacy fallback
     for rec in _legacy_records(repo):
         if rec.get("name") == name:
@@ -75,25 +84,20 @@ def read_one(repo: Path, store: str | None, name: str) -> dict | None:
 
 
 def iter_records(repo: Path, store: str | None) -> Iterator[dict]:
+    if _serving_sqlite(repo, store):
+        yield from _sql_iter(repo, store)
+        return
     p = jsonl_path(repo, store)
     if p.exists():
-        with p.open(encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    rec = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                if isinstance(rec, dict):
-                    yield rec
+        yield from logstore.read_all(p, KEY)
         return
     yield from _legacy_records(repo)
 
 
 def read_index(repo: Path, store: str | None) -> list[dict]:
     """Cheap top-level view: name + confirmed_version + confirmed_on only."""
+    if _serving_sqlite(repo, store):
+        return _sql_index(repo, store)
     return [
         {"name": r.get("name"), "confirmed_version": r.get("confirmed_version"),
          "confirmed_on": r.get("confirmed_on")}
@@ -101,71 +105,283 @@ def read_index(repo: Path, store: str | None) -> list[dict]:
     ]
 
 
-def _locked(p, fn):
-    """Hold an exclusive advisory lock across the WHOLE read-modify-write."""
-    import os, time
-    lock = p.with_suffix(p.suffix + ".lock")
-    p.parent.mkdir(parents=True, exist_ok=True)
-    acquired = False
-    for _ in range(500):
-        try:
-            os.close(os.open(str(lock), os.O_CREAT | os.O_EXCL | os.O_WRONLY)); acquired = True; break
-        except FileExistsError:
-            try:
-                if time.time() - os.path.getmtime(lock) > 10:
-                    os.unlink(lock); continue
-            except OSError:
-                pass
-            time.sleep(0.01)
-    if not acquired:
-        raise TimeoutError(f"timed out waiting for lock {lock}")
+def upsert(repo: Path, store: str | None, name: str, entry: dict) -> None:
+    """Append the newest version of one record; compaction rewrites the file
+    sorted by name, one line per name, behind the bisect marker. Migrates a legacy
+    json store to jsonl on first write."""
+    p = jsonl_path(repo, store)
+    rec = {"name": name, **{k: v for k, v in entry.items() if k != "name"}}
+    if backend() == "sqlite":
+        _sql_upsert(repo, store, rec)
+        return
+    if p.exists() or not _legacy(repo).exists():
+        logstore.upsert(p, KEY, rec, order=KEY)
+        return
+    def _migrate():
+        # re-read inside the lock: a concurrent first write may have migrated already
+        src = logstore.read_all(p, KEY) if p.exists() else _legacy_records(repo)
+        records = {r["name"]: r for r in src if r.get("name")}
+        records[name] = rec
+        logstore.write_all(p, records.values(), sorted_by=KEY)
+    logstore.locked(p, _migrate)
+
+
+def stats(repo: Path, store: str | None) -> dict:
+    """JSONL store shape + Bloom filter false-positive estimate, for --stats."""
+    return {"backend": "sqlite" if _serving_sqlite(repo, store) else "jsonl",
+            **logstore.stats(jsonl_path(repo, store), KEY)}
+
+
+def search(repo: Path, store: str | None, terms: str, k: int | None = None) -> list[tuple[int, dict]]:
+    """Capability search: rank records by how many query terms appear in the
+    name / capability / key_facts. Scan-backed on JSONL; FTS5 BM25-ranked when
+    CAIRN_STORE=sqlite. Returns (score, record) sorted desc; with k, the best k
+    (a k-bounded heap over the scan, LIMIT k in SQL)."""
+    if _serving_sqlite(repo, store):
+        hits = _sql_search(repo, store, terms, k)
+        if hits is not None:
+            return hits
+    import heapq, tracing
+    wants = [t for t in terms.lower().split() if t]
+
+    def scored():
+        for r in iter_records(repo, store):
+            hay = " ".join([
+                str(r.get("name", "")), str(r.get("capability", "")), _facts_text(r),
+            ]).lower()
+            score = sum(1 for w in wants if w in hay)
+            if score:
+                yield score, r
+    with tracing.span("retrieval.rank", "retrieval", store=jsonl_path(repo, store).name, k=k) as s:
+        if k is None:
+            hits = sorted(scored(), key=lambda s: -s[0])
+        else:
+            hits = heapq.nlargest(k, scored(), key=lambda s: s[0])
+        s.set(hits=len(hits))
+    return hits
+
+
+def _facts_text(rec: dict) -> str:
+    facts = rec.get("key_facts") or []
+    return " ".join(str(f) for f in facts) if isinstance(facts, list) else str(facts)
+
+
+# --- SQLite / FTS5 backend (CAIRN_STORE=sqlite) -------------------------------
+# One row per library (name, the two index columns, the record as JSON) plus an
+# FTS5 table over name / capability / key_facts keyed by the same rowid, so search
+# is an indexed BM25 query instead of a scan. Until lib-knowledge.db exists the
+# JSONL store keeps serving reads, and the first sqlite write migrates it first,
+# so flipping the env var never leaves the store empty. lib_migrate.py does the
+# same move ahead of time, streamed, for a large store.
+
+DB_NAME = "lib-knowledge.db"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS libraries (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    confirmed_version TEXT,
+    confirmed_on TEXT,
+    body TEXT NOT NULL
+);
+"""
+_FTS = "CREATE VIRTUAL TABLE IF NOT EXISTS libraries_fts USING fts5(name, capability, key_facts)"
+_BATCH = 1000
+
+
+def backend() -> str:
+    return os.environ.get("CAIRN_STORE", "jsonl")
+
+
+def db_path(repo: Path, store: str | None) -> Path:
+    return jsonl_path(repo, store).with_suffix(".db") if store else repo / DB_NAME
+
+
+def _serving_sqlite(repo: Path, store: str | None) -> bool:
+    return backend() == "sqlite" and db_path(repo, store).exists()
+
+
+def _connect(db: Path):
+    """Open (creating if needed) the db. Returns (connection, has_fts): a Python
+    built without FTS5 still works, search just falls back to the scan."""
+    import sqlite3
+    db.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(db), timeout=10)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.executescript(_SCHEMA)
     try:
-        return fn()
+        con.execute(_FTS)
+        fts = True
+    except sqlite3.OperationalError:
+        fts = False
+    return con, fts
+
+
+def _sql_put(con, fts: bool, rec: dict) -> None:
+    name = rec["name"]
+    con.execute(
+        "INSERT INTO libraries (name, confirmed_version, confirmed_on, body) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET confirmed_version = excluded.confirmed_version, "
+        "confirmed_on = excluded.confirmed_on, body = excluded.body",
+        (name, rec.get("confirmed_version"), rec.get("confirmed_on"),
+         json.dumps(rec, ensure_ascii=False)))
+    if fts:
+        (rid,) = con.execute("SELECT id FROM libraries WHERE name = ?", (name,)).fetchone()
+        con.execute("DELETE FROM libraries_fts WHERE rowid = ?", (rid,))
+        con.execute("INSERT INTO libraries_fts (rowid, name, capability, key_facts) VALUES (?, ?, ?, ?)",
+                    (rid, name, str(rec.get("capability", "")), _facts_text(rec)))
+
+
+def _sql_read_one(repo: Path, store: str | None, name: str) -> dict | None:
+    con, _fts = _connect(db_path(repo, store))
+    try:
+        row = con.execute("SELECT body FROM libraries WHERE name = ?", (name,)).fetchone()
     finally:
-        if acquired:
-            try: os.unlink(lock)
-            except OSError: pass
+        con.close()
+    return json.loads(row[0]) if row else None
 
 
-def _atomic_write_lines(p, lines):
-    import os, tempfile
-    fd, tmp = tempfile.mkstemp(dir=str(p.parent), prefix=".tmp-", suffix=".jsonl")
-    with os.fdopen(fd, "w", encoding="utf-8") as f:
-        f.write("".join(line + "\n" for line in lines)); f.flush(); os.fsync(f.fileno())
-    os.replace(tmp, p)
+def _sql_iter(repo: Path, store: str | None) -> Iterator[dict]:
+    con, _fts = _connect(db_path(repo, store))
+    try:
+        for (body,) in con.execute("SELECT body FROM libraries ORDER BY name"):
+            yield json.loads(body)
+    finally:
+        con.close()
 
 
-def upsert(repo: Path, store: str | None, name: str, entry: dict) -> None:
-    """Write/replace one record, keeping the file one-line-per-name (JSONL).
-    Migrates a legacy json store to jsonl on first write."""
-    p = jsonl_path(repo, store)
-    def _rmw():
-        records = {r["name"]: r for r in iter_records(repo, store) if r.get("name")}
-        records[name] = {"name": name, **{k: v for k, v in entry.items() if k != "name"}}
-        _atomic_write_lines(p, [json.dumps(records[n], ensure_ascii=False) for n in sorted(records)])
-    _locked(p, _rmw)
+def _sql_index(repo: Path, store: str | None) -> list[dict]:
+    con, _fts = _connect(db_path(repo, store))
+    try:
+        rows = con.execute(
+            "SELECT name, confirmed_version, confirmed_on FROM libraries ORDER BY name").fetchall()
+    finally:
+        con.close()
+    return [{"name": n, "confirmed_version": v, "confirmed_on": d} for n, v, d in rows]
 
 
-def search(repo: Path, store: str | None, terms: str) -> list[tuple[int, dict]]:
-    """Capability search: rank records by how many query terms appear in the
-    name / capability / key_facts. Scan-backed today; the seam where SQLite FTS
-    would slot in behind this port. Returns (score, record) sorted desc."""
-    wants = [t for t in terms.lower().split() if t]
-    scored: list[tuple[int, dict]] = []
-    for r in iter_records(repo, store):
-        hay = " ".join([
-            str(r.get("name", "")), str(r.get("capability", "")),
-            " ".join(r.get("key_facts", [])),
-        ]).lower()
-        score = sum(1 for w in wants if w in hay)
-        if score:
-            scored.append((score, r))
-    scored.sort(key=lambda s: -s[0])
-    return scored
+def _sql_search(repo: Path, store: str | None, terms: str, k: int | None = None) -> list[tuple[int, dict]] | None:
+    """BM25-ranked FTS5 match; every query word is an OR'd prefix term, the FTS
+    analogue of the scan's substring test. None when FTS5 is unavailable."""
+    words = _re.findall(r"\w+", terms.lower())
+    con, fts = _connect(db_path(repo, store))
+    try:
+        if not fts:
+            return None
+        if not words:
+            return []
+        query = " OR ".join(f'"{w}"*' for w in words)
+        rows = con.execute(
+            "SELECT l.body, bm25(libraries_fts) FROM libraries_fts "
+            "JOIN libraries l ON l.id = libraries_fts.rowid "
+            "WHERE libraries_fts MATCH ? ORDER BY bm25(libraries_fts) LIMIT ?",
+            (query, -1 if k is None else k)).fetchall()
+    finally:
+        con.close()
+    # rows arrive in BM25 order; the reported score is the scan's own (query words
+    # hit), so a caller sees the same scale whichever backend answered
+    out = []
+    for body, _bm25 in rows:
+        rec = json.loads(body)
+        hay = " ".join([str(rec.get("name", "")), str(rec.get("capability", "")), _facts_text(rec)]).lower()
+        out.append((sum(1 for w in words if w in hay) or 1, rec))
+    return out
+
+
+def _sql_upsert(repo: Path, store: str | None, rec: dict) -> None:
+    db, src = db_path(repo, store), jsonl_path(repo, store)
+    if not db.exists() and (src.exists() or _legacy(repo).exists()):
+        def _migrate():
+            # re-check inside the lock: a concurrent first write may have migrated already
+            if not db.exists():
+                migrate_to_sqlite(repo, store)
+        logstore.locked(src, _migrate)
+    con, fts = _connect(db)
+    try:
+        with con:
+            _sql_put(con, fts, rec)
+    finally:
+        con.close()
+
+
+def _copy_lines(con, fts: bool, p: Path, start: int, stop: int | None) -> int:
+    """Stream complete JSONL lines in [start, stop) into the db, committing in
+    batches. Later lines overwrite earlier ones, so the log's last-writer-wins
+    survives without holding the store in memory. Returns lines applied."""
+    n = 0
+    with open(p, "rb") as f:
+        f.seek(start)
+        pos = start
+        for raw in f:
+            if (stop is not None and pos >= stop) or not raw.endswith(b"\n"):
+                break
+            pos += len(raw)
+            try:
+                rec = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(rec, dict) and isinstance(rec.get("name"), str):
+                _sql_put(con, fts, rec)
+                n += 1
+                if n % _BATCH == 0:
+                    con.commit()
+    con.commit()
+    return n
+
+
+def migrate_to_sqlite(repo: Path, store: str | None) -> int:
+    """One-shot move of the JSONL (or legacy JSON) store into lib-knowledge.db.
+
+    The bulk copy streams into a side file of its own while the JSONL keeps serving
+    reads and writes; then, under the JSONL writer lock, the lines appended
+    meanwhile are replayed and the finished db is renamed into place. Readers never
+    see a half-built db and no write made during the move is lost. Two migrations
+    at once each build their own side file; whichever takes the lock second finds
+    the db in place and discards its copy. Returns the number of libraries in the
+    db."""
+    import tempfile
+    src, db = jsonl_path(repo, store), db_path(repo, store)
+    db.parent.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=str(db.parent), prefix=".tmp-", suffix=".db")
+    os.close(fd)
+    tmp = Path(name)
+    con, fts = _connect(tmp)
+    con.execute("PRAGMA journal_mode=DELETE")  # a single file to rename
+    def _finish(tail: int | None):
+        if db.exists():  # a concurrent migration got here first
+            con.close()
+            tmp.unlink()
+            con2, _fts = _connect(db)
+            try:
+                return con2.execute("SELECT count(*) FROM libraries").fetchone()[0]
+            finally:
+                con2.close()
+        if tail is not None:
+            _copy_lines(con, fts, src, tail, None)
+        (count,) = con.execute("SELECT count(*) FROM libraries").fetchone()
+        con.close()
+        os.replace(tmp, db)
+        return count
+    try:
+        if not src.exists():
+            with con:
+                for rec in _legacy_records(repo):
+                    if isinstance(rec.get("name"), str):
+                        _sql_put(con, fts, rec)
+            return logstore.locked(src, lambda: _finish(None))
+        end = src.stat().st_size
+        _copy_lines(con, fts, src, 0, end)
+        return logstore.locked(src, lambda: _finish(end))
+    except BaseException:
+        con.close()
+        for leftover in (tmp, tmp.with_name(tmp.name + "-journal")):
+            try:
+                leftover.unlink()
+            except FileNotFoundError:
+                pass
+        raise
 
 
 # --- repo dependency reads (the freshness-comparison input, not the store) ---
-import re as _re
 
 
 def installed_version(repo: Path, name: str) -> str | None:
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""BM25 inverted index for the retrieval port (CAIRN_RETRIEVAL=bm25).
+
+The matcher normalizes and tokenizes every record on every query; past a few
+thousand models that is the whole cost of a lookup. This keeps, per store, the
+tokenized form once: `<store>.bm25` holds each live record's term frequencies
+and its normalized primary field, and a query scores only the postings of its
+own terms, Okapi BM25 (k1=1.2, b=0.75), plus the matcher's substring bonus on
+the primary field so a short distinctive smell like 'O(n^2)' still surfaces.
+Asked for the top k only, top() stops early once no unscored doc can beat the
+k-th best (MaxScore).
+
+Freshness is the keyindex rule, on the store's inode, size and mtime:
+  same inode, same size, same mtime -> use as is;
+  same inode, larger                -> fold in the appended tail (newest per key wins);
+  anything else                     -> rebuilt from the start.
+Writers never touch the index, so an upsert stays one appended line; the next
+search pays a tail fold (or, after a compaction, a rebuild), never a stale ranking.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+from collections import Counter
+from pathlib import Path
+
+from retrieval import _norm
+
+VERSION = 1
+K1, B = 1.2, 0.75
+SUBSTRING_BONUS = 3.0  # the matcher's containment bonus, on the same scale
+
+
+def index_path(p: Path) -> Path:
+    return p.with_suffix(p.suffix + ".bm25")
+
+
+class Index:
+    """Term -> {doc: tf} postings and per-doc lengths over `fields` of each record.
+    Doc ids are the store key (persisted) or list positions (in memory)."""
+
+    def __init__(self, fields: list[str], key: str | None = None):
+        self.fields, self.key = list(fields), key
+        self.docs: dict = {}      # doc -> [normalized primary, {term: tf}]
+        self.postings: dict[str, dict] = {}
+        self.lens: dict = {}
+        self.total_len = 0
+        # for top()'s upper bounds: never lowered by remove(), so stale only upward
+        self.max_tf: dict[str, int] = {}
+        self.min_len: int | None = None
+        self.scored = 0  # docs fully scored by the last top()
+
+    def add(self, doc, rec: dict) -> None:
+        """Index `rec` as `doc`, replacing any earlier version of it."""
+        self.remove(doc)
+        tf = Counter(_norm(" ".join(str(rec.get(f, "")) for f in self.fields)).split())
+        primary = _norm(str(rec.get(self.fields[0], ""))) if self.fields else ""
+        self._put(doc, primary, dict(tf))
+
+    def _put(self, doc, primary: str, tf: dict) -> None:
+        self.docs[doc] = [primary, tf]
+        for term, n in tf.items():
+            self.postings.setdefault(term, {})[doc] = n
+            if n > self.max_tf.get(term, 0):
+                self.max_tf[term] = n
+        self.lens[doc] = dl = sum(tf.values())
+        self.total_len += dl
+        if self.min_len is None or dl < self.min_len:
+            self.min_len = dl
+
+    def remove(self, doc) -> None:
+        old = self.docs.pop(doc, None)
+        if old is None:
+            return
+        for term in old[1]:
+            plist = self.postings.get(term)
+            if plist is not None:
+                plist.pop(doc, None)
+                if not plist:
+                    del self.postings[term]
+        self.total_len -= self.lens.pop(doc)
+
+    def scores(self, query: str) -> dict:
+        """doc -> score > 0 for `query`, every matching doc scored."""
+        terms, bonus, score = self._plan(query)
+        docs = set(bonus)
+        for _bound, _idf, plist in terms:
+            docs.update(plist)
+        return {doc: s for doc in docs if (s := score(doc)) > 0}
+
+    def top(self, query: str, k: int) -> dict:
+        """doc -> score for every doc that can rank in the top k (ties with the k-th
+        included), MaxScore-pruned. Each query term's score is bounded by its
+        largest tf at the shortest doc length; terms are visited by decreasing bound,
+        each unscored doc in a term's postings is scored in full, and once the bounds
+        of the terms not yet visited sum below the k-th best score so far, no doc
+        still unscored can enter the top k, so the walk stops."""
+        self.scored = 0
+        if k <= 0:
+            return {}
+        terms, bonus, score = self._plan(query)
+        out: dict = {}
+        heap: list[float] = []  # the k best scores so far; heap[0] is the bar
+
+        def offer(doc) -> None:
+            out[doc] = s = score(doc)
+            if len(heap) < k:
+                heapq.heappush(heap, s)
+            elif s > heap[0]:
+                heapq.heapreplace(heap, s)
+
+        for doc in bonus:
+            offer(doc)
+        remaining = [0.0] * (len(terms) + 1)
+        for i in range(len(terms) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + terms[i][0]
+        for i, (_bound, _idf, plist) in enumerate(terms):
+            if len(heap) == k and remaining[i] * (1 + 1e-9) < heap[0]:
+                break  # a doc in none of terms[:i] scores at most remaining[i]
+            for doc in plist:
+                if doc not in out:
+                    offer(doc)
+        self.scored = len(out)
+        bar = heap[0] if len(heap) == k else 0.0
+        return {doc: s for doc, s in out.items() if s > 0 and s >= bar}
+
+    def _plan(self, query: str):
+        """(terms as (bound, idf, postings) by decreasing bound, the docs owed the
+        substring bonus, the doc -> score function) for `query`."""
+        n = len(self.docs)
+        if not n:
+            return [], [], lambda doc: 0.0
+        qn = _norm(query)
+        avgdl = self.total_len / n or 1.0
+        terms = []
+        for term in dict.fromkeys(qn.split()):
+            plist = self.postings.get(term)
+            if plist:
+                idf, mtf = self._idf(plist), self.max_tf[term]
+                bound = idf * mtf * (K1 + 1) / (mtf + K1 * (1 - B + B * self.min_len / avgdl))
+                terms.append((bound, idf, plist))
+        terms.sort(key=lambda t: -t[0])
+        bonus = list(self._contained(qn))
+        bonus_set = set(bonus)
+
+        def score(doc) -> float:
+            s = 0.0
+            dl = self.lens[doc]
+            for _bound, idf, plist in terms:
+                tf = plist.get(doc)
+                if tf:
+                    s += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * dl / avgdl))
+            return s + SUBSTRING_BONUS if doc in bonus_set else s
+
+        return terms, bonus, score
+
+    def _idf(self, plist: dict) -> float:
+        n = len(self.docs)
+        return math.log(1.0 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+
+    def _contained(self, qn: str):
+        """Docs whose normalized primary field contains, or is contained in, the query."""
+        if not qn.strip():
+            return
+        for doc, (primary, _tf) in self.docs.items():
+            if primary and (primary in qn or qn in primary):
+                yield doc
+
+    def _state(self) -> dict:
+        return {"v": VERSION, "key": self.key, "fields": self.fields, "docs": self.docs}
+
+    @classmethod
+    def _from_state(cls, d: dict) -> "Index":
+        idx = cls(d["fields"], d["key"])
+        for doc, (primary, tf) in d["docs"].items():
+            idx._put(doc, primary, tf)
+        return idx
+
+
+def _load(p: Path, key: str, fields: list[str]) -> tuple[Index, dict] | None:
+    try:
+        d = json.loads(index_path(p).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(d, dict) or d.get("v") != VERSION or d.get("key") != key \
+            or d.get("fields") != list(fields) or not isinstance(d.get("docs"), dict):
+        return None
+    return Index._from_state(d), d
+
+
+def _save(p: Path, idx: Index, inode: int, size: int, mtime_ns: int) -> None:
+    """Best effort: an unwritable index only costs the next reader a rebuild."""
+    import tempfile
+    try:
+        fd, tmp = tempfile.mkstemp(dir=str(p.parent), prefix=".tmp-", suffix=".bm25")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(dict(idx._state(), inode=inode, size=size, mtime_ns=mtime_ns), f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, index_path(p))
+    except OSError:
+        pass
+
+
+def _scan(p: Path, idx: Index, start: int) -> tuple[int, os.stat_result]:
+    """Fold complete lines from `start` into `idx`; return the offset after the
+    last one and the file's stat there. A torn final line is left for later."""
+    pos = start
+    with open(p, "rb") as f:
+        f.seek(start)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            pos += len(raw)
+            try:
+                rec = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(rec, dict) and isinstance(rec.get(idx.key), str):  # a sorted store's header has none
+                idx.add(rec[idx.key], rec)
+        return pos, os.fstat(f.fileno())
+
+
+def fresh(p: Path, key: str, fields: list[str]) -> Index:
+    """The index for store `p`, caught up with it (and persisted if it moved)."""
+    try:
+        st = os.stat(p)
+    except FileNotFoundError:
+        return Index(fields, key)
+    loaded = _load(p, key, fields)
+    start = 0
+    if loaded is not None and loaded[1].get("inode") == st.st_ino:
+        idx, d = loaded
+        covered = d.get("size", -1)
+        if covered == st.st_size and d.get("mtime_ns") == st.st_mtime_ns:
+            return idx
+        if isinstance(covered, int) and covered < st.st_size:
+            start = covered
+    if not start:
+        idx = Index(fields, key)
+    size, after = _scan(p, idx, start)
+    if after.st_ino != st.st_ino and start:  # compacted between our stat and open
+        idx = Index(fields, key)
+        size, after = _scan(p, idx, 0)
+    _save(p, idx, after.st_ino, size, after.st_mtime_ns)
+    return idx
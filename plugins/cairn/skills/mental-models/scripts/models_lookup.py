@@ -3,23 +3,24 @@
 
   models_lookup.py --smell "this is slow, 150k allocations"
   models_lookup.py --all
+  models_lookup.py --smell "slow render" --max-tokens 150   # every reframe first, detail after
 """
 from __future__ import annotations
 import argparse
 from pathlib import Path
 import store
+import outmeter
 
 
-def _fmt(rec: dict) -> str:
-    out = [f"## smell: {rec.get('smell','?')}",
-           f"- **reframe:** {rec.get('reframe','')}"]
+def _fmt(rec: dict, out: outmeter.Meter) -> None:
+    out.add(f"## smell: {rec.get('smell','?')}\n- **reframe:** {rec.get('reframe','')}", 1)
     if rec.get("solution_classes"):
-        out.append("- **opens classes:** " + "; ".join(rec["solution_classes"]))
+        out.add("- **opens classes:** " + "; ".join(rec["solution_classes"]), 2)
     if rec.get("example"):
-        out.append(f"- _example:_ {rec['example']}")
+        out.add(f"- _example:_ {rec['example']}", 3)
     if rec.get("taught_by_gap"):
-        out.append(f"- _learned from gap:_ {rec['taught_by_gap']}")
-    return "\n".join(out)
+        out.add(f"- _learned from gap:_ {rec['taught_by_gap']}", 3)
+    out.add("", 1)
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -33,6 +34,7 @@ def main(argv: list[str] | None = None) -> int:
     ap.add_argument("--max-age-days", type=int, default=365)
     ap.add_argument("--review", default=None,
                     help="Restamp a model (by smell) as re-confirmed today.")
+    outmeter.add_argument(ap)
     args = ap.parse_args(argv)
     repo = Path(args.repo).resolve()
 
@@ -76,19 +78,23 @@ def main(argv: list[str] | None = None) -> int:
         if not recs:
             print("no mental models yet — record one with models_record.py when a gap teaches it.")
             return 0
-        print(f"Mental-model shelf ({len(recs)}):")
+        out = outmeter.Meter(args.max_tokens)
+        out.add(f"Mental-model shelf ({len(recs)}):")
         for r in recs:
-            print(f"  [{r.get('smell','?')}] -> {r.get('reframe','')}")
+            out.add(f"  [{r.get('smell','?')}] -> {r.get('reframe','')}", 1)
+        out.emit()
         return 0
 
-    hits = store.search(repo, args.store, args.smell)
+    hits = store.search(repo, args.store, args.smell, k=4)
     if not hits:
         print(f"no model matches smell '{args.smell}'. If a gap reveals one, record it "
               f"(models_record.py) so next time it's a known question.")
         return 1
-    print(f"Reframings for '{args.smell}':\n")
-    for r in hits[:4]:
-        print(_fmt(r)); print()
+    out = outmeter.Meter(args.max_tokens)
+    out.add(f"Reframings for '{args.smell}':\n")
+    for r in hits:
+        _fmt(r, out)
+    out.emit()
     return 0
 
 
@@ -2,6 +2,7 @@
 """Learn a mental model from a gap.
 
   models_record.py --smell "150k allocations per frame" --from-json model.json
+  models_record.py --smell "..." --from-json - < model.json     # read it from stdin
 
 model.json:
 {
@@ -13,7 +14,7 @@ model.json:
 smell + confirmed_on are set from the flags/date.
 """
 from __future__ import annotations
-import argparse, datetime as dt, json, sys
+import argparse, json, sys
 from pathlib import Path
 import store
 
@@ -32,19 +33,24 @@ def validate_model(model: dict) -> list[str]:
     return errors
 
 
-def main(argv: list[str] | None = None) -> int:
+def main(argv: list[str] | None = None, model: dict | None = None) -> int:
+    """`model` given (an in-process caller, lib/dispatch.py) replaces --from-json."""
     ap = argparse.ArgumentParser(description="Record a mental model learned from a gap.")
     ap.add_argument("--repo", default=".")
     ap.add_argument("--store", default=None)
     ap.add_argument("--smell", required=True)
-    ap.add_argument("--from-json", required=True)
+    ap.add_argument("--from-json", required=model is None, help="model file, or - for stdin")
     args = ap.parse_args(argv)
     repo = Path(args.repo).resolve()
-    try:
-        model = json.loads(Path(args.from_json).read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError) as e:
-        print(f"error: cannot read model json {args.from_json}: {e}", file=sys.stderr)
-        return 2
+    if model is not None:
+        model = dict(model)
+    else:
+        try:
+            text = sys.stdin.read() if args.from_json == "-" else Path(args.from_json).read_text(encoding="utf-8")
+            model = json.loads(text)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"error: cannot read model json {args.from_json}: {e}", file=sys.stderr)
+            return 2
     if not isinstance(model, dict):
         print("error: model json must be an object.", file=sys.stderr)
         return 2
@@ -56,6 +62,7 @@ def main(argv: list[str] | None = None) -> int:
     if not model.get("taught_by_gap"):
         print("WARNING: no taught_by_gap recorded. A mental model's authority IS the measured "
               "gap; recording one without it is unsourced assertion, not learning.", file=sys.stderr)
+    import datetime as dt
     model["confirmed_on"] = dt.date.today().isoformat()
     store.upsert(repo, args.store, model)
     print(f"recorded model for smell '{args.smell}' "
@@ -14,51 +14,155 @@ swapped. Until then, the matcher stands. Building the seam costs nothing and
 commits to nothing; building the engine must be earned.
 
 Contract:
-    rank(query, records, fields) -> list[(score, record)] sorted desc, score > 0
+    rank(query, records, fields, k=None) -> list[(score, record)] sorted desc, score > 0
+With k, only the best k come back: the same k as the head of the full ranking.
 A record is a dict; fields names which keys to search. Backend is selected by the
-CAIRN_RETRIEVAL env var ('matcher' default; 'qmd' reserved for the earned swap).
+CAIRN_RETRIEVAL env var ('matcher' default; 'bm25' an inverted index scored with
+BM25, see bm25.py; 'qmd' BM25 fused with hashed character-trigram vectors, see
+vectors.py — local, offline, NumPy used when installed). A caller that keeps a
+persisted bm25.Index / vectors.Vectors for its store passes them as `index=` /
+`dense=`, and the matcher a tokencache.fresh() list as `tokens=`; without them
+the records are indexed or tokenized in memory for the call.
 """
 from __future__ import annotations
+import heapq
 import os
 
 
+class _NormTable(dict):
+    """ord -> replacement for str.translate: letters and digits lowercased,
+    whitespace kept, anything else a space. Filled per code point on first sight,
+    so the whole of Unicode costs only what the stores actually contain."""
+
+    def __missing__(self, o: int) -> str:
+        c = chr(o)
+        v = self[o] = c.lower() if c.isalnum() or c.isspace() else " "
+        return v
+
+
+_NORM = _NormTable()
+
+
 def _norm(s: str) -> str:
-    return "".join(c.lower() if c.isalnum() or c.isspace() else " " for c in str(s))
+    return str(s).translate(_NORM)
+
+
+def _text(rec: dict, fields: list[str]) -> str:
+    return " ".join(str(rec.get(f, "")) for f in fields)
+
+
+def _digest(text: str) -> str:
+    import hashlib
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+
+
+def prepare(rec: dict, fields: list[str]) -> tuple[str, str]:
+    """What the matcher needs of a record: (normalized primary field, its distinct
+    tokens as ' a b c ', so a token test is one substring search). Persisted per
+    store by tokencache.py, so a query normalizes only itself."""
+    toks = dict.fromkeys(_norm(_text(rec, fields)).split())
+    primary = _norm(str(rec.get(fields[0], ""))) if fields else ""
+    return primary, f" {' '.join(toks)} "
+
+
+def _top(scored, k: int | None) -> list[tuple[float, dict]]:
+    """(score, record) pairs best first, stable on ties; only the best k kept
+    (a k-bounded heap, so a store's worth of hits is never sorted) when k is set."""
+    if k is None:
+        return sorted(scored, key=lambda x: x[0], reverse=True)
+    return heapq.nlargest(k, scored, key=lambda x: x[0])
 
 
-def _match_rank(query: str, records: list[dict], fields: list[str]) -> list[tuple[float, dict]]:
+def _match_rank(query: str, records: list[dict], fields: list[str],
+                tokens: list[tuple[str, str]] | None = None, k: int | None = None) -> list[tuple[float, dict]]:
     """Dependency-free backend: weighted token overlap + substring containment.
     Correct for sparse stores; this is the matcher hardened across the adversarial
-    passes (substring catches distinctive short smells like 'O(n^2)')."""
+    passes (substring catches distinctive short smells like 'O(n^2)'). `tokens`,
+    prepare() of each record, is computed here when the caller has no cache."""
     qn = _norm(query)
-    q_long = {w for w in qn.split() if len(w) > 2}
-    q_all = {w for w in qn.split() if w}
-    scored: list[tuple[float, dict]] = []
-    for rec in records:
-        hay = _norm(" ".join(str(rec.get(f, "")) for f in fields))
-        toks = {w for w in hay.split() if w}
-        score = len(q_long & {w for w in toks if len(w) > 2}) * 2.0
-        # substring containment in either direction (the key per-field smell)
-        primary = _norm(str(rec.get(fields[0], ""))) if fields else ""
-        if primary and (primary in qn or qn in primary):
-            score += 3.0
-        score += len(q_all & toks)  # short-token overlap, low weight
-        if score > 0:
-            scored.append((score, rec))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return scored
-
-
-def _qmd_rank(query: str, records: list[dict], fields: list[str]) -> list[tuple[float, dict]]:
-    """Reserved earned-swap backend. Intentionally not implemented at birth: a
-    semantic engine is promote-on-evidence (see module docstring). When the ratchet
-    earns it, this is where a local hybrid retriever is wired — same contract, so no
-    skill changes. Until then we fail SAFE back to the matcher rather than pretend."""
-    return _match_rank(query, records, fields)
-
-
-def rank(query: str, records: list[dict], fields: list[str]) -> list[tuple[float, dict]]:
-    backend = os.environ.get("CAIRN_RETRIEVAL", "matcher")
-    if backend == "qmd":
-        return _qmd_rank(query, records, fields)
-    return _match_rank(query, records, fields)
+    # a long token counts 2 (long overlap) + 1 (any overlap); a short one 1
+    weights = [(f" {w} ", 3.0 if len(w) > 2 else 1.0) for w in dict.fromkeys(qn.split())]
+    if tokens is None:
+        tokens = [prepare(rec, fields) for rec in records]
+
+    def scored():
+        for rec, (primary, toks) in zip(records, tokens):
+            score = 0.0
+            for w, weight in weights:
+                if w in toks:
+                    score += weight
+            # substring containment in either direction (the key per-field smell)
+            if primary and (primary in qn or qn in primary):
+                score += 3.0
+            if score > 0:
+                yield score, rec
+    return _top(scored(), k)
+
+
+RRF_K = 60       # reciprocal-rank fusion constant (the usual 60)
+MIN_SIM = 0.35   # a dense-only candidate must share this much of its trigrams
+
+
+def _qmd_rank(query: str, records: list[dict], fields: list[str], index=None,
+              dense=None, k: int | None = None) -> list[tuple[float, dict]]:
+    """The earned-swap backend, local and offline: BM25 candidates (bm25.py) fused
+    by reciprocal rank with hashed character-trigram cosine (vectors.py), so a
+    lesson recorded as 're-render storm' is recalled by 'rerendering'. A dense-only
+    candidate needs MIN_SIM; below it trigram overlap is noise. Scores are
+    sum(1 / (RRF_K + rank)) over the two rankings, so both are taken whole; k only
+    bounds the fused result. A store passes its persisted index and vector cache;
+    without them both are built in memory for the call."""
+    import vectors
+    lexical = _bm25_rank(query, records, fields, index)
+    if dense is None:
+        dense = vectors.Vectors.build(records, fields)
+    pos = None if dense.key is None else {rec.get(dense.key): i for i, rec in enumerate(records)}
+    sims = sorted((-s, doc if pos is None else pos[doc]) for s, doc in dense.similarities(query)
+                  if pos is None or doc in pos)
+    ident = {id(rec): i for i, rec in enumerate(records)}
+    fused: dict[int, float] = {}
+    for rank_, (_score, rec) in enumerate(lexical):
+        fused[ident[id(rec)]] = 1.0 / (RRF_K + rank_ + 1)
+    for rank_, (neg, i) in enumerate(sims):
+        if -neg >= MIN_SIM or i in fused:
+            fused[i] = fused.get(i, 0.0) + 1.0 / (RRF_K + rank_ + 1)
+    hits = [(-score, i) for i, score in fused.items()]
+    hits = sorted(hits) if k is None else heapq.nsmallest(k, hits)
+    return [(-neg, records[i]) for neg, i in hits]
+
+
+def _bm25_rank(query: str, records: list[dict], fields: list[str], index=None,
+               k: int | None = None) -> list[tuple[float, dict]]:
+    """Okapi BM25 over an inverted index (bm25.py) plus the matcher's substring
+    bonus. With a store's persisted index only the query's postings are scored;
+    its docs are store keys, mapped back onto `records`. Ties keep record order.
+    With k, Index.top() prunes (MaxScore) and a k-bounded heap picks the hits."""
+    import bm25
+    if index is None:
+        index = bm25.Index(fields)
+        for i, rec in enumerate(records):
+            index.add(i, rec)
+        pos = {i: i for i in range(len(records))}
+    else:
+        pos = {rec.get(index.key): i for i, rec in enumerate(records)}
+    scores = index.scores(query) if k is None else index.top(query, k)
+    hits = [(-score, pos[doc]) for doc, score in scores.items() if doc in pos]
+    hits = sorted(hits) if k is None else heapq.nsmallest(k, hits)
+    return [(-neg, records[i]) for neg, i in hits]
+
+
+BACKENDS = ("matcher", "bm25", "qmd")  # bench/retrieval_eval.py runs each
+
+
+def backend() -> str:
+    return os.environ.get("CAIRN_RETRIEVAL", "matcher")
+
+
+def rank(query: str, records: list[dict], fields: list[str], index=None,
+         dense=None, tokens=None, k: int | None = None) -> list[tuple[float, dict]]:
+    name = backend()
+    if name == "bm25":
+        return _bm25_rank(query, records, fields, index, k)
+    if name == "qmd":
+        return _qmd_rank(query, records, fields, index, dense, k)
+    return _match_rank(query, records, fields, tokens, k)
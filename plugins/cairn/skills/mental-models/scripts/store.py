@@ -1,97 +1,74 @@
 #!/usr/bin/env python3
 """Storage port for mental-models. The ONLY module that touches the store.
 
-JSONL, one reframing model per line, keyed by `smell`. Reads stream the file.
+JSONL, one reframing model per line, keyed by `smell`. Log-structured
+(lib/logstore.py): an upsert appends and the newest line per smell wins.
 Mirrors library-knowledge/specialist-knowledge ports; swapping the backend
 changes only this module.
 """
 from __future__ import annotations
-import json
+import sys
 from pathlib import Path
-from typing import Iterator
+
+_HERE = Path(__file__).resolve().parent
+for _lib in (_HERE.parent.parent.parent / "lib", _HERE.parent / "_lib"):
+    if (_lib / "logstore.py").is_file():
+        if str(_lib) not in sys.path:
+            sys.path.insert(0, str(_lib))
+        break
+import logstore
 
 JSONL_NAME = "mental-models.jsonl"
+KEY = "smell"
+FIELDS = ["smell", "reframe"]  # what retrieval searches
 
 
 def jsonl_path(repo: Path, store: str | None) -> Path:
     return Path(store) if store else repo / JSONL_NAME
 
 
-def _records(repo: Path, store: str | None) -> Iterator[dict]:
-    p = jsonl_path(repo, store)
-    if not p.exists():
-        return
-    with p.open(encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rec = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if isinstance(rec, dict):
-                yield rec
-
-
 def read_all(repo: Path, store: str | None) -> list[dict]:
-    return list(_records(repo, store))
+    return logstore.read_all(jsonl_path(repo, store), KEY)
 
 
-def search(repo: Path, store: str | None, smell: str) -> list[dict]:
+def search(repo: Path, store: str | None, smell: str, k: int | None = None) -> list[dict]:
     """Recall models by the smell, via the retrieval PORT (seam for a future
-    semantic backend). Returns records ranked by relevance, best first."""
-    import retrieval
-    records = list(_records(repo, store))
-    ranked = retrieval.rank(smell, records, ["smell", "reframe"])
-    return [rec for _score, rec in ranked]
-
-
-def _locked(p, fn):
-    """Hold an exclusive advisory lock across the WHOLE read-modify-write, so two
-    concurrent upserts cannot both read stale state and have the last write drop a
-    concurrent insert. The read must be inside the lock, not just the write."""
-    import os, time
-    lock = p.with_suffix(p.suffix + ".lock")
-    p.parent.mkdir(parents=True, exist_ok=True)
-    acquired = False
-    for _ in range(500):
-        try:
-            os.close(os.open(str(lock), os.O_CREAT | os.O_EXCL | os.O_WRONLY)); acquired = True; break
-        except FileExistsError:
-            try:
-                if time.time() - os.path.getmtime(lock) > 10:
-                    os.unlink(lock); continue
-            except OSError:
-                pass
-            time.sleep(0.01)
-    if not acquired:
-        raise TimeoutError(f"timed out waiting for lock {lock}")
+    semantic backend). Returns records ranked by relevance, best first; with k,
+    only the best k (the index-backed backends then stop scoring early). The
+    matcher reads each record's tokens from the store's token cache; under
+    CAIRN_RETRIEVAL=bm25 the store's persisted inverted index is used; under qmd,
+    that index and the store's trigram-vector cache."""
+    import os, retrieval, tracing
+    p, backend = jsonl_path(repo, store), retrieval.backend()
     try:
-        return fn()
-    finally:
-        if acquired:
-            try: os.unlink(lock)
-            except OSError: pass
-
-
-def _atomic_write_lines(p, lines):
-    """Temp-file + rename so a crash or concurrent read never sees a half-written store."""
-    import os, tempfile
-    fd, tmp = tempfile.mkstemp(dir=str(p.parent), prefix=".tmp-", suffix=".jsonl")
-    with os.fdopen(fd, "w", encoding="utf-8") as f:
-        f.write("".join(line + "\n" for line in lines)); f.flush(); os.fsync(f.fileno())
-    os.replace(tmp, p)
+        st = os.stat(p)  # before the read: see tokencache.fresh / vectors.fresh
+    except FileNotFoundError:
+        st = None
+    records = read_all(repo, store)
+    with tracing.span("retrieval.rank", "retrieval", records=len(records), backend=backend, k=k) as s:
+        index = dense = tokens = None
+        if backend in ("bm25", "qmd"):
+            import bm25
+            index = bm25.fresh(p, KEY, FIELDS)
+        if backend == "qmd":
+            import vectors
+            dense = vectors.fresh(p, KEY, FIELDS, records, st)
+        elif backend != "bm25":
+            import tokencache
+            tokens = tokencache.fresh(p, FIELDS, records, st)
+        ranked = retrieval.rank(smell, records, FIELDS, index=index, dense=dense, tokens=tokens, k=k)
+        s.set(hits=len(ranked), scored=index.scored if backend == "bm25" and k is not None else None)
+    return [rec for _score, rec in ranked]
 
 
 def upsert(repo: Path, store: str | None, model: dict) -> None:
-    p = jsonl_path(repo, store)
-    def _rmw():
-        existing = {r.get("smell"): r for r in _records(repo, store)}
-        existing[model["smell"]] = model
-        _atomic_write_lines(p, [json.dumps(rec, ensure_ascii=False) for rec in existing.values()])
-    _locked(p, _rmw)
+    """Append the model as the newest version of its smell. The lock spans the
+    append (and any compaction it triggers), so concurrent upserts never drop an
+    insert."""
+    logstore.upsert(jsonl_path(repo, store), KEY, model)
 
 
-def _norm(s: str) -> str:
-    return "".join(c.lower() if c.isalnum() or c.isspace() else " " for c in s)
+def batch(repo: Path, store: str | None):
+    """`with batch(repo, store) as tx:` — tx.upsert / tx.update / tx.read_one under
+    one lock, committed as one atomic append."""
+    return logstore.batch(jsonl_path(repo, store), KEY)
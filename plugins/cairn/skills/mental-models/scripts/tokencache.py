@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Per-record token cache for the matcher: `<store>.tok`.
+
+The matcher used to normalize and tokenize every record on every query — at
+100k models, seconds of per-character Python before the first comparison. This
+keeps retrieval.prepare() of each live record (its normalized primary field and
+its distinct tokens) beside the store, so a query normalizes only itself.
+
+Layout: one JSON header line (fields, the store stat it covers, the row count),
+then per record, in read_all order, `digest NUL primary NUL tokens NUL`.
+Normalized text never holds a NUL (it is neither alphanumeric nor whitespace,
+so _norm maps it to a space), and one str.split loads the whole file.
+
+While the store keeps the header's stat the rows are used as is. Otherwise each
+live record's text is digested and a row is recomputed only when its digest is
+new: an append or a compaction re-tokenizes just the changed records.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from retrieval import _digest, _text, prepare
+
+VERSION = 1
+
+
+def cache_path(p: Path) -> Path:
+    return p.with_suffix(p.suffix + ".tok")
+
+
+def _load(p: Path, fields: list[str]) -> tuple[dict, list[str]] | None:
+    try:
+        raw = cache_path(p).read_bytes()
+        head, _, body = raw.partition(b"\n")
+        d = json.loads(head)
+        cells = body.decode("utf-8", "surrogatepass").split("\0")
+    except (OSError, ValueError):
+        return None
+    if not isinstance(d, dict) or d.get("v") != VERSION or d.get("fields") != list(fields) \
+            or len(cells) != 3 * d.get("n", -1) + 1:
+        return None
+    return d, cells
+
+
+def _save(p: Path, fields: list[str], st: os.stat_result, digests: list[str],
+          rows: list[tuple[str, str]]) -> None:
+    """Best effort: an unwritable cache only costs the next query a tokenize."""
+    import tempfile
+    head = {"v": VERSION, "fields": list(fields), "inode": st.st_ino, "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns, "n": len(rows)}
+    body = "".join(f"{h}\0{primary}\0{toks}\0" for h, (primary, toks) in zip(digests, rows))
+    try:
+        fd, tmp = tempfile.mkstemp(dir=str(p.parent), prefix=".tmp-", suffix=".tok")
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps(head, separators=(",", ":")).encode("utf-8") + b"\n")
+            f.write(body.encode("utf-8", "surrogatepass"))
+        os.replace(tmp, cache_path(p))
+    except OSError:
+        pass
+
+
+def fresh(p: Path, fields: list[str], records: list[dict],
+          st: os.stat_result | None) -> list[tuple[str, str]]:
+    """prepare() of each of `records` — the live records of store `p`, in read_all
+    order, read after `st` was taken (a write in between only makes the cache
+    look stale) — from the cache where it still holds."""
+    if st is None:
+        return [prepare(rec, fields) for rec in records]
+    loaded = _load(p, fields)
+    if loaded is not None:
+        d, cells = loaded
+        if (d.get("inode"), d.get("size"), d.get("mtime_ns"), d.get("n")) == \
+                (st.st_ino, st.st_size, st.st_mtime_ns, len(records)):
+            return list(zip(cells[1::3], cells[2::3]))
+        old = {h: (primary, toks) for h, primary, toks in zip(cells[0::3], cells[1::3], cells[2::3])}
+    else:
+        old = {}
+    digests, rows = [], []
+    for rec in records:
+        h = _digest(_text(rec, fields) + "\0" + str(rec.get(fields[0], "")))
+        row = old.get(h)
+        digests.append(h)
+        rows.append(row if row is not None else prepare(rec, fields))
+    _save(p, fields, st, digests, rows)
+    return rows
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Dense side of the qmd hybrid retriever: hashed character-trigram vectors.
+
+Each record's searched fields are normalized, cut into character trigrams, and
+the trigrams hashed (crc32) into DIM buckets; the counts, L2-normalized, are its
+vector. Cosine similarity between a query and a model then rewards shared word
+pieces, so 're-render' meets 'rerender' and 'allocations' meets 'allocating'
+where exact tokens would not. No model weights, no network: CPU only.
+
+`<store>.vec` caches them: one JSON header line (dim, fields, the store stat it
+covers, and per row the store key and a digest of the text it was built from),
+then the rows as raw float32. When the store moves, the live records are
+re-hashed and only a row whose text digest changed is recomputed. With NumPy
+installed the rows are scored as one matrix-vector product; without it, the
+same cosine is computed over the query's few non-zero buckets.
+"""
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from array import array
+from pathlib import Path
+
+from retrieval import _digest, _norm, _text
+
+VERSION = 1
+DIM = 512
+GRAM = 3
+
+try:
+    import numpy as _np
+except ImportError:  # optional: the stdlib path scores the same cosine
+    _np = None
+
+
+def cache_path(p: Path) -> Path:
+    return p.with_suffix(p.suffix + ".vec")
+
+
+def vector(text: str) -> dict[int, float]:
+    """bucket -> weight, L2-normalized; {} for text with no trigram."""
+    counts: dict[int, float] = {}
+    for word in _norm(text).split():
+        padded = f" {word} "
+        for i in range(max(1, len(padded) - GRAM + 1)):
+            b = zlib.crc32(padded[i:i + GRAM].encode("utf-8")) % DIM
+            counts[b] = counts.get(b, 0.0) + 1.0
+    norm = sum(v * v for v in counts.values()) ** 0.5
+    return {b: v / norm for b, v in counts.items()} if norm else {}
+
+
+def _row(vec: dict[int, float]) -> array:
+    row = array("f", bytes(4 * DIM))
+    for b, v in vec.items():
+        row[b] = v
+    return row
+
+
+class Vectors:
+    """The rows for a set of docs: doc ids (values of `key`, or list positions when
+    key is None) and a flat float32 array, DIM per row."""
+
+    def __init__(self, docs: list, digests: list[str], rows: array, key: str | None = None):
+        self.docs, self.digests, self.rows, self.key = docs, digests, rows, key
+
+    @classmethod
+    def build(cls, records: list[dict], fields: list[str]) -> "Vectors":
+        rows = array("f")
+        for rec in records:
+            rows.extend(_row(vector(_text(rec, fields))))
+        return cls(list(range(len(records))), [""] * len(records), rows)
+
+    def similarities(self, query: str) -> list[tuple[float, object]]:
+        """(cosine, doc) for every doc with a non-zero similarity."""
+        q = vector(query)
+        if not q or not self.docs:
+            return []
+        if _np is not None:
+            m = _np.frombuffer(self.rows, dtype=_np.float32).reshape(len(self.docs), DIM)
+            qv = _np.zeros(DIM, dtype=_np.float32)
+            for b, v in q.items():
+                qv[b] = v
+            sims = m @ qv
+            return [(float(sims[i]), self.docs[i]) for i in _np.flatnonzero(sims > 0)]
+        rows, out = self.rows, []
+        items = list(q.items())
+        for i, doc in enumerate(self.docs):
+            base = i * DIM
+            s = sum(rows[base + b] * v for b, v in items)
+            if s > 0:
+                out.append((s, doc))
+        return out
+
+
+def _load(p: Path, key: str, fields: list[str]) -> tuple[dict, Vectors] | None:
+    try:
+        raw = cache_path(p).read_bytes()
+        head, _, body = raw.partition(b"\n")
+        d = json.loads(head)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(d, dict) or d.get("v") != VERSION or d.get("dim") != DIM or d.get("key") != key \
+            or d.get("fields") != list(fields) or not isinstance(d.get("rows"), list) \
+            or len(body) != 4 * DIM * len(d["rows"]):
+        return None
+    rows = array("f")
+    rows.frombytes(body)
+    return d, Vectors([k for k, _ in d["rows"]], [h for _, h in d["rows"]], rows, d.get("key"))
+
+
+def _save(p: Path, vecs: Vectors, fields: list[str], st: os.stat_result) -> None:
+    """Best effort: an unwritable cache only costs the next reader a recompute."""
+    import tempfile
+    head = {"v": VERSION, "dim": DIM, "key": vecs.key, "fields": list(fields), "inode": st.st_ino,
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "rows": [[k, h] for k, h in zip(vecs.docs, vecs.digests)]}
+    try:
+        fd, tmp = tempfile.mkstemp(dir=str(p.parent), prefix=".tmp-", suffix=".vec")
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps(head, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+            f.write(vecs.rows.tobytes())
+        os.replace(tmp, cache_path(p))
+    except OSError:
+        pass
+
+
+def fresh(p: Path, key: str, fields: list[str], records: list[dict], st: os.stat_result | None) -> Vectors:
+    """Vectors for `records`, the live records of store `p` read after `st` was
+    taken (so a write in between only makes the cache look stale), keyed by `key`.
+    While the store keeps the stat the cache was written at, the cache is used as
+    is; otherwise every record's text is digested and only changed rows rebuilt."""
+    if st is None:
+        return Vectors([], [], array("f"), key)
+    loaded = _load(p, key, fields)
+    if loaded is not None:
+        d, vecs = loaded
+        if (d.get("inode"), d.get("size"), d.get("mtime_ns")) == (st.st_ino, st.st_size, st.st_mtime_ns):
+            return vecs
+        old = {doc: (h, i) for i, (doc, h) in enumerate(zip(vecs.docs, vecs.digests))}
+    else:
+        vecs, old = None, {}
+    docs, digests, rows = [], [], array("f")
+    for rec in records:
+        k = rec.get(key)
+        if not isinstance(k, str):
+            continue
+        h = _digest(_text(rec, fields))
+        prev = old.get(k)
+        if prev is not None and prev[0] == h:
+            i = prev[1]
+            rows.extend(vecs.rows[i * DIM:(i + 1) * DIM])
+        else:
+            rows.extend(_row(vector(_text(rec, fields))))
+        docs.append(k)
+        digests.append(h)
+    out = Vectors(docs, digests, rows, key)
+    _save(p, out, fields, st)
+    return out
@@ -3,61 +3,55 @@
 
   specialist_lookup.py --domain ios-native-design     # one profile, for build/0.5
   specialist_lookup.py --index                         # what's on the craft shelf
+  specialist_lookup.py --domain ios-native-design --max-tokens 300
 
 Returns the load-bearing principles + anti-patterns + checklist for a domain, so
 the agent applies confirmed craft instead of emitting generic advice from memory.
-Missing/stale -> distill via specialist_refresh.py first.
+Missing/stale -> distill via specialist_refresh.py first. Under --max-tokens the
+header and any refresh warning stay; taste, then anti-patterns, then the
+checklist's tail go first (lib/outmeter.py).
 """
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 
 import store
+import outmeter
 
 LIBK_JSONL = "lib-knowledge.jsonl"
 
 
 def _libk_versions(repo: Path) -> dict[str, str]:
+    """confirmed_version per library, read through the shared log engine: newest
+    line per name, and parsed once per process (lib/storecache.py)."""
     p = repo / LIBK_JSONL
-    out: dict[str, str] = {}
-    if not p.exists():
-        return out
-    with p.open(encoding="utf-8") as f:
-        for line in f:
-            try:
-                rec = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if isinstance(rec, dict) and rec.get("name") and rec.get("confirmed_version"):
-                out[rec["name"]] = str(rec["confirmed_version"])
-    return out
+    return {r["name"]: str(r["confirmed_version"])
+            for r in store.logstore.read_all(p, "name")
+            if isinstance(r.get("name"), str) and r.get("confirmed_version")}
 
 
-def _fmt(profile: dict, lib_versions: dict[str, str] | None = None) -> str:
-    out = [f"# Specialist profile: {profile['domain']}",
-           f"_confirmed {profile.get('confirmed_on', '?')}_  ·  "
-           f"pinned: {', '.join(f'{k}@{v}' for k, v in profile.get('pinned_libs', {}).items()) or 'none'}",
-           ""]
-    if profile.get("principles"):
-        out.append("## Principles (load-bearing)")
-        out += [f"- {p}" for p in profile["principles"]]
-        out.append("")
-    if profile.get("anti_patterns"):
-        out.append("## Anti-patterns (what a master avoids)")
-        out += [f"- {a}" for a in profile["anti_patterns"]]
-        out.append("")
-    if profile.get("checklist"):
-        out.append("## Checklist (apply at STAGE 0.5 / build)")
-        out += [f"- [ ] {c}" for c in profile["checklist"]]
-        out.append("")
-    if profile.get("taste_deltas"):
-        out.append("## Taste (user-adjudicated)")
-        out += [f"- {t}" for t in profile["taste_deltas"]]
-        out.append("")
+def _fmt(profile: dict, lib_versions: dict[str, str] | None = None,
+         max_tokens: int | None = None) -> str:
+    meter = outmeter.Meter(max_tokens)
+    meter.add(f"# Specialist profile: {profile['domain']}\n"
+              f"_confirmed {profile.get('confirmed_on', '?')}_  ·  "
+              f"pinned: {', '.join(f'{k}@{v}' for k, v in profile.get('pinned_libs', {}).items()) or 'none'}\n")
+    # a heading travels with its first item, so no kept section is headless
+    for field, heading, bullet, prio in (
+            ("principles", "## Principles (load-bearing)", "- ", 1),
+            ("anti_patterns", "## Anti-patterns (what a master avoids)", "- ", 3),
+            ("checklist", "## Checklist (apply at STAGE 0.5 / build)", "- [ ] ", 2),
+            ("taste_deltas", "## Taste (user-adjudicated)", "- ", 4)):
+        items = profile.get(field)
+        if items:
+            meter.add(f"{heading}\n{bullet}{items[0]}", prio)
+            for item in items[1:]:
+                meter.add(f"{bullet}{item}", prio)
+            meter.add("", prio)
     if profile.get("authorities"):
-        out.append("_authorities: " + "; ".join(profile["authorities"]) + "_")
+        meter.add("_authorities: " + "; ".join(profile["authorities"]) + "_", 5)
+    out = []
     if lib_versions is not None:
         stale = []
         unknown = []
@@ -72,7 +66,9 @@ def _fmt(profile: dict, lib_versions: dict[str, str] | None = None) -> str:
             out.append("## Refresh needed")
             out += [f"- stale: {s}" for s in stale]
             out += [f"- unverifiable pin: {u}" for u in unknown]
-    return "\n".join(out)
+    if out:
+        meter.add("\n".join(out))  # a stale pin is the verdict: never dropped
+    return meter.render()
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -81,6 +77,7 @@ def main(argv: list[str] | None = None) -> int:
     ap.add_argument("--store", default=None)
     ap.add_argument("--domain", default=None)
     ap.add_argument("--index", action="store_true")
+    outmeter.add_argument(ap)
     args = ap.parse_args(argv)
     repo = Path(args.repo).resolve()
 
@@ -89,10 +86,12 @@ def main(argv: list[str] | None = None) -> int:
         if not idx:
             print("no specialist profiles yet — distill one with specialist_refresh.py")
             return 0
-        print("Craft shelf:")
+        out = outmeter.Meter(args.max_tokens)
+        out.add("Craft shelf:")
         for e in sorted(idx, key=lambda x: x["domain"]):
             pins = ", ".join(f"{k}@{v}" for k, v in e["pinned_libs"].items()) or "—"
-            print(f"  {e['domain']:<34} confirmed {e['confirmed_on']:<12} pinned: {pins}")
+            out.add(f"  {e['domain']:<34} confirmed {e['confirmed_on']:<12} pinned: {pins}", 1)
+        out.emit()
         return 0
 
     profile = store.read_one(repo, args.store, args.domain)
@@ -100,7 +99,7 @@ def main(argv: list[str] | None = None) -> int:
         print(f"no profile for '{args.domain}' — distill it (see references/distilling.md), "
               f"then record with specialist_refresh.py --set {args.domain} --from-json <file>")
         return 1
-    print(_fmt(profile, _libk_versions(repo)))
+    print(_fmt(profile, _libk_versions(repo), args.max_tokens))
     return 0
 
 
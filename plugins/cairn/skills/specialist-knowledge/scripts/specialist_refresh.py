@@ -24,7 +24,6 @@ confirmed_on is stamped automatically.
 from __future__ import annotations
 
 import argparse
-import datetime as dt
 import json
 import sys
 from pathlib import Path
@@ -84,6 +83,7 @@ def do_set(repo: Path, store_path: str | None, domain: str, from_json: str) -> i
         print("error: invalid profile json: " + "; ".join(errors), file=sys.stderr)
         return 2
     profile["domain"] = domain
+    import datetime as dt
     profile["confirmed_on"] = dt.date.today().isoformat()
     store.upsert(repo, store_path, profile)
     pins = ", ".join(f"{k}@{v}" for k, v in profile.get("pinned_libs", {}).items()) or "none"
@@ -5,7 +5,7 @@ Three pointed at Cairn's own hand-work.
   motion_observe.py --motion "hand-check effects didn't leak into the core" --steps 6 [--repo .]
 """
 from __future__ import annotations
-import argparse, hashlib, sys
+import argparse, sys
 from pathlib import Path
 import store
 
@@ -16,6 +16,7 @@ def main(argv=None):
     ap.add_argument("--motion", required=True)
     ap.add_argument("--steps", type=int, default=0, help="rough manual cost (steps/min) of one occurrence")
     args = ap.parse_args(argv)
+    import hashlib
     repo = Path(args.repo).resolve()
     key = "motion:" + hashlib.sha1(args.motion.lower().encode()).hexdigest()[:8]
     def inc(existing):
@@ -1,82 +1,44 @@
 #!/usr/bin/env python3
 """Workshop catalogue (JSONL): tools indexed by the motion they replace, plus motion
-tallies (how many times a hand-motion has recurred, for the Rule of Three)."""
+tallies (how many times a hand-motion has recurred, for the Rule of Three).
+Log-structured (lib/logstore.py): the newest line per key wins."""
 from __future__ import annotations
-import json
+import sys
 from pathlib import Path
-from typing import Iterator
+
+_HERE = Path(__file__).resolve().parent
+for _lib in (_HERE.parent.parent.parent / "lib", _HERE.parent / "_lib"):
+    if (_lib / "logstore.py").is_file():
+        if str(_lib) not in sys.path: sys.path.insert(0, str(_lib))
+        break
+import logstore
 
 JSONL_NAME = "workshop.jsonl"
+KEY = "key"
 
 
 def jsonl_path(repo: Path, store: str | None) -> Path:
     return Path(store) if store else repo / JSONL_NAME
 
 
-def _records(repo: Path, store: str | None) -> Iterator[dict]:
-    p = jsonl_path(repo, store)
-    if not p.exists(): return
-    with p.open(encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                try: rec = json.loads(line)
-                except json.JSONDecodeError: pass
-                else:
-                    if isinstance(rec, dict):
-                        yield rec
-
+def read_all(repo, store): return logstore.read_all(jsonl_path(repo, store), KEY)
+def read_one(repo, store, key): return logstore.read_one(jsonl_path(repo, store), KEY, key)
 
-def read_all(repo, store): return list(_records(repo, store))
-def read_one(repo, store, key):
-    for r in _records(repo, store):
-        if r.get("key") == key: return r
-    return None
 
-
-def _locked(p, fn):
-    import os, time
-    lock = p.with_suffix(p.suffix + ".lock"); p.parent.mkdir(parents=True, exist_ok=True)
-    acquired = False
-    for _ in range(500):
-        try: os.close(os.open(str(lock), os.O_CREAT | os.O_EXCL | os.O_WRONLY)); acquired = True; break
-        except FileExistsError:
-            try:
-                if time.time() - os.path.getmtime(lock) > 10: os.unlink(lock); continue
-            except OSError: pass
-            time.sleep(0.01)
-    if not acquired:
-        raise TimeoutError(f"timed out waiting for lock {lock}")
-    try: return fn()
-    finally:
-        if acquired:
-            try: os.unlink(lock)
-            except OSError: pass
+def upsert(repo: Path, store: str | None, rec: dict) -> None:
+    logstore.upsert(jsonl_path(repo, store), KEY, rec)
 
 
-def _atomic_write_lines(p, lines):
-    import os, tempfile
-    fd, tmp = tempfile.mkstemp(dir=str(p.parent), prefix=".tmp-", suffix=".jsonl")
-    with os.fdopen(fd, "w", encoding="utf-8") as f:
-        f.write("".join(l + "\n" for l in lines)); f.flush(); os.fsync(f.fileno())
-    os.replace(tmp, p)
+def update(repo: Path, store: str | None, key: str, updater) -> dict:
+    return logstore.update(jsonl_path(repo, store), KEY, key, updater)
 
 
-def upsert(repo: Path, store: str | None, rec: dict) -> None:
-    p = jsonl_path(repo, store)
-    def _rmw():
-        ex = {r.get("key"): r for r in _records(repo, store)}
-        ex[rec["key"]] = rec
-        _atomic_write_lines(p, [json.dumps(r, ensure_ascii=False) for r in ex.values()])
-    _locked(p, _rmw)
+def batch(repo: Path, store: str | None):
+    """`with batch(repo, store) as tx:` — tx.upsert / tx.update / tx.read_one under
+    one lock, committed as one atomic append."""
+    return logstore.batch(jsonl_path(repo, store), KEY)
 
 
-def update(repo: Path, store: str | None, key: str, updater) -> dict:
-    p = jsonl_path(repo, store)
-    def _rmw():
-        ex = {r.get("key"): r for r in _records(repo, store)}
-        rec = updater(ex.get(key))
-        ex[key] = rec
-        _atomic_write_lines(p, [json.dumps(r, ensure_ascii=False) for r in ex.values()])
-        return rec
-    return _locked(p, _rmw)
+def stats(repo: Path, store: str | None) -> dict:
+    """Store shape + Bloom filter false-positive estimate, for --stats."""
+    return logstore.stats(jsonl_path(repo, store), KEY)
@@ -5,9 +5,10 @@ flag tools that never reached payback as candidates to RETIRE.
   tool_check.py --motion "hand-check effects leaked into core" [--repo .]   # find tool
   tool_check.py --used .cairn/tools/check_core_purity.py [--repo .]          # record a reuse
   tool_check.py --audit [--repo .]                                          # list debt tools
+  tool_check.py --stats [--repo .]                                          # store + Bloom filter stats
 """
 from __future__ import annotations
-import argparse, hashlib
+import argparse
 from pathlib import Path
 import store
 
@@ -18,9 +19,14 @@ def main(argv=None):
     ap.add_argument("--motion", default=None)
     ap.add_argument("--used", default=None)
     ap.add_argument("--audit", action="store_true")
+    ap.add_argument("--stats", action="store_true")
     args = ap.parse_args(argv)
     repo = Path(args.repo).resolve()
 
+    if args.stats:
+        import json
+        print(json.dumps(store.stats(repo, args.store), indent=2)); return 0
+
     if args.used:
         rec = store.read_one(repo, args.store, "tool:" + args.used)
         if not rec:
@@ -50,6 +56,7 @@ def main(argv=None):
         return 0
 
     if args.motion:
+        import hashlib
         key = "motion:" + hashlib.sha1(args.motion.lower().encode()).hexdigest()[:8]
         m = store.read_one(repo, args.store, key)
         if m and m.get("tool"):
@@ -37,22 +37,24 @@ def main(argv=None):
               file=sys.stderr)
         return 2
 
-    motion = store.read_one(repo, args.store, args.motion_key)
-    if not motion:
-        print(f"no motion '{args.motion_key}'. Log it first with motion_observe.py.", file=sys.stderr)
-        return 2
-    if motion.get("count", 0) < 3:
-        print(f"motion only seen {motion.get('count',0)}x — not ripe (Rule of Three). "
-              f"Two might be coincidence; build on the third.", file=sys.stderr)
-        return 2
+    # one lock, one append: the motion's tool pointer and the tool record land together
+    with store.batch(repo, args.store) as tx:
+        motion = tx.read_one(args.motion_key)
+        if not motion:
+            print(f"no motion '{args.motion_key}'. Log it first with motion_observe.py.", file=sys.stderr)
+            return 2
+        if motion.get("count", 0) < 3:
+            print(f"motion only seen {motion.get('count',0)}x — not ripe (Rule of Three). "
+                  f"Two might be coincidence; build on the third.", file=sys.stderr)
+            return 2
 
-    n = motion.get("steps", 0)
-    payback = (args.build_steps / n) if n else None
-    motion["tool"] = args.path
-    store.upsert(repo, args.store, motion)
-    store.upsert(repo, args.store, {"key": "tool:" + args.path, "kind": "tool",
-        "path": args.path, "motion": motion["motion"], "build_steps": args.build_steps,
-        "manual_steps": n, "uses": 0, "note": args.note})
+        n = motion.get("steps", 0)
+        payback = (args.build_steps / n) if n else None
+        motion["tool"] = args.path
+        tx.upsert(motion)
+        tx.upsert({"key": "tool:" + args.path, "kind": "tool",
+            "path": args.path, "motion": motion["motion"], "build_steps": args.build_steps,
+            "manual_steps": n, "uses": 0, "note": args.note})
     msg = f"tool registered: {args.path} (replaces '{motion['motion']}')."
     if payback: msg += f" pays back after ~{payback:.1f} reuses."
     print(msg)
@@ -4,6 +4,7 @@ from __future__ import annotations
 import hashlib
 import importlib.util
 import json
+import os
 import subprocess
 import sys
 import tempfile
@@ -19,14 +20,26 @@ def script(rel: str) -> str:
     return str(CAIRN / rel)
 
 
+def load_module(name: str, path: Path):
+    if str(path.parent) not in sys.path:
+        sys.path.insert(0, str(path.parent))  # lib modules import their siblings
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module  # so sibling imports share this module's state
+    spec.loader.exec_module(module)
+    return module
+
+
 class CairnScriptBehaviorTests(unittest.TestCase):
-    def run_script(self, rel: str, *args: str, cwd: Path | None = None) -> subprocess.CompletedProcess[str]:
+    def run_script(self, rel: str, *args: str, cwd: Path | None = None,
+                   env: dict[str, str] | None = None) -> subprocess.CompletedProcess[str]:
         return subprocess.run(
             [sys.executable, script(rel), *args],
             cwd=str(cwd or ROOT),
             text=True,
             capture_output=True,
             timeout=20,
+            env={**os.environ, **env} if env else None,
         )
 
     def test_skeleton_generates_python_feature_skeleton(self) -> None:
@@ -102,6 +115,49 @@ class CairnScriptBehaviorTests(unittest.TestCase):
             self.assertIn("no mental models yet", proc.stdout)
             self.assertNotIn("Traceback", proc.stderr + proc.stdout)
 
+    def test_library_knowledge_migrates_to_sqlite_and_ranks_search(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            rows = [
+                {"name": "zod", "confirmed_version": "3", "capability": "runtime schema validation",
+                 "key_facts": ["parse, don't validate"]},
+                {"name": "nativewind", "confirmed_version": "4", "capability": "tailwind styling",
+                 "key_facts": ["needs babel preset"]},
+            ]
+            (repo / "lib-knowledge.jsonl").write_text(
+                "".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+            sqlite = {"CAIRN_STORE": "sqlite"}
+
+            migrate = self.run_script("skills/library-knowledge/scripts/lib_migrate.py", "--repo", str(repo))
+            self.assertEqual(migrate.returncode, 0, migrate.stderr + migrate.stdout)
+            self.assertIn("migrated 2 libraries", migrate.stdout)
+            self.assertTrue((repo / "lib-knowledge.db").exists())
+
+            search = self.run_script("skills/library-knowledge/scripts/lib_lookup.py",
+                                     "--repo", str(repo), "--search", "valid", "--json", env=sqlite)
+            self.assertEqual(search.returncode, 0, search.stderr + search.stdout)
+            self.assertEqual([h["name"] for h in json.loads(search.stdout)], ["zod"])
+
+            entry = repo / "entry.json"
+            entry.write_text(json.dumps({"confirmed_version": "5", "capability": "styling"}), encoding="utf-8")
+            refresh = self.run_script("skills/library-knowledge/scripts/lib_refresh.py", "--repo", str(repo),
+                                      "--set", "nativewind", "--from-json", str(entry), env=sqlite)
+            self.assertEqual(refresh.returncode, 0, refresh.stderr + refresh.stdout)
+            lookup = self.run_script("skills/library-knowledge/scripts/lib_lookup.py",
+                                     "nativewind", "--repo", str(repo), "--json", env=sqlite)
+            self.assertEqual(json.loads(lookup.stdout)["confirmed_version"], "5")
+            # the JSONL was not written: the db is now the store
+            self.assertNotIn('"5"', (repo / "lib-knowledge.jsonl").read_text(encoding="utf-8"))
+
+            # a second (or racing) migration finds the db in place under the lock and
+            # discards its own copy instead of replacing the db with the stale JSONL
+            again = self.run_script("skills/library-knowledge/scripts/lib_migrate.py", "--repo", str(repo))
+            self.assertEqual(again.returncode, 0, again.stderr + again.stdout)
+            lookup = self.run_script("skills/library-knowledge/scripts/lib_lookup.py",
+                                     "nativewind", "--repo", str(repo), "--json", env=sqlite)
+            self.assertEqual(json.loads(lookup.stdout)["confirmed_version"], "5")
+            self.assertEqual(list(repo.glob(".tmp-*")), [])
+
     def test_capability_floor_ratio_must_be_positive(self) -> None:
         with tempfile.TemporaryDirectory() as td:
             repo = Path(td)
@@ -132,6 +188,69 @@ class CairnScriptBehaviorTests(unittest.TestCase):
             self.assertIn("REFUSED", proc.stdout)
             self.assertIn("circuit incomplete", proc.stdout)
 
+    def test_close_loop_dispatches_in_process_with_the_same_result_as_children(self) -> None:
+        outputs = {}
+        for mode in ("inprocess", "subprocess"):
+            with tempfile.TemporaryDirectory() as td:
+                repo = Path(td)
+                (repo / "bench.json").write_text("{}", encoding="utf-8")
+                (repo / "gap.json").write_text(json.dumps(
+                    {"reframe": "profile first", "solution_classes": ["arena"], "taught_by_gap": "75x gap"}),
+                    encoding="utf-8")
+                proc = self.run_script(
+                    "skills/capability-ledger/scripts/close_loop.py", "--repo", str(repo),
+                    "--class", "render-perf", "--domain", "renderer", "--floor-ratio", "1.5",
+                    "--benchmark", "bench.json", "--gap-smell", "allocs per frame", "--gap-json", str(repo / "gap.json"),
+                    env={"CAIRN_DISPATCH": mode},
+                )
+                self.assertEqual(proc.returncode, 0, proc.stderr + proc.stdout)
+                models = [json.loads(line) for line in (repo / "mental-models.jsonl").read_text(encoding="utf-8").splitlines()]
+                self.assertEqual(models[-1]["smell"], "allocs per frame")
+
+                predict = self.run_script("skills/inquiry/scripts/predict.py", "--repo", str(repo),
+                                          "--claim", "parsing lives in the handler", "--confidence", "0.9")
+                observe = self.run_script("skills/inquiry/scripts/observe.py", "--repo", str(repo),
+                                          "--id", predict.stdout.split()[1], "--outcome", "wrong",
+                                          "--reframe", "check the call graph", env={"CAIRN_DISPATCH": mode})
+                self.assertEqual(observe.returncode, 0, observe.stderr + observe.stdout)
+                self.assertIn("taught mental-models", observe.stdout)
+                self.assertIn("check the call graph", (repo / "mental-models.jsonl").read_text(encoding="utf-8"))
+                outputs[mode] = proc.stdout.replace(td, "<repo>")
+        self.assertEqual(outputs["inprocess"], outputs["subprocess"])
+
+    def test_cairn_trace_writes_one_chrome_timeline_for_a_loop_and_orient(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            trace = repo / "trace.json"
+            (repo / "bench.json").write_text("{}", encoding="utf-8")
+            env = {"CAIRN_TRACE": str(trace), "CAIRN_STORE_SOCKET": "off"}
+            proc = self.run_script(
+                "skills/capability-ledger/scripts/close_loop.py", "--repo", str(repo),
+                "--class", "render-perf", "--domain", "renderer", "--floor-ratio", "1.5",
+                "--benchmark", "bench.json", "--gap-smell", "allocs per frame", env=env,
+            )
+            self.assertEqual(proc.returncode, 0, proc.stderr + proc.stdout)
+            orient = self.run_script("skills/entity-boot/scripts/orient.py", "--repo", str(repo), env=env)
+            self.assertEqual(orient.returncode, 0, orient.stderr)
+            lookup = self.run_script("skills/capability-ledger/scripts/cap_check.py", "--repo", str(repo),
+                                     "--index", env=env)
+            self.assertEqual(lookup.returncode, 0, lookup.stderr)
+
+            body = trace.read_text(encoding="utf-8")
+            self.assertTrue(body.startswith("[\n"))
+            events = json.loads(body.rstrip().rstrip(",") + "]")
+            names = {e["name"] for e in events}
+            for name in ("run", "lock.wait", "lock.hold", "store.read", "store.parse", "store.append", "dispatch",
+                         "digest.fresh", "digest.scan"):
+                self.assertIn(name, names)
+            pids = {e["pid"] for e in events if e["ph"] == "X"}
+            self.assertEqual(len(pids), 3)  # close_loop (with its dispatches in-process), orient, the lookup
+            self.assertTrue(all(e["dur"] >= 0 and "ts" in e for e in events if e["ph"] == "X"))
+
+            quiet = self.run_script("skills/entity-boot/scripts/orient.py", "--repo", str(repo))
+            self.assertEqual(quiet.returncode, 0, quiet.stderr)
+            self.assertEqual(trace.read_text(encoding="utf-8"), body)
+
     def test_ratchet_refuses_unripe_abstraction_promotion(self) -> None:
         with tempfile.TemporaryDirectory() as td:
             repo = Path(td)
@@ -198,6 +317,24 @@ class CairnScriptBehaviorTests(unittest.TestCase):
             self.assertEqual(proc.returncode, 0, proc.stderr + proc.stdout)
             self.assertTrue((repo / ".harness" / "sample-skill" / "sample.py").exists())
 
+    def test_mirrored_store_resolves_shared_lib(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            init = self.run_script(
+                "skills/harness-setup/scripts/config_init.py",
+                "--repo", str(repo), "--skills-root", str(CAIRN / "skills"),
+            )
+            self.assertEqual(init.returncode, 0, init.stderr + init.stdout)
+            self.assertTrue((repo / ".harness" / "_lib" / "logstore.py").exists())
+
+            proc = subprocess.run(
+                [sys.executable, str(repo / ".harness" / "toolsmith" / "motion_observe.py"),
+                 "--repo", str(repo), "--motion", "manual scan"],
+                text=True, capture_output=True, timeout=20,
+            )
+            self.assertEqual(proc.returncode, 0, proc.stderr + proc.stdout)
+            self.assertIn("x1", proc.stdout)
+
     def test_capability_demotion_must_be_reearned_after_miss(self) -> None:
         spec = importlib.util.spec_from_file_location(
             "maturity", CAIRN / "skills" / "capability-ledger" / "scripts" / "maturity.py",
@@ -219,6 +356,746 @@ class CairnScriptBehaviorTests(unittest.TestCase):
 
         self.assertEqual(maturity.effective_maturity(entry), "practiced")
 
+    def test_log_store_appends_versions_and_compacts_dead_lines(self) -> None:
+        logstore = load_module("logstore", CAIRN / "lib" / "logstore.py")
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "workshop.jsonl"
+            for n in range(1, 201):
+                logstore.upsert(p, "key", {"key": "motion:a", "count": n})
+            logstore.upsert(p, "key", {"key": "motion:b", "count": 1})
+
+            self.assertEqual(logstore.read_one(p, "key", "motion:a")["count"], 200)
+            self.assertEqual([r["key"] for r in logstore.read_all(p, "key")], ["motion:a", "motion:b"])
+            lines = p.read_text(encoding="utf-8").splitlines()
+            self.assertLess(len(lines), 201)  # superseded versions were compacted away
+
+            with p.open("a", encoding="utf-8") as f:
+                f.write('{"key": "motion:c", "cou')  # a torn append from a crashed writer
+            logstore.upsert(p, "key", {"key": "motion:d", "count": 1})
+            self.assertIsNone(logstore.read_one(p, "key", "motion:c"))
+            self.assertEqual(logstore.read_one(p, "key", "motion:d")["count"], 1)
+
+    def test_key_index_seeks_hits_answers_misses_and_catches_up(self) -> None:
+        logstore = load_module("logstore", CAIRN / "lib" / "logstore.py")
+        keyindex = load_module("keyindex", CAIRN / "lib" / "keyindex.py")
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "capability-ledger.jsonl"
+            for cls in ("render-perf", "parser", "io"):
+                logstore.upsert(p, "problem_class", {"problem_class": cls, "maturity": "novice"})
+
+            self.assertEqual(logstore.read_one(p, "problem_class", "parser")["problem_class"], "parser")
+            self.assertTrue(keyindex.index_path(p).exists())
+            self.assertIsNone(logstore.read_one(p, "problem_class", "never-seen"))
+
+            logstore.upsert(p, "problem_class", {"problem_class": "parser", "maturity": "practiced"})
+            self.assertEqual(logstore.read_one(p, "problem_class", "parser")["maturity"], "practiced")
+
+            with p.open("a", encoding="utf-8") as f:  # an append the index has not seen
+                f.write(json.dumps({"problem_class": "late", "maturity": "proven"}) + "\n")
+            self.assertEqual(logstore.read_one(p, "problem_class", "late")["maturity"], "proven")
+
+            logstore.compact(p, "problem_class")  # new inode: the index must rebuild
+            self.assertEqual(logstore.read_one(p, "problem_class", "parser")["maturity"], "practiced")
+            self.assertEqual(logstore.read_one(p, "problem_class", "io")["maturity"], "novice")
+
+    def test_bloom_filter_answers_misses_and_reports_false_positive_rate(self) -> None:
+        bloom = load_module("bloom", CAIRN / "lib" / "bloom.py")
+        logstore = load_module("logstore", CAIRN / "lib" / "logstore.py")
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            p = repo / "capability-ledger.jsonl"
+            with logstore.batch(p, "problem_class") as tx:
+                for i in range(500):
+                    tx.upsert({"problem_class": f"class-{i}", "maturity": "novice"})
+
+            self.assertTrue(all(bloom.may_contain(p, "problem_class", f"class-{i}") for i in range(500)))
+            false_pos = sum(bloom.may_contain(p, "problem_class", f"unseen-{i}") for i in range(2000))
+            self.assertLess(false_pos, 60)
+            self.assertIsNone(logstore.read_one(p, "problem_class", "unseen-x"))
+
+            logstore.upsert(p, "problem_class", {"problem_class": "late", "maturity": "novice"})
+            self.assertTrue(bloom.may_contain(p, "problem_class", "late"))  # appended tail caught up
+
+            proc = self.run_script("skills/capability-ledger/scripts/cap_check.py", "--repo", str(repo), "--stats")
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            body = json.loads(proc.stdout)
+            self.assertEqual(body["live"], 501)
+            self.assertLess(body["bloom"]["est_false_positive_rate"], 0.03)
+
+    def test_store_cache_reuses_parse_until_the_file_or_this_process_writes(self) -> None:
+        logstore = load_module("logstore", CAIRN / "lib" / "logstore.py")
+        storecache = load_module("storecache", CAIRN / "lib" / "storecache.py")
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "workshop.jsonl"
+            logstore.upsert(p, "key", {"key": "tool:a", "uses": 0})
+            first = logstore.read_all(p, "key")
+            self.assertIsNotNone(storecache.peek(p, "key"))
+            first[0]["uses"] = 99  # callers get copies; the cache is not corrupted
+            self.assertEqual(logstore.read_one(p, "key", "tool:a")["uses"], 0)
+
+            logstore.upsert(p, "key", {"key": "tool:a", "uses": 1})  # own write: invalidated
+            self.assertIsNone(storecache.peek(p, "key"))
+            self.assertEqual(logstore.read_all(p, "key")[0]["uses"], 1)
+
+            with p.open("a", encoding="utf-8") as f:  # another writer: the identity moved
+                f.write(json.dumps({"key": "tool:b", "uses": 0}) + "\n")
+            self.assertEqual(len(logstore.read_all(p, "key")), 2)
+
+            for i in range(storecache.MAX_STORES + 2):  # bounded: LRU by store
+                other = Path(td) / f"s{i}.jsonl"
+                logstore.upsert(other, "key", {"key": "k"})
+                logstore.read_all(other, "key")
+            self.assertLessEqual(len(storecache._lru), storecache.MAX_STORES)
+            self.assertIsNone(storecache.peek(p, "key"))
+
+    def test_store_daemon_serves_reads_follows_writers_and_falls_back_when_gone(self) -> None:
+        import signal, time
+        logstore = load_module("logstore", CAIRN / "lib" / "logstore.py")
+        storecache = load_module("storecache", CAIRN / "lib" / "storecache.py")
+        storedaemon = load_module("storedaemon", CAIRN / "lib" / "storedaemon.py")
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            p = repo / "inquiry.jsonl"
+            logstore.upsert(p, "id", {"id": "a", "n": 0})
+            daemon = subprocess.Popen([sys.executable, script("lib/storedaemon.py"), "--repo", str(repo)],
+                                      stdout=subprocess.PIPE, text=True)
+            try:
+                self.assertIn("serving", daemon.stdout.readline())
+                self.assertEqual(storedaemon.call(p, "ping"), {"stores": 0})
+                self.assertEqual(logstore.read_one(p, "id", "a")["n"], 0)
+                self.assertEqual(storedaemon.call(p, "ping"), {"stores": 1})  # answered by the daemon
+
+                with p.open("a", encoding="utf-8") as f:  # another writer appends: the tail is caught up
+                    f.write(json.dumps({"id": "b", "n": 0}) + "\n")
+                self.assertEqual(storedaemon.call(p, "read_one", key="id", value="b"), {"id": "b", "n": 0})
+                logstore.update(p, "id", "a", lambda r: {**r, "n": r["n"] + 1})  # no self-deadlock
+                logstore.compact(p, "id")
+                storecache._lru.clear()
+                self.assertEqual(sorted((r["id"], r["n"]) for r in logstore.read_all(p, "id")),
+                                 [("a", 1), ("b", 0)])
+                self.assertIs(storedaemon.call(Path("/etc/passwd"), "read_all", key="id"),
+                              storedaemon.UNAVAILABLE)
+                self.assertEqual(oct((repo / storedaemon.SOCKET_NAME).stat().st_mode & 0o777), "0o600")
+            finally:
+                daemon.send_signal(signal.SIGKILL)  # dies without removing its socket
+                daemon.wait(timeout=10)
+                daemon.stdout.close()
+            self.assertTrue((repo / storedaemon.SOCKET_NAME).exists())
+            storecache._lru.clear()
+            t0 = time.monotonic()
+            self.assertIs(storedaemon.call(p, "ping"), storedaemon.UNAVAILABLE)
+            self.assertEqual(logstore.read_one(p, "id", "b"), {"id": "b", "n": 0})  # direct file access
+            self.assertLess(time.monotonic() - t0, 1.0)
+
+    def test_store_daemon_answers_are_built_while_the_view_cannot_change(self) -> None:
+        logstore = load_module("logstore", CAIRN / "lib" / "logstore.py")
+        storedaemon = load_module("storedaemon", CAIRN / "lib" / "storedaemon.py")
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            p = repo / "inquiry.jsonl"
+            logstore.write_all(p, [{"id": "a"}])
+            stores = storedaemon.Stores(repo)
+            lock = stores._lock(str(p))
+            # another thread's catch-up folds a tail into the same dict under this
+            # lock, so the response is built before it is released
+            for _ in range(2):  # a cold load, then a served-from-memory hit
+                self.assertTrue(stores.view(p, "id", lambda live: lock.locked()))
+            with p.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"id": "b"}) + "\n")
+            self.assertEqual(stores.view(p, "id", lambda live: (lock.locked(), sorted(live))), (True, ["a", "b"]))
+            self.assertEqual(len(stores.handle({"op": "read_all", "path": str(p), "key": "id"})), 2)
+            self.assertFalse(lock.locked())
+
+    def test_sorted_store_is_bisected_and_unmarked_store_falls_back(self) -> None:
+        logstore = load_module("logstore", CAIRN / "lib" / "logstore.py")
+        keyindex = load_module("keyindex", CAIRN / "lib" / "keyindex.py")
+        sortedlog = load_module("sortedlog", CAIRN / "lib" / "sortedlog.py")
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "lib-knowledge.jsonl"
+            names = [f"lib-{i:03d}" for i in range(0, 300, 3)]
+            for n in reversed(names):
+                logstore.upsert(p, "name", {"confirmed_version": "1", "name": n}, order="name")
+            logstore.compact(p, "name", order="name")
+            self.assertTrue(p.read_text(encoding="utf-8").startswith('{"_logstore"'))
+            self.assertEqual([r["name"] for r in logstore.read_all(p, "name")], names)
+
+            for n in names:
+                self.assertEqual(logstore.read_one(p, "name", n)["name"], n)
+            for miss in ("lib-001", "a", "zzz", "lib-298"):
+                self.assertIsNone(logstore.read_one(p, "name", miss))
+            self.assertFalse(keyindex.index_path(p).exists())  # answered without a sidecar
+
+            logstore.upsert(p, "name", {"name": "lib-150", "confirmed_version": "2"}, order="name")
+            self.assertEqual(logstore.read_one(p, "name", "lib-150")["confirmed_version"], "2")
+            self.assertFalse(keyindex.index_path(p).exists())
+
+            legacy = Path(td) / "unsorted.jsonl"  # no header: do not trust the order
+            legacy.write_text("".join(json.dumps({"name": n}) + "\n" for n in ("b", "a", "c")), encoding="utf-8")
+            self.assertIs(sortedlog.read_one(legacy, "name", "a"), sortedlog.UNSORTED)
+            self.assertEqual(logstore.read_one(legacy, "name", "a"), {"name": "a"})
+
+    def test_store_batch_commits_together_or_not_at_all(self) -> None:
+        logstore = load_module("logstore", CAIRN / "lib" / "logstore.py")
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            p = repo / "workshop.jsonl"
+            logstore.upsert(p, "key", {"key": "motion:ab", "motion": "grep core", "count": 3, "steps": 4})
+            before = p.read_bytes()
+
+            with self.assertRaises(RuntimeError):
+                with logstore.batch(p, "key") as tx:
+                    tx.upsert({"key": "tool:x", "kind": "tool"})
+                    raise RuntimeError("abandon")
+            self.assertEqual(p.read_bytes(), before)
+
+            proc = self.run_script(
+                "skills/toolsmith/scripts/tool_forge.py",
+                "--repo", str(repo), "--motion-key", "motion:ab",
+                "--path", ".cairn/tools/grep_core.py", "--build-steps", "8",
+            )
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            lines = p.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 3)  # one append carried both records
+            recs = {r["key"]: r for r in logstore.read_all(p, "key")}
+            self.assertEqual(recs["motion:ab"]["tool"], ".cairn/tools/grep_core.py")
+            self.assertEqual(recs["tool:.cairn/tools/grep_core.py"]["manual_steps"], 4)
+
+            # a writer that died mid-batch: the journal rolls the partial append back
+            size = p.stat().st_size
+            with p.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": "half", "kind": "tool"}) + "\n" + '{"key": "ha')
+            logstore._journal_path(p).write_text(json.dumps({"from": size, "to": size + 500}), encoding="utf-8")
+            self.assertNotIn("half", {r["key"] for r in logstore.read_all(p, "key")})
+            self.assertEqual(p.stat().st_size, size)
+            self.assertFalse(logstore._journal_path(p).exists())
+
+    def test_store_bench_emits_json_for_every_store_and_the_rewrite_baseline(self) -> None:
+        for engine in ("port", "rewrite"):
+            with self.subTest(engine=engine):
+                proc = self.run_script("bench/store_bench.py", "--sizes", "40", "--repeat", "1",
+                                       "--engine", engine, "--quiet")
+                self.assertEqual(proc.returncode, 0, proc.stderr)
+                report = json.loads(proc.stdout)
+                self.assertEqual(report["meta"]["engine"], engine)
+                rows = {(r["store"], r["op"]) for r in report["results"]}
+                self.assertEqual({s for s, _ in rows}, {"capability-ledger", "inquiry-log", "lib-knowledge",
+                                                        "mental-models", "specialist-profiles", "workshop"})
+                self.assertIn(("inquiry-log", "update"), rows)
+                if engine == "port":
+                    self.assertIn(("mental-models", "rank"), rows)
+                    self.assertIn(("lib-knowledge", "search"), rows)
+
+    def test_cairn_zipapp_runs_every_command_like_its_script(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            repo, pyz = Path(td) / "repo", Path(td) / "cairn.pyz"
+            repo.mkdir()
+            env = {"CAIRN_CACHE": str(Path(td) / "cache")}
+            build = self.run_script("lib/cairnzip.py", "--out", str(pyz))
+            self.assertEqual(build.returncode, 0, build.stderr)
+
+            def cairn(*args):
+                return subprocess.run([sys.executable, str(pyz), *args], text=True, capture_output=True,
+                                      timeout=20, env={**os.environ, **env})
+            rec = cairn("cap", "record", "--repo", str(repo), "--class", "render-perf", "--floor-ratio", "1.2",
+                        "--benchmark", "bench.json", "--domain", "renderer")
+            self.assertEqual(rec.returncode, 0, rec.stderr)
+            direct = self.run_script("skills/capability-ledger/scripts/cap_check.py",
+                                     "--repo", str(repo), "--class", "render-perf")
+            for argv in (("cap", "check"), ("capability-ledger", "check")):
+                proc = cairn(*argv, "--repo", str(repo), "--class", "render-perf")
+                self.assertEqual((proc.returncode, proc.stdout), (direct.returncode, direct.stdout), proc.stderr)
+            self.assertIn("usage: cairn models lookup", cairn("models", "lookup", "--help").stdout)
+            self.assertEqual(cairn("cap", "nope").returncode, 2)
+            self.assertIn("close-loop", cairn("--help").stdout)
+            src = self.run_script("lib/cli.py", "cap", "check", "--repo", str(repo), "--class", "render-perf")
+            self.assertEqual(src.stdout, direct.stdout)  # the plugin tree runs the same table
+
+        bench = self.run_script("bench/startup_bench.py", "--runs", "1")
+        report = json.loads(bench.stdout)
+        self.assertEqual(len(report["commands"]), 7)
+        self.assertTrue(all(r["script_ms"] > 0 and r["pyz_ms"] > 0 for r in report["commands"]))
+
+    def test_import_budget_defers_heavy_modules_and_flags_overruns(self) -> None:
+        proc = self.run_script("bench/import_budget.py", "--only", "inquiry", "--runs", "1")
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        report = json.loads(proc.stdout)
+        self.assertEqual({r["script"] for r in report["scripts"]},
+                         {"inquiry/calibration.py", "inquiry/observe.py", "inquiry/predict.py"})
+        self.assertIn("datetime", report["deferred"])
+        self.assertFalse(any(r["eager_deferred"] for r in report["scripts"]))
+
+        with tempfile.TemporaryDirectory() as td:
+            cfg = Path(td) / "budget.json"
+            cfg.write_text(json.dumps({"budget_ms": 0.001, "deferred": ["argparse"]}), encoding="utf-8")
+            proc = self.run_script("bench/import_budget.py", "--only", "inquiry", "--runs", "1",
+                                   "--config", str(cfg))
+            self.assertEqual(proc.returncode, 1)
+            self.assertIn("OVER BUDGET: inquiry/predict.py", proc.stderr)
+            self.assertIn("EAGER: inquiry/predict.py imports argparse", proc.stderr)
+
+    def test_every_command_appends_metrics_and_cairn_metrics_reports_percentiles(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            (repo / "bench.json").write_text("{}", encoding="utf-8")
+            rec = self.run_script("skills/capability-ledger/scripts/cap_record.py", "--repo", str(repo),
+                                  "--class", "render-perf", "--floor-ratio", "1.2", "--benchmark", "bench.json")
+            self.assertEqual(rec.returncode, 0, rec.stderr)
+            for _ in range(3):
+                self.run_script("skills/capability-ledger/scripts/cap_check.py", "--repo", str(repo), "--class", "render-perf")
+            via_cli = self.run_script("lib/cli.py", "cap", "check", "--repo", str(repo), "--class", "render-perf")
+            self.run_script("skills/entity-boot/scripts/orient.py", "--repo", str(repo))
+            self.run_script("skills/capability-ledger/scripts/cap_check.py", "--repo", str(repo), "--class", "x",
+                            env={"CAIRN_METRICS": "off"})
+
+            lines = [json.loads(line) for line in (repo / ".cairn" / "metrics.jsonl").read_text(encoding="utf-8").splitlines()]
+            self.assertEqual([r["cmd"] for r in lines], ["capability-ledger/cap_record"]
+                             + ["capability-ledger/cap_check"] * 4 + ["entity-boot/orient"])
+            self.assertEqual(lines[-2]["out_bytes"], len(via_cli.stdout.encode("utf-8")))
+            self.assertGreater(lines[1]["stores"]["capability-ledger.jsonl"], 0)
+            self.assertTrue(all(r["ms"] > 0 for r in lines))
+
+            proc = self.run_script("lib/cli.py", "metrics", "--repo", str(repo), "--by", "all", "--json")
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            rows = {r["cmd"]: r for r in json.loads(proc.stdout)}
+            check = rows["capability-ledger/cap_check"]
+            self.assertEqual(check["n"], 4)
+            self.assertLessEqual(check["p50_ms"], check["p95_ms"])
+            self.assertLessEqual(check["p95_ms"], check["p99_ms"])
+            self.assertIn("p95", self.run_script("lib/cli.py", "metrics", "--repo", str(repo)).stdout)
+            self.assertEqual(len(lines), len((repo / ".cairn" / "metrics.jsonl").read_text(encoding="utf-8").splitlines()))
+
+        metrics = load_module("metrics", CAIRN / "lib" / "metrics.py")
+        self.assertEqual([metrics.percentile(list(range(1, 101)), q) for q in (50, 95, 99)], [50, 95, 99])
+
+    def test_orient_digest_folds_in_what_writers_appended_by_stat(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            (repo / "bench.json").write_text("{}", encoding="utf-8")
+            record = ("skills/capability-ledger/scripts/cap_record.py", "--repo", str(repo),
+                      "--floor-ratio", "1.2", "--benchmark", "bench.json")
+            self.run_script(*record, "--class", "render-perf")
+            first = self.run_script("skills/entity-boot/scripts/orient.py", "--repo", str(repo))
+            self.assertIn("novice / untested (full gates): render-perf", first.stdout)
+            digest = repo / ".cairn" / "orient-digest.json"
+            ledger = repo / "capability-ledger.jsonl"
+
+            # a writer leaves the digest alone (its append stays O(record)); the next
+            # orient sees the ledger's stat moved and folds in just the appended tail
+            before = digest.read_bytes()
+            self.run_script(*record, "--class", "api-latency", "--domain", "api")
+            self.assertEqual(digest.read_bytes(), before)
+            self.assertIn("render-perf, api-latency",
+                          self.run_script("skills/entity-boot/scripts/orient.py", "--repo", str(repo)).stdout)
+            body = json.loads(digest.read_text(encoding="utf-8"))
+            st = ledger.stat()
+            self.assertEqual(body["stat"]["capability-ledger.jsonl"], [st.st_ino, st.st_size, st.st_mtime_ns])
+            self.assertEqual(body["summary"]["novice"], ["render-perf", "api-latency"])
+
+            # a hand edit the writers never saw is caught by the stat check
+            with (repo / "mental-models.jsonl").open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"smell": "n+1 queries", "reframe": "batch"}) + "\n")
+            (repo / "ratchet.jsonl").write_text(json.dumps({"key": "k", "status": "open"}) + "\n", encoding="utf-8")
+            again = self.run_script("skills/entity-boot/scripts/orient.py", "--repo", str(repo))
+            self.assertIn("novice / untested (full gates): render-perf, api-latency", again.stdout)
+            self.assertIn("mental models: 1", again.stdout)
+            self.assertIn("open friction in the ratchet: 1", again.stdout)
+            self.assertEqual(json.loads(digest.read_text(encoding="utf-8"))["summary"]["models"], 1)
+
+            digest.unlink()  # a lost digest is rebuilt, with the same report
+            self.assertEqual(self.run_script("skills/entity-boot/scripts/orient.py", "--repo", str(repo)).stdout,
+                             again.stdout)
+
+    def test_orient_streams_stores_in_memory_bounded_by_live_keys_and_reads_ratchet_status(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            ratchet = [{"key": "a", "status": "open"}, {"key": "b", "status": "promoted",
+                                                        "friction": "not PROMOTED by the text, by the field"},
+                       {"key": "c", "status": "ripe", "friction": "PROMOTED appears in the text only"}]
+            (repo / "ratchet.jsonl").write_text("".join(json.dumps(r) + "\n" for r in ratchet), encoding="utf-8")
+            (repo / "mental-models.jsonl").write_text(json.dumps({"smell": "s", "reframe": "r"}) + "\n", encoding="utf-8")
+            streamed = self.run_script("skills/entity-boot/scripts/orient.py", "--repo", str(repo), "--no-digest")
+            self.assertIn("open friction in the ratchet: 2", streamed.stdout)
+            self.assertFalse((repo / ".cairn" / "orient-digest.json").exists())
+            self.assertEqual(self.run_script("skills/entity-boot/scripts/orient.py", "--repo", str(repo)).stdout,
+                             streamed.stdout)
+
+        import tracemalloc
+        digest = load_module("orientdigest", CAIRN / "lib" / "orientdigest.py")
+        peaks = []
+        for versions in (50, 400):
+            with tempfile.TemporaryDirectory() as td:
+                repo = Path(td)
+                with (repo / "lib-knowledge.jsonl").open("w", encoding="utf-8") as f:
+                    for v in range(versions):  # 20 libraries, each re-confirmed `versions` times
+                        for i in range(20):
+                            f.write(json.dumps({"name": f"lib{i}", "confirmed_version": str(v),
+                                                "key_facts": ["x" * 400]}) + "\n")
+                tracemalloc.start()
+                got = digest.summary(repo, persist=False)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+                self.assertEqual(got["libs"], 20)
+        self.assertLess(peaks[1], peaks[0] * 1.5 + 64 * 1024)  # an 8x larger file, no more memory
+
+    def test_max_tokens_keeps_the_verdict_and_best_hits_and_logs_what_it_dropped(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            facts = [f"fact {i} " + "x" * 60 for i in range(12)]
+            (repo / "zod.json").write_text(json.dumps(
+                {"confirmed_version": "3.0", "capability": "schema validation", "key_facts": facts}), encoding="utf-8")
+            self.run_script("skills/library-knowledge/scripts/lib_refresh.py", "--repo", str(repo),
+                            "--set", "zod", "--from-json", str(repo / "zod.json"))
+            full = self.run_script("skills/library-knowledge/scripts/lib_lookup.py", "zod", "--repo", str(repo))
+            cut = self.run_script("skills/library-knowledge/scripts/lib_lookup.py", "zod", "--repo", str(repo),
+                                  "--max-tokens", "120")
+            self.assertEqual(cut.returncode, 0, cut.stderr)
+            self.assertEqual(cut.stdout.splitlines()[0], full.stdout.splitlines()[0])  # the verdict line
+            self.assertIn("capability: schema validation", cut.stdout)
+            self.assertIn("fact 0 ", cut.stdout)
+            self.assertNotIn("fact 11 ", cut.stdout)
+            self.assertIn("dropped to fit --max-tokens 120", cut.stdout)
+            self.assertLessEqual(len(cut.stdout.encode("utf-8")), 120 * 4 + 64)
+
+            for i in range(6):
+                model = {"reframe": f"reframe {i}", "solution_classes": ["arena"], "taught_by_gap": f"gap {i}",
+                         "example": "e" * 80}
+                (repo / "model.json").write_text(json.dumps(model), encoding="utf-8")
+                self.run_script("skills/mental-models/scripts/models_record.py", "--repo", str(repo),
+                                "--smell", f"slow render {i}", "--from-json", str(repo / "model.json"))
+            hits = self.run_script("skills/mental-models/scripts/models_lookup.py", "--repo", str(repo),
+                                   "--smell", "slow render", "--max-tokens", "90").stdout
+            self.assertEqual(hits.count("**reframe:**"), 4)  # every ranked reframe before any example
+            self.assertNotIn("_example:_", hits)
+
+            lines = [json.loads(line) for line in (repo / ".cairn" / "metrics.jsonl").read_text(encoding="utf-8").splitlines()]
+            logged = [r for r in lines if r["cmd"] == "library-knowledge/lib_lookup"]
+            self.assertNotIn("max_tokens", logged[0])
+            self.assertEqual((logged[1]["max_tokens"], logged[1]["out_tokens"] > 0), (120, True))
+            self.assertGreater(logged[1]["dropped_lines"], 0)
+            self.assertLess(logged[1]["out_tokens"], logged[0]["out_tokens"])
+
+        outmeter = load_module("outmeter", CAIRN / "lib" / "outmeter.py")
+        m = outmeter.Meter(30)
+        m.add("verdict")
+        for i in range(10):
+            m.add(f"hit {i} " + "y" * 12, 1)
+        kept = m.render().splitlines()
+        self.assertEqual(kept[:2], ["verdict", "hit 0 " + "y" * 12])
+        self.assertTrue(kept[-1].startswith("[... "))
+        self.assertEqual(outmeter.fit_list([{"a": "b" * 40}] * 5, 30), [{"a": "b" * 40}])
+
+    def test_bm25_backend_keeps_a_persisted_index_current_and_ranks_like_its_in_memory_twin(self) -> None:
+        mm = load_module("mm_store", CAIRN / "skills" / "mental-models" / "scripts" / "store.py")
+        retrieval = load_module("retrieval", CAIRN / "skills" / "mental-models" / "scripts" / "retrieval.py")
+        bm25 = load_module("bm25", CAIRN / "skills" / "mental-models" / "scripts" / "bm25.py")
+        old = os.environ.get("CAIRN_RETRIEVAL")
+        os.environ["CAIRN_RETRIEVAL"] = "bm25"
+        try:
+            with tempfile.TemporaryDirectory() as td:
+                repo = Path(td)
+                for smell, reframe in [("O(n^2)", "index the inner collection by key"),
+                                       ("slow render of long list", "virtualize the list window"),
+                                       ("render thrash on scroll", "batch layout reads before writes"),
+                                       ("stale cache after deploy", "version the cache key")]:
+                    mm.upsert(repo, None, {"smell": smell, "reframe": reframe})
+                self.assertFalse(bm25.index_path(mm.jsonl_path(repo, None)).exists())  # built on first search
+
+                self.assertEqual(mm.search(repo, None, "O(n^2) nested loop")[0]["smell"], "O(n^2)")
+                hits = [r["smell"] for r in mm.search(repo, None, "list render slow")]
+                self.assertEqual(hits[0], "slow render of long list")
+                records = mm.read_all(repo, None)
+                self.assertEqual([r["smell"] for _, r in retrieval.rank("list render slow", records, mm.FIELDS)], hits)
+
+                path = mm.jsonl_path(repo, None)
+                before = bm25.index_path(path).read_bytes()
+                mm.upsert(repo, None, {"smell": "slow render of long list", "reframe": "memoize row components"})
+                self.assertEqual(bm25.index_path(path).read_bytes(), before)  # the writer leaves the index alone
+                self.assertIn("memoize", mm.search(repo, None, "memoize rows")[0]["reframe"])  # the reader catches up
+                sidecar = json.loads(bm25.index_path(path).read_text(encoding="utf-8"))
+                self.assertEqual(sidecar["size"], path.stat().st_size)
+                self.assertIn("memoize", sidecar["docs"]["slow render of long list"][1])
+                self.assertNotIn("virtualize", sidecar["docs"]["slow render of long list"][1])
+
+                with open(path, "a", encoding="utf-8") as f:  # a writer that bypasses the port
+                    f.write(json.dumps({"smell": "n+1 queries", "reframe": "prefetch the relation"}) + "\n")
+                self.assertEqual(mm.search(repo, None, "prefetch queries")[0]["smell"], "n+1 queries")
+                self.assertEqual(mm.search(repo, None, "nothing matches here"), [])
+        finally:
+            if old is None:
+                os.environ.pop("CAIRN_RETRIEVAL", None)
+            else:
+                os.environ["CAIRN_RETRIEVAL"] = old
+
+    def test_qmd_backend_fuses_bm25_with_cached_trigram_vectors(self) -> None:
+        mm = load_module("mm_store", CAIRN / "skills" / "mental-models" / "scripts" / "store.py")
+        vectors = load_module("vectors", CAIRN / "skills" / "mental-models" / "scripts" / "vectors.py")
+        old = os.environ.get("CAIRN_RETRIEVAL")
+        os.environ["CAIRN_RETRIEVAL"] = "qmd"
+        built = []
+        real_vector = vectors.vector
+        vectors.vector = lambda text: built.append(text) or real_vector(text)
+        try:
+            with tempfile.TemporaryDirectory() as td:
+                repo = Path(td)
+                for smell, reframe in [("O(n^2)", "index the inner collection by key"),
+                                       ("re-render storm on every keystroke", "memoize the subtree"),
+                                       ("allocations in hot loop", "reuse buffers"),
+                                       ("stale cache after deploy", "version the cache key")]:
+                    mm.upsert(repo, None, {"smell": smell, "reframe": reframe})
+                # no shared token: only the trigram side can recall these
+                self.assertEqual([r["smell"] for r in mm.search(repo, None, "rerendering on keypress")],
+                                 ["re-render storm on every keystroke"])
+                self.assertEqual(mm.search(repo, None, "O(n^2) nested loop")[0]["smell"], "O(n^2)")
+                self.assertEqual(mm.search(repo, None, "nothing matches here"), [])
+                self.assertTrue(vectors.cache_path(mm.jsonl_path(repo, None)).exists())
+
+                built.clear()
+                mm.search(repo, None, "allocating in a loop")
+                self.assertEqual([t for t in built if "reuse" in t or "memoize" in t], [])  # rows came from the cache
+                mm.upsert(repo, None, {"smell": "allocations in hot loop", "reframe": "pool the scratch arrays"})
+                built.clear()
+                self.assertEqual(mm.search(repo, None, "pooling scratch")[0]["smell"], "allocations in hot loop")
+                self.assertEqual([t for t in built if t != "pooling scratch"],
+                                 ["allocations in hot loop pool the scratch arrays"])  # only the changed row
+        finally:
+            vectors.vector = real_vector
+            if old is None:
+                os.environ.pop("CAIRN_RETRIEVAL", None)
+            else:
+                os.environ["CAIRN_RETRIEVAL"] = old
+
+    def test_matcher_token_cache_ranks_like_the_uncached_matcher_and_retokenizes_only_changes(self) -> None:
+        mm = load_module("mm_store", CAIRN / "skills" / "mental-models" / "scripts" / "store.py")
+        retrieval = load_module("retrieval", CAIRN / "skills" / "mental-models" / "scripts" / "retrieval.py")
+        tokencache = load_module("tokencache", CAIRN / "skills" / "mental-models" / "scripts" / "tokencache.py")
+        self.assertEqual(retrieval._norm("O(n^2) Ünïcode\tTabs—dash ½"),
+                         "".join(c.lower() if c.isalnum() or c.isspace() else " " for c in "O(n^2) Ünïcode\tTabs—dash ½"))
+        old = os.environ.pop("CAIRN_RETRIEVAL", None)
+        prepared = []
+        real_prepare = tokencache.prepare
+        tokencache.prepare = lambda rec, fields: prepared.append(rec["smell"]) or real_prepare(rec, fields)
+        try:
+            with tempfile.TemporaryDirectory() as td:
+                repo = Path(td)
+                for smell, reframe in [("O(n^2)", "index the inner collection by key"),
+                                       ("slow render of long list", "virtualize the list window"),
+                                       ("Ünïcode smell", "normalize before compare"),
+                                       ("stale cache after deploy", "version the cache key")]:
+                    mm.upsert(repo, None, {"smell": smell, "reframe": reframe})
+                records = mm.read_all(repo, None)
+                for q in ("O(n^2) nested loop", "list render slow", "ünïcode", "the cache"):
+                    self.assertEqual([r["smell"] for r in mm.search(repo, None, q)],
+                                     [r["smell"] for _, r in retrieval.rank(q, records, mm.FIELDS)])
+                self.assertEqual(len(prepared), 4)  # built once, then read back
+                self.assertEqual(mm.search(repo, None, "O(n^2) nested loop")[0]["smell"], "O(n^2)")
+
+                prepared.clear()
+                mm.upsert(repo, None, {"smell": "stale cache after deploy", "reframe": "purge on release"})
+                self.assertEqual(mm.search(repo, None, "purge release")[0]["smell"], "stale cache after deploy")
+                self.assertEqual(prepared, ["stale cache after deploy"])
+                self.assertTrue(tokencache.cache_path(mm.jsonl_path(repo, None)).exists())
+        finally:
+            tokencache.prepare = real_prepare
+            if old is not None:
+                os.environ["CAIRN_RETRIEVAL"] = old
+
+    def test_matcher_bench_reports_the_same_ranking_for_every_variant(self) -> None:
+        proc = self.run_script("bench/matcher_bench.py", "--sizes", "200", "--repeat", "1", "--quiet")
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        row = json.loads(proc.stdout)["results"][0]
+        self.assertEqual((row["size"], row["same_ranking"]), (200, True))
+        self.assertGreater(row["cache_bytes"], 0)
+        self.assertEqual(set(row["speedup"]), {"legacy/cached", "translate/cached", "legacy/translate"})
+
+    def test_top_k_ranking_is_the_head_of_the_full_ranking_and_bm25_prunes(self) -> None:
+        import random
+        retrieval = load_module("retrieval", CAIRN / "skills" / "mental-models" / "scripts" / "retrieval.py")
+        bm25 = load_module("bm25", CAIRN / "skills" / "mental-models" / "scripts" / "bm25.py")
+        rng = random.Random(7)
+        words = [f"w{i}" for i in range(60)] + ["render", "cache", "list"]
+        zipf = [1.0 / (i + 1) for i in range(len(words))]
+        records = [{"smell": " ".join(rng.choices(words, zipf, k=4)) + f" #{i}",
+                    "reframe": " ".join(rng.choices(words, zipf, k=10))} for i in range(800)]
+        records.append({"smell": "O(n^2)", "reframe": "index the inner collection"})
+        index = bm25.Index(["smell", "reframe"])
+        for i, rec in enumerate(records):
+            index.add(i, rec)
+        old = os.environ.get("CAIRN_RETRIEVAL")
+        try:
+            for backend in ("matcher", "bm25", "qmd"):
+                os.environ["CAIRN_RETRIEVAL"] = backend
+                for q in ("w0 w1 w40", "w55 render", "O(n^2) w0", "w3 w3 w12 w59"):
+                    full = retrieval.rank(q, records, ["smell", "reframe"])
+                    for k in (1, 4, 25):
+                        with self.subTest(backend=backend, q=q, k=k):
+                            top = retrieval.rank(q, records, ["smell", "reframe"], k=k)
+                            self.assertEqual([(s, r["smell"]) for s, r in top],
+                                             [(s, r["smell"]) for s, r in full[:k]])
+            hits = index.top("w0 w1 w40", 4)
+            self.assertLess(index.scored, len(index.scores("w0 w1 w40")))  # the common terms were never walked
+            self.assertGreaterEqual(len(hits), 4)
+        finally:
+            if old is None:
+                os.environ.pop("CAIRN_RETRIEVAL", None)
+            else:
+                os.environ["CAIRN_RETRIEVAL"] = old
+
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            for i in range(6):
+                (repo / "model.json").write_text(json.dumps({"reframe": f"reframe {i}", "solution_classes": ["arena"],
+                                                             "taught_by_gap": f"gap {i}"}), encoding="utf-8")
+                self.run_script("skills/mental-models/scripts/models_record.py", "--repo", str(repo),
+                                "--smell", f"slow render {i}", "--from-json", str(repo / "model.json"))
+            out = self.run_script("skills/mental-models/scripts/models_lookup.py", "--repo", str(repo),
+                                  "--smell", "slow render").stdout
+            self.assertEqual(out.count("## smell:"), 4)
+            (repo / "lib.json").write_text(json.dumps({"confirmed_version": "1.0.0", "capability": "form validation"}),
+                                           encoding="utf-8")
+            for i in range(5):
+                self.run_script("skills/library-knowledge/scripts/lib_refresh.py", "--repo", str(repo),
+                                "--set", f"lib{i}", "--from-json", str(repo / "lib.json"))
+            listed = self.run_script("skills/library-knowledge/scripts/lib_lookup.py", "--repo", str(repo),
+                                     "--search", "validation", "--top", "2", "--json")
+            self.assertEqual(len(json.loads(listed.stdout)), 2, listed.stderr)
+            for bad in ("0", "-3"):
+                refused = self.run_script("skills/library-knowledge/scripts/lib_lookup.py", "--repo", str(repo),
+                                          "--search", "validation", "--top", bad)
+                self.assertEqual(refused.returncode, 2, refused.stdout)
+                self.assertIn("--top must be at least 1", refused.stderr)
+
+    def test_retrieval_eval_reports_recall_mrr_and_latency_for_every_backend(self) -> None:
+        proc = self.run_script("bench/retrieval_eval.py", "--sizes", "40", "--repeat", "1", "--ks", "1,4", "--quiet")
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        rows = {r["backend"]: r for r in json.loads(proc.stdout)["results"]}
+        self.assertEqual(set(rows), {"matcher", "bm25", "qmd"})
+        for name, row in rows.items():
+            with self.subTest(backend=name):
+                self.assertEqual(set(row["recall"]), {"@1", "@4"})
+                self.assertLessEqual(row["recall"]["@1"], row["recall"]["@4"])
+                self.assertEqual(row["by_kind"]["exact"], 1.0)  # a verbatim smell is always recalled
+                self.assertGreater(row["mrr"], 0)
+                self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+
+        with tempfile.TemporaryDirectory() as td:
+            labeled = Path(td) / "frictions.json"
+            labeled.write_text(json.dumps([{"query": "zzz", "expect": "nope"}]), encoding="utf-8")
+            store = Path(td) / "mental-models.jsonl"
+            store.write_text(json.dumps({"smell": "nope", "reframe": "zzz"}) + "\n", encoding="utf-8")
+            proc = self.run_script("bench/retrieval_eval.py", "--store", str(store), "--queries", str(labeled),
+                                   "--backends", "matcher", "--repeat", "1", "--quiet")
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            self.assertEqual(json.loads(proc.stdout)["results"][0]["mrr"], 1.0)
+            bad = self.run_script("bench/retrieval_eval.py", "--backends", "semantic", "--quiet")
+            self.assertEqual(bad.returncode, 2)
+
+    def test_store_stress_loses_nothing_under_contention_and_detects_steals(self) -> None:
+        for st in ("workshop", "inquiry"):
+            with self.subTest(store=st):
+                proc = self.run_script("bench/store_stress.py", "--store", st, "--procs", "3", "--ops", "12")
+                self.assertEqual(proc.returncode, 0, proc.stderr)
+                report = json.loads(proc.stdout)
+                self.assertEqual(report["ops"], 36)
+                self.assertEqual((report["lost_updates"], report["lost_inserts"], report["lock_steals"]), (0, 0, 0))
+                self.assertGreaterEqual(report["lock"]["acquisitions"], 36)
+                self.assertIsNotNone(report["lock"]["wait_ms"]["p99"])
+        stress = load_module("store_stress", CAIRN / "bench" / "store_stress.py")
+        self.assertEqual(stress._steals([(0, 1, "ex"), (1, 2, "ex"), (2, 3, "sh")]), 0)
+        self.assertEqual(stress._steals([(0, 2, "ex"), (1, 3, "ex"), (1.5, 1.6, "sh")]), 2)
+
+    def test_inquiry_group_commit_makes_every_reported_prediction_durable(self) -> None:
+        logstore = load_module("logstore", CAIRN / "lib" / "logstore.py")
+        groupcommit = load_module("groupcommit", CAIRN / "lib" / "groupcommit.py")
+        with tempfile.TemporaryDirectory() as td:
+            repo = Path(td)
+            log = repo / "inquiry-log.jsonl"
+            # a writer that spooled and died before flushing: the next flusher commits it
+            groupcommit._spool(log, [json.dumps({"id": "orphan", "confidence": 0.4})])
+
+            env = {**os.environ, "CAIRN_GROUP_COMMIT_MS": "20"}
+            procs = [subprocess.Popen(
+                [sys.executable, script("skills/inquiry/scripts/predict.py"), "--repo", str(repo),
+                 "--claim", f"claim {i}", "--confidence", "0.7"],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env) for i in range(6)]
+            ids = []
+            for p in procs:
+                out, err = p.communicate(timeout=20)
+                self.assertEqual(p.returncode, 0, err)
+                ids.append(out.split()[1])
+                # reported => on disk, whichever process flushed it
+                self.assertIn(ids[-1], {r["id"] for r in logstore.read_all(log, "id")})
+
+            live = {r["id"]: r for r in logstore.read_all(log, "id")}
+            self.assertTrue(set(ids) | {"orphan"} <= set(live))
+            self.assertEqual(live[ids[0]]["confidence"], 0.7)
+            self.assertEqual(list(groupcommit.queue_dir(log).glob("*")), [])
+            self.assertLess(len(log.read_text(encoding="utf-8").splitlines()), 8)  # no duplicate lines
+
+    def test_group_commit_reports_failure_only_for_a_spool_no_flusher_claimed(self) -> None:
+        from unittest import mock
+        logstore = load_module("logstore", CAIRN / "lib" / "logstore.py")
+        groupcommit = load_module("groupcommit", CAIRN / "lib" / "groupcommit.py")
+        with tempfile.TemporaryDirectory() as td:
+            log = Path(td) / "inquiry-log.jsonl"
+            line = lambda i: json.dumps({"id": i})  # noqa: E731
+            real = logstore.locked
+
+            def timed_out(p, fn):
+                raise TimeoutError("lock wait")
+
+            def flushed_then_timed_out(p, fn):
+                real(p, lambda: groupcommit._drain(p))  # another writer flushes the queue first
+                raise TimeoutError("lock wait")
+
+            with mock.patch.object(logstore, "locked", timed_out):
+                with self.assertRaises(TimeoutError):
+                    groupcommit.append(log, [line("withdrawn")], 0)
+            with mock.patch.object(logstore, "locked", flushed_then_timed_out):
+                groupcommit.append(log, [line("committed")], 0)  # claimed and fsynced: success
+            self.assertEqual([r["id"] for r in logstore.read_all(log, "id")], ["committed"])
+
+            # a flusher that died after claiming leaves a .taken file: the next one commits it
+            orphan = groupcommit._spool(log, [line("orphan")])
+            orphan.rename(groupcommit._taken(orphan))
+            groupcommit.append(log, [line("next")], 0)
+            self.assertEqual(sorted(r["id"] for r in logstore.read_all(log, "id")), ["committed", "next", "orphan"])
+            self.assertEqual(list(groupcommit.queue_dir(log).glob("*")), [])
+
+    def test_store_lock_blocks_writers_times_out_and_frees_on_holder_death(self) -> None:
+        storelock = load_module("storelock", CAIRN / "lib" / "storelock.py")
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "inquiry.jsonl"
+            holder = subprocess.Popen(
+                [sys.executable, "-c",
+                 "import sys, time; sys.path.insert(0, sys.argv[1]); import storelock\n"
+                 "from pathlib import Path\n"
+                 "with storelock.hold(Path(sys.argv[2])):\n"
+                 "    print('held', flush=True); time.sleep(60)\n",
+                 str(CAIRN / "lib"), str(p)],
+                stdout=subprocess.PIPE, text=True,
+            )
+            try:
+                self.assertEqual(holder.stdout.readline().strip(), "held")
+                with self.assertRaises(TimeoutError):
+                    with storelock.hold(p, timeout=0.2):
+                        pass
+                with self.assertRaises(TimeoutError):  # a writer also excludes readers
+                    with storelock.hold(p, shared=True, timeout=0.1):
+                        pass
+            finally:
+                holder.kill(); holder.wait(); holder.stdout.close()
+
+            with storelock.hold(p, timeout=2):  # the kernel released the dead holder's lock
+                with storelock.hold(p, shared=True):  # re-entrant within this process
+                    pass
+            with storelock.hold(p, shared=True):
+                with self.assertRaises(RuntimeError):
+                    with storelock.hold(p):
+                        pass
+            s = storelock.stats()[str(storelock.lock_path(p))]
+            self.assertEqual((s["acquired"], s["timeouts"]), (2, 2))
+            self.assertGreaterEqual(s["max_wait_s"], 0.1)
+
     def test_boundary_scan_uses_repo_config_for_subtree_and_excludes_root_dirs(self) -> None:
         with tempfile.TemporaryDirectory() as td:
             repo = Path(td)